@@ -1,3 +1,14 @@
 from django.contrib import admin
+from admin_panel.models import PlatformDailySales, PlatformStats
 
-# Register your models here.
+
+class PlatformDailySalesAdmin(admin.ModelAdmin):
+    list_display = ('day', 'orders', 'items', 'revenue', 'discount', 'refunds')
+
+
+class PlatformStatsAdmin(admin.ModelAdmin):
+    list_display = ('refreshed_at', 'total_orders', 'total_revenue', 'pending_orders', 'all_orders')
+
+
+admin.site.register(PlatformDailySales, PlatformDailySalesAdmin)
+admin.site.register(PlatformStats, PlatformStatsAdmin)
@@ -0,0 +1,214 @@
+# admin_panel/analytics.py
+"""
+Time-bucketed analytics for the admin (and vendor) charts.
+Series are read from the daily rollups (PlatformDailySales / VendorDailySales), grouped
+into day/week/month/year buckets in one query and gap-filled with zeros. Closed buckets
+are cached per (scope, bucket kind, bucket start); only the open bucket, which still
+contains today, is recomputed on every request. vendor.rollups marks the buckets of a past
+day as changed when a sale (paid late), cancellation or refund changes it, and a rebuild
+invalidates them all. A cached bucket carries the change mark it was computed under, so a
+value read from the database before a change but cached after it is never served. Buckets about to be cached are read from the primary even in replica
+views: a lagging replica would put back the values just dropped, for a whole day.
+"""
+import time
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Sum, DateField
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from admin_panel.models import PlatformDailySales
+from vendor.models import VendorDailySales
+
+# period -> (how far back, bucket kind)
+PERIODS = {
+    'daily': (timedelta(days=30), 'day'),
+    'weekly': (timedelta(weeks=12), 'week'),
+    'monthly': (timedelta(days=365), 'month'),
+    'yearly': (timedelta(days=365 * 3), 'year'),
+}
+DEFAULT_PERIOD = 'monthly'
+BUCKET_KINDS = ('day', 'week', 'month', 'year')
+
+METRICS = ('orders', 'items', 'revenue', 'discount', 'refunds')
+ZERO = Decimal('0.00')
+
+CLOSED_BUCKET_TIMEOUT = 60 * 60 * 24
+# Outlives every bucket cached before the change it marks
+CHANGED_TIMEOUT = CLOSED_BUCKET_TIMEOUT * 2
+GENERATION_KEY = 'analytics:generation'
+TOP_N_TIMEOUT = 60 * 5
+
+
+def resolve_period(period):
+    """Return (period, first day, bucket kind); unknown periods fall back to monthly."""
+    if period not in PERIODS:
+        period = DEFAULT_PERIOD
+    lookback, kind = PERIODS[period]
+    return period, timezone.localdate(timezone.now() - lookback), kind
+
+
+def bucket_start(day, kind):
+    """Python-side equivalent of Trunc(kind) for a date (weeks start on Monday)."""
+    if kind == 'week':
+        return day - timedelta(days=day.weekday())
+    if kind == 'month':
+        return day.replace(day=1)
+    if kind == 'year':
+        return day.replace(month=1, day=1)
+    return day
+
+
+def next_bucket(start, kind):
+    if kind == 'week':
+        return start + timedelta(weeks=1)
+    if kind == 'month':
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    if kind == 'year':
+        return start.replace(year=start.year + 1)
+    return start + timedelta(days=1)
+
+
+def buckets(first_day, last_day, kind):
+    start = bucket_start(first_day, kind)
+    while start <= last_day:
+        yield start
+        start = next_bucket(start, kind)
+
+
+def _empty():
+    return {'orders': 0, 'items': 0, 'revenue': ZERO, 'discount': ZERO, 'refunds': ZERO}
+
+
+def _scope(vendor_id):
+    return f"vendor:{vendor_id}" if vendor_id else "platform"
+
+
+def _generation():
+    return cache.get(GENERATION_KEY, 0)
+
+
+def invalidate_all():
+    """Orphan every cached bucket at once, e.g. after the rollups were rebuilt."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+
+def _bucket_key(scope, kind, start, generation):
+    return f"analytics:{generation}:{scope}:{kind}:{start.isoformat()}"
+
+
+def _changed_key(scope, kind, start):
+    return f"analytics:changed:{scope}:{kind}:{start.isoformat()}"
+
+
+def _query_buckets(vendor_id, kind, since, using=None):
+    rows = (VendorDailySales.objects.filter(vendor_id=vendor_id) if vendor_id
+            else PlatformDailySales.objects.all())
+    if using:
+        rows = rows.using(using)
+    grouped = (rows.filter(day__gte=since)
+               .annotate(bucket=Trunc('day', kind, output_field=DateField()))
+               .values('bucket')
+               .annotate(**{f"total_{metric}": Sum(metric) for metric in METRICS}))
+    result = {}
+    for row in grouped:
+        values = _empty()
+        for metric in METRICS:
+            values[metric] = row[f"total_{metric}"] or values[metric]
+        result[row['bucket']] = values
+    return result
+
+
+def time_series(period=DEFAULT_PERIOD, metrics=METRICS, vendor_id=None):
+    """
+    Gap-filled series for the given period: a list of {'date': bucket start, <metric>: value}.
+    Platform-wide unless vendor_id is given.
+    """
+    period, first_day, kind = resolve_period(period)
+    today = timezone.localdate()
+    starts = list(buckets(first_day, today, kind))
+    open_start = starts[-1]
+    scope = _scope(vendor_id)
+
+    generation = _generation()
+    keys = {start: _bucket_key(scope, kind, start, generation) for start in starts[:-1]}
+    changed_keys = {start: _changed_key(scope, kind, start) for start in starts[:-1]}
+    cached = cache.get_many(list(keys.values()) + list(changed_keys.values()))
+    # Cached entries are (change mark when computed, values); a newer mark means the day changed since
+    marks = {start: cached.get(key) for start, key in changed_keys.items()}
+    values = {start: cached[key][1] for start, key in keys.items()
+              if key in cached and cached[key][0] == marks[start]}
+
+    # One grouped query from the oldest missing bucket; usually just the open one, which may
+    # come from the replica. Closed buckets get cached, so those are read from the primary
+    missing = [start for start in starts if start not in values]
+    using = DEFAULT_DB_ALIAS if missing[0] != open_start else None
+    fresh = _query_buckets(vendor_id, kind, missing[0], using)
+    for start in missing:
+        values[start] = fresh.get(start, _empty())
+    cache.set_many(
+        {keys[start]: (marks[start], values[start]) for start in missing if start != open_start},
+        CLOSED_BUCKET_TIMEOUT,
+    )
+
+    return [
+        {'date': start, **{metric: values[start][metric] for metric in metrics}}
+        for start in starts
+    ]
+
+
+def forget_day(day, vendor_id=None):
+    """
+    Mark the buckets containing day as changed for the platform and, if given, the vendor.
+    Cached values computed under an older mark stop being served, including ones a request
+    read before the change and caches only now.
+    """
+    scopes = [_scope(None)] + ([_scope(vendor_id)] if vendor_id else [])
+    mark = time.time_ns()
+    cache.set_many({
+        _changed_key(scope, kind, bucket_start(day, kind)): mark
+        for scope in scopes for kind in BUCKET_KINDS
+    }, CHANGED_TIMEOUT)
+
+
+######################## Top N ########################
+
+# dimension -> (fields grouped on, extra filters)
+TOP_DIMENSIONS = {
+    'product': (
+        ('product__id', 'product__title', 'product__image',
+         'product__vendor__name', 'product__category__title', 'product__price'),
+        {},
+    ),
+    'category': (
+        ('product__category__id', 'product__category__title', 'product__category__image'),
+        {'product__category__isnull': False},
+    ),
+}
+
+
+def top_n(dimension, period=DEFAULT_PERIOD, limit=10):
+    """Best sellers by quantity over paid order lines for the period, cached for a few minutes."""
+    from store.models import CartOrderItem
+
+    period = resolve_period(period)[0]
+    key = f"analytics:top:{dimension}:{period}:{limit}:{timezone.localdate().isoformat()}"
+    rows = cache.get(key)
+    if rows is not None:
+        return rows
+
+    fields, filters = TOP_DIMENSIONS[dimension]
+    start = timezone.now() - PERIODS[period][0]
+    rows = list(
+        CartOrderItem.objects.filter(order__payment_status='paid', order__date__gte=start, **filters)
+        .values(*fields)
+        .annotate(sell_count=Sum('qty'))
+        .order_by('-sell_count')[:limit]
+    )
+    cache.set(key, rows, TOP_N_TIMEOUT)
+    return rows
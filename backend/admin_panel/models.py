@@ -1,3 +1,67 @@
-from django.db import models
+import logging
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.signals import post_save
 
-# Create your models here.
+log = logging.getLogger(__name__)
+
+
+class PlatformDailySales(models.Model):
+    """Platform-wide counterpart of vendor.VendorDailySales, keyed by day only. Revenue is order totals."""
+    day = models.DateField(unique=True)
+    orders = models.IntegerField(default=0)
+    items = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+    discount = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+    refunds = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+
+    class Meta:
+        verbose_name_plural = "Platform Daily Sales"
+        ordering = ["-day"]
+
+    def __str__(self):
+        return str(self.day)
+
+
+class PlatformStats(models.Model):
+    """
+    Admin dashboard KPIs. A single row (pk=1) rewritten by admin_panel.tasks.refresh_platform_stats:
+    totals every minute from the daily rollups, status counts shortly after an order changes state
+    and hourly, so neither page loads nor the beat tick scan the orders table.
+    """
+    total_vendors = models.IntegerField(default=0)
+    total_orders = models.IntegerField(default=0, help_text="Paid orders")
+    total_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+    top_vendor = models.CharField(max_length=100, default="N/A")
+    pending_orders = models.IntegerField(default=0)
+    delivered_orders = models.IntegerField(default=0)
+    cancelled_orders = models.IntegerField(default=0)
+    all_orders = models.BigIntegerField(default=0, help_text="Every order row; may be a planner estimate")
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = "Platform Stats"
+
+    def __str__(self):
+        return f"Platform stats @ {self.refreshed_at}"
+
+
+STATS_REFRESH_DEBOUNCE = 5  # seconds
+
+
+def queue_stats_refresh(sender, instance, update_fields=None, **kwargs):
+    """Refresh PlatformStats after an order is saved; saves within the debounce window share one task."""
+    if update_fields is not None and not {'payment_status', 'order_status'} & set(update_fields):
+        return
+    try:
+        if not cache.add('platform-stats:refresh-queued', 1, STATS_REFRESH_DEBOUNCE):
+            return
+    except Exception as e:
+        # The beat schedule catches up within a minute; never fail an order save over this
+        log.warning("Could not queue platform stats refresh: %s", e)
+        return
+    from admin_panel.tasks import refresh_platform_stats
+    transaction.on_commit(lambda: refresh_platform_stats.apply_async(countdown=STATS_REFRESH_DEBOUNCE), robust=True)
+
+
+post_save.connect(queue_stats_refresh, sender='store.CartOrder')
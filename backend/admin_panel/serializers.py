@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from vendor.models import Vendor
-from store.models import Product, CartOrder, CategoryOffer
+from store.models import Product, CartOrder, CartOrderItem, CategoryOffer
 from django.db.models import Count, Sum
 
 
@@ -41,6 +41,9 @@ class AdminVendorSerializer(serializers.ModelSerializer):
         ]
 
     def get_products(self, obj):
+        # List views annotate product_count; single-vendor responses fall back to a count
+        if hasattr(obj, 'product_count'):
+            return obj.product_count
         return Product.objects.filter(vendor=obj).count()
 
     def get_status(self, obj):
@@ -92,6 +95,23 @@ class AdminOrderSerializer(serializers.ModelSerializer):
         return ", ".join([v.name for v in obj.vendor.all()])
 
 
+class AdminOrderItemSerializer(serializers.ModelSerializer):
+    product_title = serializers.CharField(source='product.title', read_only=True)
+    vendor_name = serializers.CharField(source='vendor.name', read_only=True, allow_null=True, default=None)
+
+    class Meta:
+        model = CartOrderItem
+        fields = ['id', 'oid', 'product_title', 'vendor_name', 'qty', 'price', 'sub_total', 'total', 'delivery_status']
+
+
+class AdminOrderDetailSerializer(AdminOrderSerializer):
+    """Order with its lines; the view prefetches them with product and vendor."""
+    items = AdminOrderItemSerializer(source='orderitem', many=True, read_only=True)
+
+    class Meta(AdminOrderSerializer.Meta):
+        fields = AdminOrderSerializer.Meta.fields + ['items']
+
+
 class AdminCategoryOfferSerializer(serializers.ModelSerializer):
     """Serializer for category offer management"""
     category_name = serializers.CharField(source='category.title', read_only=True)
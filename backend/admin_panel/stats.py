@@ -0,0 +1,92 @@
+# admin_panel/stats.py
+"""
+Admin KPIs served from the PlatformStats snapshot.
+refresh_platform_stats() rebuilds it in Celery (see admin_panel.tasks) from the daily rollups
+plus, less often, the CartOrder status counts; request handlers only read the stored row.
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from admin_panel.models import PlatformStats
+from store.models import CartOrder
+from vendor.models import Vendor, VendorDailySales
+from vendor.rollups import platform_totals
+
+# Below this many rows an exact COUNT(*) is cheap enough to keep
+ESTIMATE_MIN_ROWS = 100000
+
+
+def estimated_count(queryset):
+    """
+    Row count of an unfiltered queryset. With ADMIN_ESTIMATED_COUNTS on PostgreSQL this is
+    the planner's estimate (pg_class.reltuples, refreshed by ANALYZE/autovacuum) for large
+    tables; filtered querysets and everything else get an exact count().
+    """
+    if (getattr(settings, 'ADMIN_ESTIMATED_COUNTS', False)
+            and connection.vendor == 'postgresql'
+            and not queryset.query.where):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been analyzed
+        if row and row[0] >= ESTIMATE_MIN_ROWS:
+            return row[0]
+    return queryset.count()
+
+
+def order_status_counts():
+    """Order counts by status. The only part of the snapshot that reads CartOrder itself."""
+    return {
+        **CartOrder.objects.aggregate(
+            pending_orders=Count('id', filter=Q(order_status='Pending')),
+            delivered_orders=Count('id', filter=Q(order_status='Delivered')),
+            cancelled_orders=Count('id', filter=Q(payment_status='cancelled') | Q(order_status='Cancelled')),
+        ),
+        'all_orders': estimated_count(CartOrder.objects.all()),
+    }
+
+
+def compute_platform_stats(statuses=True):
+    """
+    Totals come from the daily rollups (PlatformDailySales / VendorDailySales); with statuses
+    False the CartOrder status counts are left out, so the result is a partial snapshot.
+    """
+    sales = platform_totals()
+    top_vendor = (
+        VendorDailySales.objects.values('vendor__name')
+        .annotate(revenue=Sum('revenue'))
+        .order_by('-revenue')
+        .first()
+    )
+    stats = {
+        'total_vendors': Vendor.objects.filter(active=True).count(),
+        'total_orders': sales['orders'],
+        'total_revenue': sales['revenue'],
+        'top_vendor': (top_vendor['vendor__name'] if top_vendor else None) or "N/A",
+    }
+    if statuses:
+        stats.update(order_status_counts())
+    return stats
+
+
+def refresh_platform_stats(statuses=True):
+    """
+    Rewrite the snapshot. The every-minute beat run passes statuses=False and only refreshes the
+    rollup totals; order saves that change a status, and the hourly run, recount the statuses too.
+    """
+    if not statuses and not PlatformStats.objects.filter(pk=1).exists():
+        statuses = True  # the first snapshot needs every field
+    stats, _ = PlatformStats.objects.update_or_create(
+        pk=1, defaults={**compute_platform_stats(statuses), 'refreshed_at': timezone.now()}
+    )
+    return stats
+
+
+def get_platform_stats():
+    """The stored snapshot; computed inline only the very first time."""
+    return PlatformStats.objects.filter(pk=1).first() or refresh_platform_stats()
@@ -0,0 +1,16 @@
+import logging
+from celery import shared_task
+
+from admin_panel import stats
+
+log = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_platform_stats(statuses=True):
+    """
+    Recompute the admin KPI snapshot. Beat runs it every minute with statuses=False (rollup
+    totals only) and hourly in full; order state changes queue a full run.
+    """
+    snapshot = stats.refresh_platform_stats(statuses)
+    log.info("Platform stats refreshed at %s", snapshot.refreshed_at)
@@ -1,3 +1,164 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from admin_panel import stats
+from admin_panel.models import PlatformDailySales, PlatformStats
+from store.models import CartOrder, CartOrderItem, Category, Product
+from userauth.models import User
+from vendor.models import Vendor
+
+
+class AdminListQueryTests(TestCase):
+    """
+    Query counts of the admin list/detail endpoints stay the same however many rows they show
+    (no per-row queries). Each endpoint is measured with one row, then again with several more.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(email='admin@example.com', is_staff=True))
+        self.buyer = User.objects.create(email='buyer@example.com')
+        self.category = Category.objects.create(title='Category')
+        self.shops = 0
+
+    def add_vendor_with_order(self, lines=1):
+        self.shops += 1
+        user = User.objects.create(email=f'vendor{self.shops}@example.com')
+        vendor = Vendor.objects.create(user=user, name=f'Shop {self.shops}')
+        order = CartOrder.objects.create(buyer=self.buyer, full_name='Buyer', email=self.buyer.email,
+                                         mobile='1', payment_status='paid', total=Decimal('10.00') * lines)
+        order.vendor.add(vendor)
+        for _ in range(lines):
+            product = Product.objects.create(title='Product', price=Decimal('10.00'), vendor=vendor,
+                                             category=self.category, stock_qty=10)
+            CartOrderItem.objects.create(order=order, product=product, vendor=vendor, qty=1, price=Decimal('10.00'),
+                                         sub_total=Decimal('10.00'), total=Decimal('10.00'))
+        return order
+
+    def assertFlatQueries(self, num, url):
+        self.add_vendor_with_order()
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        for _ in range(4):
+            self.add_vendor_with_order()
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_vendor_list(self):
+        response = self.assertFlatQueries(2, '/api/admin/vendors/')
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual({row['products'] for row in response.data['results']}, {1})
+
+    def test_vendor_list_filtered(self):
+        self.assertFlatQueries(2, '/api/admin/vendors/?search=shop&active=true')
+
+    def test_product_list(self):
+        response = self.assertFlatQueries(2, '/api/admin/products/')
+        self.assertEqual(response.data['count'], 5)
+
+    def test_order_list(self):
+        response = self.assertFlatQueries(3, '/api/admin/orders/')
+        self.assertEqual(response.data['count'], 5)
+        self.assertTrue(all(row['vendor_names'] for row in response.data['results']))
+
+    def test_order_list_filtered(self):
+        self.assertFlatQueries(3, '/api/admin/orders/?payment_status=paid&start_date=2000-01-01')
+
+    def test_order_detail(self):
+        order = self.add_vendor_with_order(lines=1)
+        with self.assertNumQueries(3):
+            self.client.get(f'/api/admin/orders/{order.oid}/')
+        order = self.add_vendor_with_order(lines=5)
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/admin/orders/{order.oid}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['items']), 5)
+
+
+class PlatformStatsTests(TestCase):
+
+    def setUp(self):
+        self.buyer = User.objects.create(email='buyer@example.com')
+        user = User.objects.create(email='vendor@example.com')
+        Vendor.objects.create(user=user, name='Shop')
+        today = timezone.localdate()
+        PlatformDailySales.objects.create(day=today, orders=2, revenue=Decimal('30.00'))
+        PlatformDailySales.objects.create(day=today - timedelta(days=3), orders=1, revenue=Decimal('12.50'))
+        for order_status, payment_status in (('Pending', 'paid'), ('Delivered', 'paid'), ('Pending', 'cancelled')):
+            CartOrder.objects.create(buyer=self.buyer, full_name='Buyer', email=self.buyer.email, mobile='1',
+                                     order_status=order_status, payment_status=payment_status, total=Decimal('10.00'))
+
+    def test_snapshot(self):
+        snapshot = stats.get_platform_stats()
+        self.assertEqual((snapshot.total_orders, snapshot.total_revenue), (3, Decimal('42.50')))
+        self.assertEqual((snapshot.pending_orders, snapshot.delivered_orders, snapshot.cancelled_orders), (2, 1, 1))
+        self.assertEqual((snapshot.all_orders, snapshot.total_vendors), (3, 1))
+        with self.assertNumQueries(1):
+            self.assertEqual(stats.get_platform_stats().pk, snapshot.pk)
+
+    def test_tick_reads_only_the_rollups(self):
+        stats.refresh_platform_stats()
+        CartOrder.objects.filter(order_status='Pending').update(order_status='Delivered')
+        PlatformDailySales.objects.filter(day=timezone.localdate()).update(orders=5)
+
+        with CaptureQueriesContext(connection) as queries:
+            snapshot = stats.refresh_platform_stats(statuses=False)
+        self.assertFalse([q['sql'] for q in queries if 'store_cartorder' in q['sql']])
+        self.assertEqual(snapshot.total_orders, 6)
+        self.assertEqual((snapshot.pending_orders, snapshot.delivered_orders), (2, 1))  # until the next full run
+
+        snapshot = stats.refresh_platform_stats()
+        self.assertEqual((snapshot.pending_orders, snapshot.delivered_orders), (0, 3))
+
+    def test_first_tick_writes_a_full_snapshot(self):
+        snapshot = stats.refresh_platform_stats(statuses=False)
+        self.assertEqual((snapshot.pending_orders, snapshot.all_orders), (2, 3))
+
+
+class EstimatedCountTests(TestCase):
+    """estimated_count only trusts pg_class for large, unfiltered querysets on PostgreSQL."""
+
+    def setUp(self):
+        self.buyer = User.objects.create(email='buyer@example.com')
+        for payment_status in ('paid', 'paid', 'initiated'):
+            CartOrder.objects.create(buyer=self.buyer, full_name='Buyer', email=self.buyer.email, mobile='1',
+                                     payment_status=payment_status, total=Decimal('10.00'))
+
+    def on_database(self, vendor, reltuples):
+        fake = mock.MagicMock(vendor=vendor)
+        fake.cursor.return_value.__enter__.return_value.fetchone.return_value = (reltuples,)
+        return mock.patch.object(stats, 'connection', fake)
+
+    @override_settings(ADMIN_ESTIMATED_COUNTS=True)
+    def test_large_table_uses_the_planner_estimate(self):
+        with self.on_database('postgresql', 250000) as fake:
+            self.assertEqual(stats.estimated_count(CartOrder.objects.all()), 250000)
+        sql, params = fake.cursor.return_value.__enter__.return_value.execute.call_args.args
+        self.assertIn('pg_class', sql)
+        self.assertEqual(params, ['store_cartorder'])
+
+    @override_settings(ADMIN_ESTIMATED_COUNTS=True)
+    def test_exact_count_fallbacks(self):
+        for reltuples in (99999, -1):  # a small table, or one never analyzed
+            with self.subTest(reltuples=reltuples), self.on_database('postgresql', reltuples):
+                self.assertEqual(stats.estimated_count(CartOrder.objects.all()), 3)
+        with self.on_database('postgresql', 250000) as fake:
+            self.assertEqual(stats.estimated_count(CartOrder.objects.filter(payment_status='paid')), 2)
+        fake.cursor.assert_not_called()
+
+    def test_other_databases_and_setting_off(self):
+        for vendor, setting in (('sqlite', True), ('postgresql', False)):
+            with self.subTest(vendor=vendor), override_settings(ADMIN_ESTIMATED_COUNTS=setting), \
+                    self.on_database(vendor, 250000) as fake:
+                self.assertEqual(stats.estimated_count(CartOrder.objects.all()), 3)
+            fake.cursor.assert_not_called()
@@ -1,27 +1,32 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Count, Sum, Q
-from django.db.models.functions import TruncMonth, TruncDay, TruncWeek, TruncYear
-from datetime import datetime, timedelta
-from django.utils import timezone
+from django.db.models import Count, Sum, Q, Prefetch
+from rest_framework.exceptions import ValidationError
+from datetime import datetime
 from rest_framework.pagination import PageNumberPagination
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 
 from vendor.models import Vendor
+from .stats import get_platform_stats, estimated_count
+from .analytics import time_series, top_n
 from store.models import Product, CartOrder, CartOrderItem, CategoryOffer, Notification
 from store.serializers import NotificationSerializer
 from addon.models import ConfigSettings
 from addon.serializers import ConfigSettingsSerializer
 from .serializers import (
     AdminStatsSerializer, ChartRevenueSerializer, ChartOrdersSerializer,
-    AdminVendorSerializer, AdminProductSerializer, AdminOrderSerializer,
+    AdminVendorSerializer, AdminProductSerializer, AdminOrderSerializer, AdminOrderDetailSerializer,
     AdminCategoryOfferSerializer, SalesReportSerializer,
     VendorPerformanceSerializer, ProductReportSerializer,
     BestSellingProductSerializer, BestSellingCategorySerializer
 )
 from .permissions import IsAdminUser
+from backend.db_routing import replica_read
 
 
+@replica_read
 class AdminStatsAPIView(APIView):
     """
     GET: Returns dashboard statistics for admin panel
@@ -29,37 +34,20 @@ class AdminStatsAPIView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        # Total vendors
-        total_vendors = Vendor.objects.filter(active=True).count()
-
-        # Total orders (paid orders only)
-        total_orders = CartOrder.objects.filter(payment_status='paid').count()
-
-        # Total revenue (sum of all paid orders)
-        total_revenue = CartOrder.objects.filter(
-            payment_status='paid'
-        ).aggregate(total=Sum('total'))['total'] or 0
-
-        # Top vendor by revenue
-        top_vendor_data = CartOrder.objects.filter(
-            payment_status='paid'
-        ).values('vendor__name').annotate(
-            revenue=Sum('total')
-        ).order_by('-revenue').first()
-
-        top_vendor = top_vendor_data['vendor__name'] if top_vendor_data else "N/A"
-
+        # Served from the PlatformStats snapshot (refreshed every minute by Celery beat)
+        stats = get_platform_stats()
         data = {
-            'total_vendors': total_vendors,
-            'total_orders': total_orders,
-            'total_revenue': total_revenue,
-            'top_vendor': top_vendor
+            'total_vendors': stats.total_vendors,
+            'total_orders': stats.total_orders,
+            'total_revenue': stats.total_revenue,
+            'top_vendor': stats.top_vendor
         }
 
         serializer = AdminStatsSerializer(data)
         return Response([serializer.data], status=status.HTTP_200_OK)
 
 
+@replica_read
 class AdminRevenueChartAPIView(APIView):
     """
     GET: Returns revenue data based on period filter
@@ -69,43 +57,18 @@ class AdminRevenueChartAPIView(APIView):
 
     def get(self, request):
         period = request.query_params.get('period', 'monthly')
-        
-        # Calculate date range and truncation based on period
-        now = timezone.now()
-        if period == 'daily':
-            start_date = now - timedelta(days=30)
-            trunc_func = TruncDay
-        elif period == 'weekly':
-            start_date = now - timedelta(weeks=12)
-            trunc_func = TruncWeek
-        elif period == 'yearly':
-            start_date = now - timedelta(days=365*3)
-            trunc_func = TruncYear
-        else:  # monthly (default)
-            start_date = now - timedelta(days=365)
-            trunc_func = TruncMonth
-
-        revenue_data = CartOrder.objects.filter(
-            payment_status='paid',
-            date__gte=start_date
-        ).annotate(
-            period_date=trunc_func('date')
-        ).values('period_date').annotate(
-            revenue=Sum('total')
-        ).order_by('period_date')
-
-        # Format the data
-        chart_data = []
-        for item in revenue_data:
-            chart_data.append({
-                'date': item['period_date'].strftime('%Y-%m-%d'),
-                'revenue': float(item['revenue'])
-            })
+
+        # Gap-filled buckets from the daily rollup
+        chart_data = [
+            {'date': item['date'].strftime('%Y-%m-%d'), 'revenue': float(item['revenue'])}
+            for item in time_series(period, ('revenue',))
+        ]
 
         serializer = ChartRevenueSerializer(chart_data, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@replica_read
 class AdminOrdersChartAPIView(APIView):
     """
     GET: Returns order counts based on period filter
@@ -115,49 +78,49 @@ class AdminOrdersChartAPIView(APIView):
 
     def get(self, request):
         period = request.query_params.get('period', 'monthly')
-        
-        # Calculate date range and truncation based on period
-        now = timezone.now()
-        if period == 'daily':
-            start_date = now - timedelta(days=30)
-            trunc_func = TruncDay
-        elif period == 'weekly':
-            start_date = now - timedelta(weeks=12)
-            trunc_func = TruncWeek
-        elif period == 'yearly':
-            start_date = now - timedelta(days=365*3)
-            trunc_func = TruncYear
-        else:  # monthly (default)
-            start_date = now - timedelta(days=365)
-            trunc_func = TruncMonth
-
-        orders_data = CartOrder.objects.filter(
-            payment_status='paid',
-            date__gte=start_date
-        ).annotate(
-            period_date=trunc_func('date')
-        ).values('period_date').annotate(
-            orders=Count('id')
-        ).order_by('period_date')
-
-        # Format the data
-        chart_data = []
-        for item in orders_data:
-            chart_data.append({
-                'date': item['period_date'].strftime('%Y-%m-%d'),
-                'orders': item['orders']
-            })
+
+        # Gap-filled buckets from the daily rollup
+        chart_data = [
+            {'date': item['date'].strftime('%Y-%m-%d'), 'orders': item['orders']}
+            for item in time_series(period, ('orders',))
+        ]
 
         serializer = ChartOrdersSerializer(chart_data, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+def _date_param(request, name):
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValidationError({name: "Use YYYY-MM-DD"})
+
+
+@replica_read
 class AdminVendorListAPIView(generics.ListAPIView):
+    """
+    GET: List vendors with their product counts
+    Query params: ?search=<name or email> &active=true|false
+    """
     permission_classes = [IsAdminUser]
     serializer_class = AdminVendorSerializer
-    queryset = Vendor.objects.all().order_by('-date')
     pagination_class = PageNumberPagination
 
+    def get_queryset(self):
+        # Product's FK to Vendor uses related_name="vendor", so Count('vendor') counts products
+        queryset = Vendor.objects.select_related('user').annotate(product_count=Count('vendor')).order_by('-date')
+
+        search = self.request.query_params.get('search')
+        if search:
+            queryset = queryset.filter(Q(name__icontains=search) | Q(user__email__icontains=search))
+        active = self.request.query_params.get('active')
+        if active in ('true', 'false'):
+            queryset = queryset.filter(active=(active == 'true'))
+        return queryset
+
 
 class AdminVendorToggleAPIView(APIView):
     """
@@ -180,13 +143,28 @@ class AdminVendorToggleAPIView(APIView):
             )
 
 
+@replica_read
 class AdminProductListAPIView(generics.ListAPIView):
     """
     GET: List all products with vendor information
+    Query params: ?search=<title> &status= &vendor=<id> &category=<id>
     """
     permission_classes = [IsAdminUser]
     serializer_class = AdminProductSerializer
-    queryset = Product.objects.all().select_related('vendor').order_by('-date')
+
+    def get_queryset(self):
+        queryset = Product.objects.select_related('vendor', 'category').order_by('-date')
+        params = self.request.query_params
+
+        if params.get('search'):
+            queryset = queryset.filter(title__icontains=params['search'])
+        if params.get('status'):
+            queryset = queryset.filter(status=params['status'])
+        if params.get('vendor'):
+            queryset = queryset.filter(vendor_id=params['vendor'])
+        if params.get('category'):
+            queryset = queryset.filter(category_id=params['category'])
+        return queryset
 
 
 class AdminProductToggleAPIView(APIView):
@@ -214,22 +192,67 @@ class AdminProductToggleAPIView(APIView):
             )
 
 
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose total uses estimated_count, so paging the full orders table skips COUNT(*)."""
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
+
+
+class AdminOrderPagination(PageNumberPagination):
+    django_paginator_class = EstimatedCountPaginator
+
+
+@replica_read
 class AdminOrderListAPIView(generics.ListAPIView):
     """
     GET: List all orders
     """
     permission_classes = [IsAdminUser]
     serializer_class = AdminOrderSerializer
-    queryset = CartOrder.objects.all().prefetch_related('vendor').order_by('-date')
-
+    pagination_class = AdminOrderPagination
 
+    def get_queryset(self):
+        """
+        Query params: ?search=<order id prefix or exact email> &payment_status= &order_status=
+        &start_date=YYYY-MM-DD &end_date=YYYY-MM-DD &vendor=<id>
+        Each filter is backed by an index on CartOrder (or the vendor M2M table).
+        """
+        queryset = CartOrder.objects.prefetch_related(
+            Prefetch('vendor', queryset=Vendor.objects.only('id', 'name'))
+        ).order_by('-date')
+        params = self.request.query_params
+
+        search = params.get('search', '').strip()
+        if search:
+            queryset = queryset.filter(Q(oid__startswith=search.upper()) | Q(email=search))
+        if params.get('payment_status'):
+            queryset = queryset.filter(payment_status=params['payment_status'])
+        if params.get('order_status'):
+            queryset = queryset.filter(order_status=params['order_status'])
+        start_date = _date_param(self.request, 'start_date')
+        if start_date:
+            queryset = queryset.filter(date__date__gte=start_date)
+        end_date = _date_param(self.request, 'end_date')
+        if end_date:
+            queryset = queryset.filter(date__date__lte=end_date)
+        if params.get('vendor'):
+            queryset = queryset.filter(vendor__id=params['vendor'])
+        return queryset
+
+
+@replica_read
 class AdminOrderDetailAPIView(generics.RetrieveAPIView):
     """
     GET: Get order details by OID
     """
     permission_classes = [IsAdminUser]
-    serializer_class = AdminOrderSerializer
-    queryset = CartOrder.objects.all().prefetch_related('vendor', 'orderitem')
+    serializer_class = AdminOrderDetailSerializer
+    queryset = CartOrder.objects.prefetch_related(
+        Prefetch('vendor', queryset=Vendor.objects.only('id', 'name')),
+        Prefetch('orderitem', queryset=CartOrderItem.objects.select_related('product', 'vendor')),
+    )
     lookup_field = 'oid'
 
 
@@ -277,25 +300,13 @@ class AdminReportsAPIView(APIView):
 
     def get_sales_report(self):
         """Generate sales report"""
-        total_sales = CartOrder.objects.filter(
-            payment_status='paid'
-        ).aggregate(total=Sum('total'))['total'] or 0
-
-        total_orders = CartOrder.objects.filter(payment_status='paid').count()
-        pending_orders = CartOrder.objects.filter(order_status='Pending').count()
-        delivered_orders = CartOrder.objects.filter(order_status='Delivered').count()
-        
-        # Count cancelled orders
-        cancelled_orders = CartOrder.objects.filter(
-            Q(payment_status='cancelled') | Q(order_status='Cancelled')
-        ).count()
-
+        stats = get_platform_stats()
         data = {
-            'total_sales': total_sales,
-            'total_orders': total_orders,
-            'pending_orders': pending_orders,
-            'delivered_orders': delivered_orders,
-            'cancelled_orders': cancelled_orders
+            'total_sales': stats.total_revenue,
+            'total_orders': stats.total_orders,
+            'pending_orders': stats.pending_orders,
+            'delivered_orders': stats.delivered_orders,
+            'cancelled_orders': stats.cancelled_orders
         }
 
         serializer = SalesReportSerializer(data)
@@ -314,11 +325,17 @@ class AdminReportsAPIView(APIView):
             total_orders=Count('order', distinct=True)
         ).order_by('-total_revenue')[:10]
 
+        # Product counts for all ten vendors in one grouped query
+        vendor_performance = list(vendor_performance)
+        product_counts = dict(
+            Product.objects.filter(vendor_id__in=[item['vendor__id'] for item in vendor_performance])
+            .values('vendor_id').annotate(count=Count('id')).values_list('vendor_id', 'count')
+        )
+
         data = []
         for item in vendor_performance:
             vendor_id = item['vendor__id']
-            # Fetch product count separately
-            total_products = Product.objects.filter(vendor_id=vendor_id).count()
+            total_products = product_counts.get(vendor_id, 0)
             
             data.append({
                 'vendor_id': vendor_id,
@@ -444,28 +461,7 @@ class BestSellingProductsAPIView(APIView):
 
     def get(self, request):
         period = request.query_params.get('period', 'monthly')
-        
-        # Calculate date range based on period
-        now = timezone.now()
-        if period == 'daily':
-            start_date = now - timedelta(days=30)
-        elif period == 'weekly':
-            start_date = now - timedelta(weeks=12)
-        elif period == 'yearly':
-            start_date = now - timedelta(days=365*3)
-        else:  # monthly (default)
-            start_date = now - timedelta(days=365)
-
-        # Get products with their sell count
-        best_products = CartOrderItem.objects.filter(
-            order__payment_status='paid',
-            order__date__gte=start_date
-        ).values(
-            'product__id', 'product__title', 'product__image',
-            'product__vendor__name', 'product__category__title', 'product__price'
-        ).annotate(
-            sell_count=Sum('qty')
-        ).order_by('-sell_count')[:10]
+        best_products = top_n('product', period)
 
         data = []
         for item in best_products:
@@ -497,28 +493,7 @@ class BestSellingCategoriesAPIView(APIView):
 
     def get(self, request):
         period = request.query_params.get('period', 'monthly')
-        
-        # Calculate date range based on period
-        now = timezone.now()
-        if period == 'daily':
-            start_date = now - timedelta(days=30)
-        elif period == 'weekly':
-            start_date = now - timedelta(weeks=12)
-        elif period == 'yearly':
-            start_date = now - timedelta(days=365*3)
-        else:  # monthly (default)
-            start_date = now - timedelta(days=365)
-
-        # Get categories with their sell count
-        best_categories = CartOrderItem.objects.filter(
-            order__payment_status='paid',
-            order__date__gte=start_date,
-            product__category__isnull=False
-        ).values(
-            'product__category__id', 'product__category__title', 'product__category__image'
-        ).annotate(
-            sell_count=Sum('qty')
-        ).order_by('-sell_count')[:10]
+        best_categories = top_n('category', period)
 
         data = []
         for item in best_categories:
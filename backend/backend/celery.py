@@ -9,5 +9,6 @@ app = Celery('backend')
 
 
 app.config_from_object('django.conf:settings', namespace='CELERY')
+# Queues/routes live in settings (CELERY_TASK_QUEUES / CELERY_TASK_ROUTES); worker commands per queue in notes.txt
 ###
 app.autodiscover_tasks()
\ No newline at end of file
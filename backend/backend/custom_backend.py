@@ -3,8 +3,11 @@ from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import base64
+import logging
 from email.mime.text import MIMEText
 
+log = logging.getLogger(__name__)
+
 class GmailBackend(BaseEmailBackend):
     def send_messages(self, email_messages):
         creds = Credentials.from_authorized_user_file('token.json', ['https://www.googleapis.com/auth/gmail.send'])
@@ -20,5 +23,5 @@ class GmailBackend(BaseEmailBackend):
                 service.users().messages().send(userId='me', body={'raw': raw}).execute()
                 sent_count += 1
             except HttpError as error:
-                print(f'An error occurred: {error}')
+                log.error("Gmail API send to %s failed: %s", mime_message['to'], error)
         return sent_count
\ No newline at end of file
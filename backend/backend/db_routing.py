@@ -0,0 +1,150 @@
+# backend/db_routing.py
+"""
+Read-replica routing. When DATABASES has a 'replica' alias:
+- views marked with @replica_read (catalog, search, dashboards, reports) read from it,
+- so does code inside `with replica_reads():` (report jobs in Celery),
+- everything else, and every write, uses 'default'.
+A client whose last write (cart, order, review...) is less than REPLICA_STICKY_SECONDS old reads
+from the primary even in marked views, so it sees its own changes despite replication lag.
+"""
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse
+
+REPLICA = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_routing = ContextVar('db_routing', default=None)
+
+
+@dataclass
+class Routing:
+    # Mutated rather than re-set, so the view middleware sees the request's object even when
+    # Django runs it through sync_to_async with a copied context
+    replica: bool = False
+
+
+def replica_read(view):
+    """Mark a view class or function as safe to serve from the replica."""
+    view.read_replica = True
+    return view
+
+
+@contextmanager
+def replica_reads():
+    """Reads in this block go to the replica (when there is one)."""
+    token = _routing.set(Routing(replica=True))
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+def _stream_from_replica(content):
+    """Keep a streamed body (CSV exports) on the replica; it is iterated after the view has returned."""
+    iterator = iter(content)
+    while True:
+        with replica_reads():
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+        yield chunk
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None and routing.replica and replica_configured():
+            return REPLICA
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def _sticky_key(request):
+    # JWT clients are told apart by their token, anonymous ones (guest carts) by address
+    client = request.headers.get('Authorization') or request.META.get('REMOTE_ADDR', '')
+    return 'replica:sticky:' + hashlib.sha1(client.encode()).hexdigest()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Switches marked views to the replica unless the client wrote something within
+    REPLICA_STICKY_SECONDS, and starts that window after every successful write request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sticky_seconds = settings.REPLICA_STICKY_SECONDS
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        routing = Routing()
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if self.wrote(request, response):
+            cache.set(_sticky_key(request), 1, self.sticky_seconds)
+        return self.finish(response, routing)
+
+    async def __acall__(self, request):
+        routing = Routing()
+        token = _routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if self.wrote(request, response):
+            await cache.aset(_sticky_key(request), 1, self.sticky_seconds)
+        return self.finish(response, routing)
+
+    @staticmethod
+    def finish(response, routing):
+        # FileResponse bodies (PDF/Excel exports) are already rendered to a file
+        if routing.replica and response.streaming and not response.is_async and not isinstance(response, FileResponse):
+            response.streaming_content = _stream_from_replica(response.streaming_content)
+        return response
+
+    @staticmethod
+    def wrote(request, response):
+        return request.method not in SAFE_METHODS and response.status_code < 400
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routing = _routing.get()
+        if routing is None or request.method not in SAFE_METHODS:
+            return None
+        view_class = getattr(view_func, 'view_class', None)
+        marked = getattr(view_func, 'read_replica', False) or getattr(view_class, 'read_replica', False)
+        if marked and cache.get(_sticky_key(request)) is None:
+            routing.replica = True
+        return None
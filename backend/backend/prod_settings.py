@@ -5,6 +5,9 @@ Django settings for backend project.
 import os
 from pathlib import Path
 from datetime import timedelta
+from kombu import Queue
+from celery.schedules import crontab
+from monitoring.logs import parse_levels
 from django.core.management.utils import get_random_secret_key
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,9 +50,13 @@ INSTALLED_APPS = [
     'vendor',
     'customer',
     'addon',
+    'admin_panel',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.RequestMetricsMiddleware',
+    'backend.db_routing.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -78,12 +85,36 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
+# Serve the hot read endpoints (product detail, guest tracking, has-purchased, cart merge) from
+# async views; only worth it when running under ASGI (uvicorn workers), see notes.txt
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', 'False') == 'True'
+# Server-Sent Events at /api/events/stream/ (ASGI only): new notifications and order status changes are
+# published to Redis pub/sub (EVENTS_REDIS_URL) and pushed to open dashboards. Set it for web and Celery alike
+EVENT_STREAM = os.environ.get('EVENT_STREAM', 'False') == 'True'
+EVENTS_REDIS_URL = os.environ.get('EVENTS_REDIS_URL', 'redis://localhost:6379/3')
+EVENTS_KEEPALIVE_SECONDS = int(os.environ.get('EVENTS_KEEPALIVE_SECONDS', 15))
 
 # Database
 
 
 
 
+# Connections: by default each thread keeps its connection for DB_CONN_MAX_AGE seconds.
+# DB_POOL=True uses psycopg 3's pool instead, one per process holding at most DB_POOL_MAX_SIZE
+# connections (default GUNICORN_THREADS, one per request thread), so PostgreSQL needs
+# max_connections above workers x max_size (+ Celery). Use the pool under ASGI, where
+# persistent connections are not reused. Either way a connection is checked before reuse.
+GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 4))
+DB_POOL = os.environ.get('DB_POOL', 'False') == 'True'
+DB_POOL_OPTIONS = {
+    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', GUNICORN_THREADS)),
+    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),  # seconds a request may wait for a connection
+    'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+}
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -92,8 +123,24 @@ DATABASES = {
         'PASSWORD': os.environ.get('RDS_PASSWORD'),
         'HOST': os.environ.get('RDS_HOSTNAME'),
         'PORT': os.environ.get('RDS_PORT'),
+        'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,  # the pool requires 0
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'pool': DB_POOL_OPTIONS} if DB_POOL else {},
+    }
     }
+
+# Read replica (see backend/db_routing.py), e.g. an RDS read replica endpoint. Marked read-only views and
+# report jobs read from it; REPLICA_STICKY_SECONDS after a client's own write its reads stay on the primary.
+DATABASE_REPLICA_HOST = os.environ.get('RDS_REPLICA_HOSTNAME', '')
+if DATABASE_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DATABASE_REPLICA_HOST,
+        'PORT': os.environ.get('RDS_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
     }
+DATABASE_ROUTERS = ['backend.db_routing.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
 
 
 # Password validation
@@ -222,7 +269,7 @@ CORS_EXPOSE_HEADERS = ['Content-Type', 'X-CSRFToken']
 CORS_ALLOW_ALL_ORIGINS = False
 
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = 'monitoring.mail.CountingEmailBackend'  # SMTP, counting sent mails for /metrics
 EMAIL_HOST = os.environ.get('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = int(os.environ.get('EMAIL_PORT',  587))
 EMAIL_USE_TLS = True
@@ -239,40 +286,54 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Logging: LOG_LEVEL for everything, LOG_LEVELS overrides per logger ("store.views=WARNING,monitoring=DEBUG"),
+# LOG_FORMAT text|json (json = one object per line with the extra={...} fields, for log shippers).
+# LOG_SAMPLE_RATE keeps that share of the per-request "monitoring.middleware" INFO lines; warnings always pass.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+LOG_LEVELS = parse_levels(os.environ.get('LOG_LEVELS', ''))
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {message}',
+        'text': {
+            'format': '{levelname} {asctime} {name} {message}',
             'style': '{',
         },
-        'simple': {
-            'format': '{levelname} {message}',
-            'style': '{',
+        'json': {
+            '()': 'monitoring.logs.JSONFormatter',
+        },
+    },
+    'filters': {
+        'sample': {
+            '()': 'monitoring.logs.SamplingFilter',
+            'rate': LOG_SAMPLE_RATE,
         },
     },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            'formatter': LOG_FORMAT,
         },
     },
     'loggers': {
-        'customer': {
+        'django.request': {
             'handlers': ['console'],
-            'level': 'INFO',
+            'level': 'WARNING',
             'propagate': False,
         },
-        'django.request': {
+        'monitoring.middleware': {
             'handlers': ['console'],
-            'level': 'DEBUG',
+            'filters': ['sample'],
             'propagate': False,
         },
+        **{name: {'handlers': ['console'], 'level': level, 'propagate': False} for name, level in LOG_LEVELS.items()},
     },
     'root': {
         'handlers': ['console'],
-        'level': 'INFO',
+        'level': LOG_LEVEL,
     },
 }
 
@@ -294,6 +355,44 @@ CSRF_TRUSTED_ORIGINS = [
     "https://api.retrorelics.live",
 ] 
 
+# Serve huge unfiltered admin counts (e.g. all orders) from PostgreSQL's reltuples estimate
+ADMIN_ESTIMATED_COUNTS = os.environ.get('ADMIN_ESTIMATED_COUNTS', 'False') == 'True'
+
+# archive_history: never-paid orders, seen notifications and non-refund wallet transactions older than ARCHIVE_AFTER_MONTHS
+# are moved, one month at a time, into gzipped fixtures under ARCHIVE_DIR (restorable with loaddata)
+ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', str(BASE_DIR / 'archive'))
+ARCHIVE_AFTER_MONTHS = int(os.environ.get('ARCHIVE_AFTER_MONTHS', 12))
+
+# Per-request metrics (Server-Timing header + one log line per request). With REQUEST_PROFILING on,
+# a sample of requests runs under cProfile and the slow ones are saved to REQUEST_PROFILE_DIR
+REQUEST_METRICS = os.environ.get('REQUEST_METRICS', 'True') == 'True'
+REQUEST_PROFILING = os.environ.get('REQUEST_PROFILING', 'False') == 'True'
+REQUEST_PROFILING_SAMPLE_RATE = float(os.environ.get('REQUEST_PROFILING_SAMPLE_RATE', 0.1))
+REQUEST_SLOW_MS = int(os.environ.get('REQUEST_SLOW_MS', 500))
+REQUEST_PROFILE_DIR = os.environ.get('REQUEST_PROFILE_DIR', str(BASE_DIR / 'profiles'))
+
+# Prometheus metrics at /metrics. Each process buffers samples and a background thread adds them into Redis
+# every METRICS_FLUSH_INTERVAL seconds, so all gunicorn and Celery workers report one set of totals.
+# /metrics answers scrapers with the METRICS_TOKEN bearer token or from METRICS_ALLOWED_IPS (comma-separated
+# addresses/networks as seen in REMOTE_ADDR); everyone else gets a 403
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+METRICS_REDIS_URL = os.environ.get('METRICS_REDIS_URL', 'redis://localhost:6379/2')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')  # if set, scrapers send "Authorization: Bearer <token>"
+METRICS_ALLOWED_IPS = os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1')
+
+# Cache (dashboard summaries and other short-lived read models); db 1 keeps it apart from the Celery broker.
+# Setting REDIS_CACHE_URL empty falls back to a per-process in-memory cache
+REDIS_CACHE_URL = os.environ.get('REDIS_CACHE_URL', 'redis://localhost:6379/1')
+CACHES = {
+    'default': {
+        'BACKEND': 'monitoring.cache.InstrumentedRedisCache' if REDIS_CACHE_URL else 'monitoring.cache.InstrumentedLocMemCache',
+        'LOCATION': REDIS_CACHE_URL or 'vector',
+        'KEY_PREFIX': 'vector',
+        'TIMEOUT': 300,
+    }
+}
+
 # Celery Configuration
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
@@ -301,4 +400,54 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Kolkata'  # Matches UTC+5:30
-CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
\ No newline at end of file
+CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+
+# Queues: 'transactional' (OTP, password reset; picked per call with userauth.tasks.TRANSACTIONAL)
+# must never wait behind bulk work,
+# 'notifications' (order/referral mails), 'reports' (exports) and 'maintenance'
+# (snapshots, stats refresh). Each gets its own worker (ProcFile, notes.txt): a long export on
+# 'reports' must not hold back the every-minute maintenance jobs.
+CELERY_TASK_QUEUES = (
+    Queue('transactional', routing_key='transactional'),
+    Queue('notifications', routing_key='notifications'),
+    Queue('reports', routing_key='reports'),
+    Queue('maintenance', routing_key='maintenance'),
+)
+CELERY_TASK_DEFAULT_QUEUE = 'notifications'
+CELERY_TASK_ROUTES = {
+    'userauth.tasks.send_async_email': {'queue': 'notifications'},
+    'userauth.tasks.send_async_multipart_email': {'queue': 'notifications'},
+    'vendor.tasks.generate_report_job': {'queue': 'reports'},
+    'vendor.tasks.snapshot_vendor_balances': {'queue': 'maintenance'},
+    'admin_panel.tasks.refresh_platform_stats': {'queue': 'maintenance'},
+}
+CELERY_TASK_DEFAULT_PRIORITY = 5  # Redis transport: 0 is the highest priority
+# Ack only after the task ran, so a killed worker hands the message back instead of losing it.
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    # Must be longer than the slowest task, otherwise Redis redelivers it while still running.
+    'visibility_timeout': 60 * 60,
+    'queue_order_strategy': 'priority',
+    'priority_steps': list(range(10)),
+}
+
+# Periodic jobs, run with: celery -A backend beat -l INFO
+CELERY_BEAT_SCHEDULE = {
+    'snapshot-vendor-balances': {
+        'task': 'vendor.tasks.snapshot_vendor_balances',
+        'schedule': crontab(minute=0),  # hourly
+    },
+    'refresh-platform-stats': {
+        'task': 'admin_panel.tasks.refresh_platform_stats',
+        'schedule': crontab(),  # every minute, totals from the daily rollups only
+        'kwargs': {'statuses': False},
+        'options': {'expires': 55},  # a run still queued when the next is due is dropped, not stacked
+    },
+    'refresh-platform-order-statuses': {
+        'task': 'admin_panel.tasks.refresh_platform_stats',
+        'schedule': crontab(minute=30),  # hourly, also recounts orders by status
+        'options': {'expires': 3000},
+    },
+}
@@ -13,6 +13,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
+from kombu import Queue
+from celery.schedules import crontab
+from monitoring.logs import parse_levels
 #timedelta represents a duration, the difference between two dates or times.
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,9 +56,13 @@ INSTALLED_APPS = [
     'vendor',
     'customer',
     'addon',
+    'admin_panel',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.RequestMetricsMiddleware',
+    'backend.db_routing.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -84,11 +91,35 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
+# Serve the hot read endpoints (product detail, guest tracking, has-purchased, cart merge) from
+# async views; only worth it when running under ASGI (uvicorn workers), see notes.txt
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=False, cast=bool)
+# Server-Sent Events at /api/events/stream/ (ASGI only): new notifications and order status changes are
+# published to Redis pub/sub (EVENTS_REDIS_URL) and pushed to open dashboards. Set it for web and Celery alike
+EVENT_STREAM = config('EVENT_STREAM', default=False, cast=bool)
+EVENTS_REDIS_URL = config('EVENTS_REDIS_URL', default='redis://localhost:6379/3')
+EVENTS_KEEPALIVE_SECONDS = config('EVENTS_KEEPALIVE_SECONDS', default=15, cast=int)
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connections: by default each thread keeps its connection for DB_CONN_MAX_AGE seconds.
+# DB_POOL=True uses psycopg 3's pool instead, one per process holding at most DB_POOL_MAX_SIZE
+# connections (default GUNICORN_THREADS, one per request thread), so PostgreSQL needs
+# max_connections above workers x max_size (+ Celery). Use the pool under ASGI, where
+# persistent connections are not reused. Either way a connection is checked before reuse.
+GUNICORN_THREADS = config('GUNICORN_THREADS', default=4, cast=int)
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+DB_POOL_OPTIONS = {
+    'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+    'max_size': config('DB_POOL_MAX_SIZE', default=GUNICORN_THREADS, cast=int),
+    'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),  # seconds a request may wait for a connection
+    'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+}
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60, cast=int)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -97,9 +128,28 @@ DATABASES = {
         'PASSWORD': config('DATABASE_PASSWORD'),
         'HOST': 'localhost',
         'PORT': '5432',
+        'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,  # the pool requires 0
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'pool': DB_POOL_OPTIONS} if DB_POOL else {},
     }
 }
 
+# Read replica (see backend/db_routing.py): set DATABASE_REPLICA_HOST, or DATABASE_REPLICA_NAME for a second
+# local database. Marked read-only views and report jobs read from it; REPLICA_STICKY_SECONDS after a client's
+# own write its reads stay on the primary.
+DATABASE_REPLICA_HOST = config('DATABASE_REPLICA_HOST', default='')
+DATABASE_REPLICA_NAME = config('DATABASE_REPLICA_NAME', default='')
+if DATABASE_REPLICA_HOST or DATABASE_REPLICA_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DATABASE_REPLICA_HOST or DATABASES['default']['HOST'],
+        'PORT': config('DATABASE_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'NAME': DATABASE_REPLICA_NAME or DATABASES['default']['NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['backend.db_routing.ReplicaRouter']
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -208,7 +258,7 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = 'monitoring.mail.CountingEmailBackend'  # SMTP, counting sent mails for /metrics
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = True
@@ -228,49 +278,152 @@ REST_FRAMEWORK = {
 }
 
 
+# Logging: LOG_LEVEL for everything, LOG_LEVELS overrides per logger ("store.views=WARNING,monitoring=DEBUG"),
+# LOG_FORMAT text|json (json = one object per line with the extra={...} fields, for log shippers).
+# LOG_SAMPLE_RATE keeps that share of the per-request "monitoring.middleware" INFO lines; warnings always pass.
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+LOG_FORMAT = config('LOG_FORMAT', default='text')
+LOG_LEVELS = parse_levels(config('LOG_LEVELS', default=''))
+LOG_SAMPLE_RATE = config('LOG_SAMPLE_RATE', default=1.0, cast=float)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {message}',
+        'text': {
+            'format': '{levelname} {asctime} {name} {message}',
             'style': '{',
         },
-        'simple': {
-            'format': '{levelname} {message}',
-            'style': '{',
+        'json': {
+            '()': 'monitoring.logs.JSONFormatter',
+        },
+    },
+    'filters': {
+        'sample': {
+            '()': 'monitoring.logs.SamplingFilter',
+            'rate': LOG_SAMPLE_RATE,
         },
     },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            'formatter': LOG_FORMAT,
         },
     },
     'loggers': {
-        'customer': {  # This should match your app name
+        'django.request': {
             'handlers': ['console'],
-            'level': 'INFO',
+            'level': 'WARNING',
             'propagate': False,
         },
-        'django.request': {
+        'monitoring.middleware': {
             'handlers': ['console'],
-            'level': 'DEBUG',
+            'filters': ['sample'],
             'propagate': False,
         },
+        **{name: {'handlers': ['console'], 'level': level, 'propagate': False} for name, level in LOG_LEVELS.items()},
     },
     'root': {
         'handlers': ['console'],
-        'level': 'INFO',
+        'level': LOG_LEVEL,
     },
 }
 
+# Serve huge unfiltered admin counts (e.g. all orders) from PostgreSQL's reltuples estimate
+ADMIN_ESTIMATED_COUNTS = config('ADMIN_ESTIMATED_COUNTS', default=False, cast=bool)
+
+# archive_history: never-paid orders, seen notifications and non-refund wallet transactions older than ARCHIVE_AFTER_MONTHS
+# are moved, one month at a time, into gzipped fixtures under ARCHIVE_DIR (restorable with loaddata)
+ARCHIVE_DIR = config('ARCHIVE_DIR', default=str(BASE_DIR / 'archive'))
+ARCHIVE_AFTER_MONTHS = config('ARCHIVE_AFTER_MONTHS', default=12, cast=int)
+
+# Per-request metrics (Server-Timing header + one log line per request). With REQUEST_PROFILING on,
+# a sample of requests runs under cProfile and the slow ones are saved to REQUEST_PROFILE_DIR
+REQUEST_METRICS = config('REQUEST_METRICS', default=True, cast=bool)
+REQUEST_PROFILING = config('REQUEST_PROFILING', default=False, cast=bool)
+REQUEST_PROFILING_SAMPLE_RATE = config('REQUEST_PROFILING_SAMPLE_RATE', default=0.1, cast=float)
+REQUEST_SLOW_MS = config('REQUEST_SLOW_MS', default=500, cast=int)
+REQUEST_PROFILE_DIR = config('REQUEST_PROFILE_DIR', default=str(BASE_DIR / 'profiles'))
+
+# Prometheus metrics at /metrics. Each process buffers samples and a background thread adds them into Redis
+# every METRICS_FLUSH_INTERVAL seconds, so all gunicorn and Celery workers report one set of totals.
+# /metrics answers scrapers with the METRICS_TOKEN bearer token or from METRICS_ALLOWED_IPS (comma-separated
+# addresses/networks as seen in REMOTE_ADDR); everyone else gets a 403
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_REDIS_URL = config('METRICS_REDIS_URL', default='redis://localhost:6379/2')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')  # if set, scrapers send "Authorization: Bearer <token>"
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1')
+
+# Cache (dashboard summaries and other short-lived read models). Set REDIS_CACHE_URL (e.g. redis://localhost:6379/1,
+# db 1 keeps it apart from the Celery broker) to share it between processes; without it each process keeps its
+# own in-memory cache, enough for runserver and the test suite
+REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'monitoring.cache.InstrumentedRedisCache' if REDIS_CACHE_URL else 'monitoring.cache.InstrumentedLocMemCache',
+        'LOCATION': REDIS_CACHE_URL or 'vector',
+        'KEY_PREFIX': 'vector',
+        'TIMEOUT': 300,
+    }
+}
+
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 
+# Queues: 'transactional' (OTP, password reset; picked per call with userauth.tasks.TRANSACTIONAL)
+# must never wait behind bulk work,
+# 'notifications' (order/referral mails), 'reports' (exports) and 'maintenance'
+# (snapshots, stats refresh). Each gets its own worker (ProcFile, notes.txt): a long export on
+# 'reports' must not hold back the every-minute maintenance jobs.
+CELERY_TASK_QUEUES = (
+    Queue('transactional', routing_key='transactional'),
+    Queue('notifications', routing_key='notifications'),
+    Queue('reports', routing_key='reports'),
+    Queue('maintenance', routing_key='maintenance'),
+)
+CELERY_TASK_DEFAULT_QUEUE = 'notifications'
+CELERY_TASK_ROUTES = {
+    'userauth.tasks.send_async_email': {'queue': 'notifications'},
+    'userauth.tasks.send_async_multipart_email': {'queue': 'notifications'},
+    'vendor.tasks.generate_report_job': {'queue': 'reports'},
+    'vendor.tasks.snapshot_vendor_balances': {'queue': 'maintenance'},
+    'admin_panel.tasks.refresh_platform_stats': {'queue': 'maintenance'},
+}
+CELERY_TASK_DEFAULT_PRIORITY = 5  # Redis transport: 0 is the highest priority
+# Ack only after the task ran, so a killed worker hands the message back instead of losing it.
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    # Must be longer than the slowest task, otherwise Redis redelivers it while still running.
+    'visibility_timeout': 60 * 60,
+    'queue_order_strategy': 'priority',
+    'priority_steps': list(range(10)),
+}
+
+# Periodic jobs, run with: celery -A backend beat -l INFO
+CELERY_BEAT_SCHEDULE = {
+    'snapshot-vendor-balances': {
+        'task': 'vendor.tasks.snapshot_vendor_balances',
+        'schedule': crontab(minute=0),  # hourly
+    },
+    'refresh-platform-stats': {
+        'task': 'admin_panel.tasks.refresh_platform_stats',
+        'schedule': crontab(),  # every minute, totals from the daily rollups only
+        'kwargs': {'statuses': False},
+        'options': {'expires': 55},  # a run still queued when the next is due is dropped, not stacked
+    },
+    'refresh-platform-order-statuses': {
+        'task': 'admin_panel.tasks.refresh_platform_stats',
+        'schedule': crontab(minute=30),  # hourly, also recounts orders by status
+        'options': {'expires': 3000},
+    },
+}
+
 
 
 
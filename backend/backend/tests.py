@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from backend.db_routing import ReplicaRouter, ReplicaRoutingMiddleware, replica_read, replica_reads
+from monitoring.budgets import ISOLATED_CACHES
+
+router = ReplicaRouter()
+
+
+@replica_read
+def marked_view(request):
+    return HttpResponse()
+
+
+def unmarked_view(request):
+    return HttpResponse()
+
+
+@mock.patch('backend.db_routing.replica_configured', return_value=True)
+class ReplicaRouterTests(SimpleTestCase):
+
+    def test_reads_use_the_primary_by_default(self, configured):
+        self.assertEqual(router.db_for_read(None), 'default')
+
+    def test_replica_reads_block(self, configured):
+        with replica_reads():
+            self.assertEqual(router.db_for_read(None), 'replica')
+            self.assertEqual(router.db_for_write(None), 'default')
+        self.assertEqual(router.db_for_read(None), 'default')
+
+    def test_no_replica_configured(self, configured):
+        configured.return_value = False
+        with replica_reads():
+            self.assertEqual(router.db_for_read(None), 'default')
+
+
+@override_settings(CACHES=ISOLATED_CACHES, REPLICA_STICKY_SECONDS=10)
+@mock.patch('backend.db_routing.replica_configured', return_value=True)
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    """The alias the view's reads went to, for requests through ReplicaRoutingMiddleware."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def serve(self, method, view, status=200, client='Bearer a'):
+        served = {}
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            served['alias'] = router.db_for_read(None)
+            return HttpResponse(status=status)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware(getattr(self.factory, method)('/', HTTP_AUTHORIZATION=client))
+        return served['alias']
+
+    def test_marked_views_read_from_the_replica(self, configured):
+        self.assertEqual(self.serve('get', marked_view), 'replica')
+        self.assertEqual(self.serve('get', unmarked_view), 'default')
+        self.assertEqual(self.serve('post', marked_view), 'default')
+        self.assertEqual(router.db_for_read(None), 'default')  # nothing leaks past the request
+
+    def test_writer_sticks_to_the_primary(self, configured):
+        self.serve('post', unmarked_view)
+        self.assertEqual(self.serve('get', marked_view), 'default')
+        self.assertEqual(self.serve('get', marked_view, client='Bearer b'), 'replica')
+
+    def test_failed_write_does_not_stick(self, configured):
+        self.serve('post', unmarked_view, status=400)
+        self.assertEqual(self.serve('get', marked_view), 'replica')
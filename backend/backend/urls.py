@@ -11,6 +11,7 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 
 from drf_yasg import openapi
+from monitoring.views import metrics_view
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -37,6 +38,7 @@ urlpatterns = [
     path('api/', include('customer.urls')),
     path('api/', include('vendor.urls')),
     path('api/admin/', include('admin_panel.urls')),
+    path('metrics', metrics_view, name='metrics'),
     
 ]
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,3 +1,65 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from userauth.models import User, WalletTransaction
+
+
+class WalletTransactionListTests(TestCase):
+    """The customer wallet history: cursor pages newest first, filtered by an inclusive date range."""
+
+    def setUp(self):
+        self.user = User.objects.create(email='buyer@example.com')
+        self.wallet = self.user.wallet
+        for n in range(5):
+            self.wallet.deposit(Decimal(n + 1), description=f'deposit {n}')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/customer/wallet/transactions/{self.user.id}/'
+
+    def ids(self, response):
+        return [t['id'] for t in response.json()['transactions']]
+
+    def at(self, transaction, day, hour):
+        WalletTransaction.objects.filter(pk=transaction.pk).update(
+            created_at=timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)))
+
+    def test_cursor_pages_are_stable_while_rows_arrive(self):
+        newest_first = list(WalletTransaction.objects.order_by('-id').values_list('id', flat=True))
+        first = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(self.ids(first), newest_first[:2])
+
+        self.wallet.deposit(Decimal('100.00'), description='arrived between pages')
+        second = self.client.get(first.json()['next'])
+        third = self.client.get(second.json()['next'])
+        # No row repeated or skipped; the new one is on a fresh first page, not pushed into this walk
+        self.assertEqual(self.ids(second) + self.ids(third), newest_first[2:])
+        self.assertIsNone(third.json()['next'])
+        newest = WalletTransaction.objects.latest('id').id
+        self.assertEqual(self.ids(self.client.get(self.url, {'page_size': 2}))[0], newest)
+
+    def test_date_range_includes_both_ends(self):
+        transactions = list(WalletTransaction.objects.order_by('id'))
+        start = timezone.localdate() - timedelta(days=10)
+        for transaction, (days, hour) in zip(transactions, ((-1, 23), (0, 0), (1, 12), (2, 23), (3, 0))):
+            self.at(transaction, start + timedelta(days=days), hour)
+
+        response = self.client.get(self.url, {'start_date': start.isoformat(),
+                                              'end_date': (start + timedelta(days=2)).isoformat()})
+        self.assertEqual(response.status_code, 200)
+        # 00:00 on the first day through 23:00 on the last, in the site's time zone
+        self.assertEqual(self.ids(response), [t.id for t in reversed(transactions[1:4])])
+
+    def test_malformed_dates(self):
+        for params in ({'start_date': '2025-13-01'}, {'end_date': '01/02/2025'}, {'start_date': 'yesterday'}):
+            with self.subTest(params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "Dates must be YYYY-MM-DD"})
 
-# Create your tests here.
+    def test_other_users_history_is_refused(self):
+        other = User.objects.create(email='other@example.com')
+        self.assertEqual(self.client.get(f'/api/customer/wallet/transactions/{other.id}/').status_code, 403)
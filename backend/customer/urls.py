@@ -1,6 +1,7 @@
 from django.urls import path
 from .views import OrdersAPIView, OrdersDetailAPIView, WishlistCreateAPIView, WishlistAPIView
 from .views import CustomerNotificationView, CustomerUpdateView, MarkNotificationsAsSeen
+from .views import CustomerNotificationSummaryView, CustomerNotificationsMarkSeenView
 from .views import WalletView, DepositView, VerifyPaymentView, WithdrawView, CustomerWalletTransactionsView
 
  # Customer API Endpoints
@@ -10,6 +11,8 @@ urlpatterns = [
     path('customer/wishlist/create/', WishlistCreateAPIView.as_view(), name='customer-wishlist-create'),
     path('customer/wishlist/<user_id>/', WishlistAPIView.as_view(), name='customer-wishlist'),
     path('customer/notifications/<user_id>/', CustomerNotificationView.as_view(), name='customer-notification'),
+    path('customer/notifications/<user_id>/summary/', CustomerNotificationSummaryView.as_view(), name='customer-notification-summary'),
+    path('customer/notifications/<user_id>/mark-seen/', CustomerNotificationsMarkSeenView.as_view(), name='customer-notification-mark-seen'),
     path('customer/notifications/<user_id>/<noti_id>/', MarkNotificationsAsSeen.as_view(), name='customer-notification'),
     path('customer/setting/<int:user_id>/', CustomerUpdateView.as_view(), name='customer-settings'),
     path('customer/wallet/<int:user_id>/', WalletView.as_view(), name='customer-wallet'),
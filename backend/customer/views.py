@@ -3,6 +3,7 @@ from django.db.models import Q
 import logging
 from django.conf import settings
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
 # Restframework Packages
 from rest_framework.response import Response
@@ -10,10 +11,12 @@ from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from rest_framework.views import APIView
+from rest_framework.pagination import CursorPagination
 
 # Serializers
 from userauth.serializers import ProfileSerializer
-from store.serializers import CartOrderSerializer, WishlistSerializer, NotificationSerializer
+from store.serializers import CartOrderSerializer, WishlistSerializer, NotificationSerializer, NotificationBulkSeenSerializer
+from store.notifications import counts as notification_counts, mark_seen, select
 
 # Models
 from userauth.models import Profile, User, Wallet, WalletTransaction
@@ -21,6 +24,7 @@ from store.models import Product, CartOrder, Wishlist, Notification
 
 import razorpay
 from decimal import Decimal
+from datetime import datetime, timedelta
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -32,27 +36,16 @@ class OrdersAPIView(generics.ListAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        logger.info("=" * 50)
-        logger.info("OrdersAPIView - get_queryset called")
-        logger.info(f"User authenticated: {self.request.user.is_authenticated}")
-        logger.info(f"Current user: {self.request.user}")
-        logger.info(f"User ID: {self.request.user.id if self.request.user.is_authenticated else 'None'}")
-        logger.info(f"Auth header: {self.request.META.get('HTTP_AUTHORIZATION', 'No auth header')}")
-        
         user_id = self.kwargs['user_id']
-        logger.info(f"Requested user_id from URL: {user_id}")
-        
         try:
             user = User.objects.get(id=user_id)
-            logger.info(f"Found user: {user.username} (ID: {user.id})")
         except User.DoesNotExist:
-            logger.error(f"User with ID {user_id} does not exist")
+            logger.warning("Orders requested for missing user %s", user_id)
             raise
 
         orders = CartOrder.objects.filter(
             Q(buyer=user) & (Q(payment_status="paid") | Q(payment_status="processing") | Q(payment_status="cancelled")))
-        logger.info(f"Found {orders.count()} orders for user {user.username}")
-        logger.info("=" * 50)
+        logger.debug("Listing orders for user %s", user_id)
         return orders
 
 
@@ -62,20 +55,12 @@ class OrdersDetailAPIView(generics.RetrieveAPIView):
     lookup_field = 'user_id'
 
     def get_object(self):
-        logger.info("=" * 50)
-        logger.info("OrdersDetailAPIView - get_object called")
-        logger.info(f"User authenticated: {self.request.user.is_authenticated}")
-        logger.info(f"Current user: {self.request.user}")
-        
         user_id = self.kwargs['user_id']
         order_oid = self.kwargs['order_oid']
-        logger.info(f"Requested user_id: {user_id}, order_oid: {order_oid}")
-
         try:
             user = User.objects.get(id=user_id)
-            logger.info(f"Found user: {user.username}")
         except User.DoesNotExist:
-            logger.error(f"User with ID {user_id} does not exist")
+            logger.warning("Order %s requested for missing user %s", order_oid, user_id)
             raise
 
         try:
@@ -84,12 +69,9 @@ class OrdersDetailAPIView(generics.RetrieveAPIView):
                 buyer=user,
                 oid=order_oid
             )
-            logger.info(f"Found order: {order.oid}")
         except CartOrder.DoesNotExist:
-            logger.error(f"Order {order_oid} not found for user {user.username}")
+            logger.warning("Order %s not found for user %s", order_oid, user_id)
             raise
-        
-        logger.info("=" * 50)
         return order
 
     
@@ -98,46 +80,33 @@ class WishlistCreateAPIView(generics.CreateAPIView):
     permission_classes = (IsAuthenticated,)
 
     def create(self, request):
-        logger.info("=" * 50)
-        logger.info("WishlistCreateAPIView - create called")
-        logger.info(f"User authenticated: {request.user.is_authenticated}")
-        logger.info(f"Current user: {request.user}")
-        
         payload = request.data
-        logger.info(f"Payload received: {payload}")
-
         product_id = payload['product_id']
         user_id = payload['user_id']
-        logger.info(f"Product ID: {product_id}, User ID: {user_id}")
 
         try:
             product = Product.objects.get(id=product_id)
-            logger.info(f"Found product: {product.title}")
         except Product.DoesNotExist:
-            logger.error(f"Product with ID {product_id} does not exist")
+            logger.warning("Wishlist toggle for missing product %s", product_id)
             raise
 
         try:
             user = User.objects.get(id=user_id)
-            logger.info(f"Found user: {user.username}")
         except User.DoesNotExist:
-            logger.error(f"User with ID {user_id} does not exist")
+            logger.warning("Wishlist toggle for missing user %s", user_id)
             raise
 
         wishlist = Wishlist.objects.filter(product=product, user=user)
         if wishlist.exists():
-            logger.info(f"Wishlist item exists, deleting for user {user.username}")
             wishlist.delete()
-            logger.info("=" * 50)
+            logger.debug("Product %s removed from wishlist of user %s", product_id, user_id)
             return Response({"message": "Removed From Wishlist"}, status=status.HTTP_200_OK)
         else:
-            logger.info(f"Creating new wishlist item for user {user.username}")
-            wishlist = Wishlist.objects.create(
+            Wishlist.objects.create(
                 product=product,
                 user=user,
             )
-            logger.info(f"Wishlist item created with ID: {wishlist.id}")
-            logger.info("=" * 50)
+            logger.debug("Product %s added to wishlist of user %s", product_id, user_id)
             return Response({"message": "Added To Wishlist"}, status=status.HTTP_201_CREATED)
 
         
@@ -146,30 +115,18 @@ class WishlistAPIView(generics.ListAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        logger.info("=" * 50)
-        logger.info("WishlistAPIView - get_queryset called")
-        logger.info(f"User authenticated: {self.request.user.is_authenticated}")
-        logger.info(f"Current user: {self.request.user}")
-        
         user_id = self.kwargs['user_id']
-        logger.info(f"Requested user_id: {user_id}")
-        
         if not str(user_id).isdigit():
-            logger.warning(f"Invalid user_id format: {user_id}")
-            logger.info("=" * 50)
+            logger.warning("Invalid user_id format: %s", user_id)
             return Wishlist.objects.none()
         
         try:
             user = User.objects.get(id=user_id)
-            logger.info(f"Found user: {user.username}")
         except User.DoesNotExist:
-            logger.error(f"User with ID {user_id} does not exist")
+            logger.warning("Wishlist requested for missing user %s", user_id)
             raise
 
-        wishlist = Wishlist.objects.filter(user=user)
-        logger.info(f"Found {wishlist.count()} wishlist items for user {user.username}")
-        logger.info("=" * 50)
-        return wishlist
+        return Wishlist.objects.filter(user=user)
 
 
 class CustomerNotificationView(generics.ListAPIView):
@@ -196,28 +153,51 @@ class CustomerNotificationView(generics.ListAPIView):
 
     
 class MarkNotificationsAsSeen(generics.RetrieveAPIView):
+    """
+    GET /api/customer/notifications/<user_id>/<noti_id>/
+    The notification; POST toggles its seen flag (GET used to, on every fetch).
+    """
     serializer_class = NotificationSerializer
     permission_classes = (IsAuthenticated,)
     
     def get_object(self):
-        user_id = self.kwargs['user_id']
-        noti_id = self.kwargs['noti_id']
+        return get_object_or_404(Notification, id=self.kwargs['noti_id'], user_id=self.kwargs['user_id'])
 
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            raise
+    def post(self, request, *args, **kwargs):
+        notification = self.get_object()
+        notification.seen = not notification.seen
+        notification.save(update_fields=['seen'])
+        return Response(self.get_serializer(notification).data)
 
-        try:
-            notification = Notification.objects.get(id=noti_id, user=user)
-        except Notification.DoesNotExist:
-            raise
 
-        # Toggle seen status
-        notification.seen = not notification.seen
-        notification.save()
-        
-        return notification
+class CustomerNotificationSummaryView(APIView):
+    """
+    GET /api/customer/notifications/<user_id>/summary/
+    Unread/read/all counts for the bell badge, from the user's counter row.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, user_id):
+        user = get_object_or_404(User, id=user_id)
+        return Response(notification_counts(user=user))
+
+
+class CustomerNotificationsMarkSeenView(APIView):
+    """
+    POST /api/customer/notifications/<user_id>/mark-seen/
+    Marks the user's notifications seen (or unseen with "seen": false) in one UPDATE: all of
+    them, the given "ids", or those from "since" to "until" (YYYY-MM-DD). Returns the new counts.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, user_id):
+        user = get_object_or_404(User, id=user_id)
+        serializer = NotificationBulkSeenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        notifications = select(Notification.objects.all(), data.get('ids'), data.get('since'), data.get('until'))
+        updated = mark_seen(notifications, data['seen'], user=user)
+        return Response({'updated': updated, **notification_counts(user=user)})
 
 
 class CustomerUpdateView(generics.RetrieveUpdateAPIView):
@@ -226,30 +206,18 @@ class CustomerUpdateView(generics.RetrieveUpdateAPIView):
     permission_classes = (IsAuthenticated,)
     
     def get_object(self):
-        logger.info("=" * 50)
-        logger.info("CustomerUpdateView - get_object called")
-        logger.info(f"User authenticated: {self.request.user.is_authenticated}")
-        logger.info(f"Current user: {self.request.user}")
-        logger.info(f"Request method: {self.request.method}")
-        
         user_id = self.kwargs['user_id']
-        logger.info(f"Requested user_id: {user_id}")
-        
         try:
             user = User.objects.get(id=user_id)
-            logger.info(f"Found user: {user.username}")
         except User.DoesNotExist:
-            logger.error(f"User with ID {user_id} does not exist")
+            logger.warning("Profile requested for missing user %s", user_id)
             raise
         
         try:
             profile = Profile.objects.get(user=user)
-            logger.info(f"Found profile for user: {user.username}")
         except Profile.DoesNotExist:
-            logger.error(f"Profile not found for user {user.username}")
+            logger.error("Profile missing for user %s", user_id)
             raise
-        
-        logger.info("=" * 50)
         return profile
     
 #------Wallet views--------------
@@ -344,8 +312,19 @@ class WithdrawView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class WalletTransactionCursorPagination(CursorPagination):
+    """Keyset pagination on (created_at, id): page N costs the same as page 1."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
 class CustomerWalletTransactionsView(APIView):
-    """List all wallet transactions for a customer."""
+    """
+    List wallet transactions for a customer, newest first, cursor-paginated.
+    GET /customer/wallet/transactions/<user_id>/?type=&start_date=YYYY-MM-DD&end_date=YYYY-MM-DD&cursor=
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, user_id):
@@ -356,15 +335,31 @@ class CustomerWalletTransactionsView(APIView):
 
         transactions = WalletTransaction.objects.filter(
             wallet=wallet
-        ).select_related('related_order', 'related_order_item').order_by('-created_at')
+        ).select_related('related_order')
 
         # Optional type filter
         type_filter = request.query_params.get('type')
         if type_filter:
             transactions = transactions.filter(transaction_type=type_filter)
 
+        # Optional date range; compared as datetimes so the (wallet, created_at) index is used
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        try:
+            if start_date:
+                start = datetime.strptime(start_date, '%Y-%m-%d')
+                transactions = transactions.filter(created_at__gte=timezone.make_aware(start))
+            if end_date:
+                end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+                transactions = transactions.filter(created_at__lt=timezone.make_aware(end))
+        except ValueError:
+            return Response({"error": "Dates must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = WalletTransactionCursorPagination()
+        page = paginator.paginate_queryset(transactions, request, view=self)
+
         data = []
-        for tx in transactions:
+        for tx in page:
             tx_data = {
                 'id': tx.id,
                 'transaction_id': tx.transaction_id,
@@ -388,6 +383,8 @@ class CustomerWalletTransactionsView(APIView):
 
         return Response({
             'transactions': data,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
             'balance': str(wallet.balance),
             'currency': wallet.currency,
         })
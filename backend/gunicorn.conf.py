@@ -0,0 +1,92 @@
+# gunicorn.conf.py
+"""
+gunicorn settings, picked by GUNICORN_PROFILE:
+  sync    - one request per process; workers = 2 x CPUs + 1
+  gthread - GUNICORN_THREADS request threads per process (default 4); workers = CPUs + 1
+  gevent  - greenlets, GUNICORN_WORKER_CONNECTIONS per process (default 100); workers = CPUs + 1.
+            psycopg 3 waits cooperatively once select is monkey-patched; DB access goes through the
+            connection pool so idle greenlets don't each hold a connection
+  asgi    - uvicorn workers running backend.asgi with the async read views; workers = CPUs + 1.
+            The only profile that serves the event stream (EVENT_STREAM); the others answer it with 501
+GUNICORN_WORKERS overrides the computed worker count. Profiles other than sync default DB_POOL on and
+size it to the request concurrency of one process (see the DATABASES comment in settings).
+The app is preloaded in the master so workers share its memory copy-on-write; workers are recycled
+after about GUNICORN_MAX_REQUESTS requests (jittered so they don't all restart at once).
+"""
+import os
+
+profile = os.environ.get('GUNICORN_PROFILE', 'gthread')
+if profile not in ('sync', 'gthread', 'gevent', 'asgi'):
+    raise RuntimeError(f"Unknown GUNICORN_PROFILE {profile!r}; use sync, gthread, gevent or asgi")
+
+if profile == 'gevent':
+    # Before anything else is imported (preload_app loads Django, psycopg and redis right after this file)
+    from gevent import monkey
+    monkey.patch_all()
+
+import gc  # noqa: E402
+
+
+def cpu_count():
+    # Honours container CPU limits set through affinity, unlike os.cpu_count()
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+cpus = cpu_count()
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+wsgi_app = 'backend.asgi:application' if profile == 'asgi' else 'backend.wsgi:application'
+
+if profile == 'sync':
+    worker_class = 'sync'
+    default_workers = 2 * cpus + 1
+elif profile == 'gthread':
+    worker_class = 'gthread'
+    threads = int(os.environ.setdefault('GUNICORN_THREADS', '4'))
+    default_workers = cpus + 1
+    os.environ.setdefault('DB_POOL', 'True')
+elif profile == 'gevent':
+    worker_class = 'gevent'
+    worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 100))
+    default_workers = cpus + 1
+    os.environ.setdefault('DB_POOL', 'True')
+    # Greenlets beyond this wait for a free connection (DB_POOL_TIMEOUT)
+    os.environ.setdefault('DB_POOL_MAX_SIZE', '20')
+else:
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    default_workers = cpus + 1
+    os.environ.setdefault('DB_POOL', 'True')
+    os.environ.setdefault('ASYNC_READ_VIEWS', 'True')
+
+workers = int(os.environ.get('GUNICORN_WORKERS', default_workers))
+
+preload_app = True
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))  # keep above the load balancer's idle timeout
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# One line per request already comes from monitoring.middleware
+accesslog = None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    # Everything the preloaded app allocated so far never changes; keep the GC from touching
+    # (and so copying) those pages in every worker
+    gc.freeze()
+    server.log.info(f"Profile {profile}: {workers} x {worker_class} workers")
+    from django.conf import settings
+    if settings.EVENT_STREAM and profile != 'asgi':
+        server.log.warning("EVENT_STREAM is on but only the asgi profile serves /api/events/stream/ (501 here)")
+
+
+def post_fork(server, worker):
+    # Connections must not be shared with the master or sibling workers
+    from django.db import connections
+    connections.close_all()
@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "monitoring"
+
+    def ready(self):
+        if settings.REQUEST_METRICS:
+            from django.db.backends.signals import connection_created
+            from monitoring.instrumentation import install_query_timer, install_serializer_timing
+            connection_created.connect(install_query_timer)
+            install_serializer_timing()
+        if settings.METRICS_ENABLED:
+            from monitoring import signals
+            signals.connect()
@@ -0,0 +1,306 @@
+# monitoring/budgets.py
+"""
+Query-count and latency budgets for the API.
+Every GET endpoint under api/ is discovered from the URL conf, called against a seeded
+fixture with the test client and measured with CaptureQueriesContext. Budgets live in
+query_budgets.yaml next to this module, keyed by URL route; check_query_budgets runs
+everything inside a transaction that is rolled back, under isolated() (a private in-memory
+cache, Celery tasks run inline, mail kept in memory, metrics off), and monitoring.tests holds every endpoint to its status and query budget in the test suite.
+"""
+import re
+import statistics
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+
+import yaml
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.test import APIClient
+
+BUDGETS_FILE = Path(__file__).resolve().parent / 'query_budgets.yaml'
+API_PREFIX = 'api/'
+DEFAULT_MS = 500
+# Measured calls use their own cache, so budgets never depend on (or touch) a shared one
+ISOLATED_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                               'LOCATION': 'query-budgets'}}
+LOCMEM_EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+ROUTE_PARAM = re.compile(r'<(?:\w+:)?(\w+)>')
+
+# URL param -> fixture key, for params that mean the same thing everywhere.
+# "pk" differs per route, so routes using it name their fixture key under params: in the YAML.
+PARAM_FIXTURES = {
+    'vendor_id': 'vendor',
+    'vendor_slug': 'vendor_slug',
+    'user_id': 'customer',
+    'email': 'customer_email',
+    'product_id': 'product',
+    'product_pid': 'product_pid',
+    'slug': 'product_slug',
+    'order_oid': 'order_oid',
+    'oid': 'order_oid',
+    'order_id': 'order_oid',
+    'cart_id': 'cart_id',
+    'item_id': 'cart_item',
+    'review_id': 'review',
+    'coupon_id': 'coupon',
+    'noti_id': 'notification',
+    'notification_id': 'notification',
+    'transaction_id': 'wallet_transaction',
+    'job_id': 'report_job',
+}
+
+
+######################## Fixture ########################
+
+@contextmanager
+def isolated():
+    """
+    Measure without outside services or side effects: a private cache, no metrics flush to
+    Redis, and Celery tasks (password-reset mail) run inline against the in-memory mail
+    backend instead of going to the broker.
+    """
+    from backend.celery import app
+
+    # The app reads CELERY_* settings, which win over a plain app.conf.task_always_eager
+    eager = app.conf.task_always_eager
+    app.conf.update(CELERY_TASK_ALWAYS_EAGER=True)
+    try:
+        with override_settings(CACHES=ISOLATED_CACHES, METRICS_ENABLED=False, EMAIL_BACKEND=LOCMEM_EMAIL_BACKEND):
+            yield
+    finally:
+        app.conf.update(CELERY_TASK_ALWAYS_EAGER=eager)
+
+
+def seed_fixture(scale=1):
+    """
+    A small but realistic shop: vendors with products, offers, coupons, orders in every
+    payment state, reviews, notifications, carts and wallet activity. Sizes grow with scale
+    so list endpoints return several rows and an N+1 shows up in the query count.
+    Returns the ids/keys the URL params are filled from.
+    """
+    from store.models import (Cart, CartOrder, CartOrderItem, Category, CategoryOffer, Coupon,
+                              Notification, Product, ProductOffer, Review, Wishlist)
+    from userauth.models import User, Wallet
+    from vendor.models import ReportJob, Vendor
+    from vendor.rollups import rebuild
+    from admin_panel.stats import refresh_platform_stats
+
+    admin = User.objects.create(email='budget-admin@example.com', is_staff=True, is_superuser=True)
+    customers = [User.objects.create(email=f'budget-customer{i}@example.com') for i in range(3 * scale)]
+    categories = [Category.objects.create(title=f'Budget category {i}') for i in range(3)]
+
+    vendors, products = [], []
+    for v in range(3 * scale):
+        user = User.objects.create(email=f'budget-vendor{v}@example.com')
+        vendor = Vendor.objects.create(user=user, name=f'Budget shop {v}', email=user.email)
+        vendors.append(vendor)
+        for p in range(5):
+            products.append(Product.objects.create(
+                title=f'Budget product {v}-{p}', price=Decimal('100.00'), stock_qty=50,
+                vendor=vendor, category=categories[p % len(categories)],
+            ))
+        offer = ProductOffer.objects.create(vendor=vendor, discount_percentage=Decimal('10.00'))
+        offer.products.set(products[-2:])
+        Coupon.objects.create(vendor=vendor, code=f'BUDGET{v}', discount=5)
+    for category in categories:
+        CategoryOffer.objects.create(category=category, discount_percentage=Decimal('5.00'))
+
+    statuses = ['paid', 'paid', 'pending', 'cancelled']
+    orders = []
+    for n in range(10 * scale):
+        customer = customers[n % len(customers)]
+        lines = [products[(n + k * 7) % len(products)] for k in range(3)]
+        order = CartOrder.objects.create(
+            buyer=customer, full_name=customer.full_name, email=customer.email, mobile='9999999999',
+            payment_status=statuses[n % len(statuses)], sub_total=Decimal('300.00'), total=Decimal('300.00'),
+        )
+        order.vendor.set({product.vendor for product in lines})
+        for product in lines:
+            item = CartOrderItem.objects.create(
+                order=order, product=product, vendor=product.vendor, qty=1,
+                price=product.price, sub_total=product.price, total=product.price,
+            )
+            Notification.objects.create(vendor=product.vendor, order=order, order_item=item)
+        Notification.objects.create(user=customer, order=order)
+        orders.append(order)
+
+    for i, product in enumerate(products):
+        Review.objects.create(user=customers[i % len(customers)], product=product, review='Budget review', rating=4)
+    customer = customers[0]
+    for product in products[:3]:
+        Cart.objects.create(product=product, user=customer, qty=1, price=product.price,
+                            sub_total=product.price, total=product.price, cart_id='budget-cart')
+        Wishlist.objects.create(user=customer, product=product)
+    wallet, _ = Wallet.objects.get_or_create(user=customer)
+    wallet.deposit(Decimal('500.00'), 'deposit', 'Budget deposit')
+    refunded = CartOrderItem.objects.filter(order__buyer=customer, order__payment_status='paid').first()
+    if refunded:
+        wallet.deposit(Decimal('100.00'), 'refund', 'Budget refund',
+                       related_order=refunded.order, related_order_item=refunded)
+
+    rebuild()
+    refresh_platform_stats()
+
+    vendor, product, order = vendors[0], products[0], orders[0]
+    return {
+        'admin': admin,
+        'customer_user': customer,
+        'vendor': vendor.id,
+        'vendor_slug': vendor.slug,
+        'customer': customer.id,
+        'customer_email': customer.email,
+        'product': product.id,
+        'product_pid': product.pid,
+        'product_slug': product.slug,
+        'order': order.id,
+        'order_oid': order.oid,
+        'order_item': order.orderitem.first().id,
+        'cart_id': 'budget-cart',
+        'cart_item': Cart.objects.filter(cart_id='budget-cart').first().id,
+        'review': product.reviews.first().id,
+        'coupon': vendor.coupon_vendor.first().id,
+        'notification': Notification.objects.filter(vendor=vendor).first().id,
+        'customer_notification': Notification.objects.filter(user=customer).first().id,
+        'vendor_profile': vendor.user.profile.id,
+        'product_offer': vendor.offers.first().id,
+        'category_offer': CategoryOffer.objects.first().id,
+        'wallet_transaction': wallet.transactions.first().id,
+        'report_job': ReportJob.objects.create(vendor=vendor, report_type='sales_pdf', source_version='budget').id,
+    }
+
+
+######################## Endpoints ########################
+
+def _walk(patterns, prefix=''):
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            yield route, pattern
+
+
+def api_endpoints():
+    """(route, URLPattern) for every GET-able API route, in URL conf order."""
+    for route, pattern in _walk(get_resolver().url_patterns):
+        view_class = getattr(pattern.callback, 'cls', None) or getattr(pattern.callback, 'view_class', None)
+        # DRF's format-suffix routes (api/<drf_format_suffix:format>) repeat an existing one
+        if 'drf_format_suffix' in route:
+            continue
+        if route.startswith(API_PREFIX) and view_class is not None and hasattr(view_class, 'get'):
+            yield route, pattern
+
+
+def build_path(route, fixture, params=None):
+    """Fill the route's <params> from the fixture; None if a param has no fixture value."""
+    missing = []
+
+    def fill(match):
+        name = match.group(1)
+        key = (params or {}).get(name) or PARAM_FIXTURES.get(name)
+        if key not in fixture:
+            missing.append(name)
+            return match.group(0)
+        return str(fixture[key])
+
+    path = ROUTE_PARAM.sub(fill, route)
+    return None if missing else '/' + path
+
+
+######################## Measuring ########################
+
+@dataclass
+class Measurement:
+    route: str
+    path: str = None
+    status: int = None
+    queries: int = None
+    ms: float = None
+    skipped: str = None
+
+
+def measure(client, route, path, repeat=3):
+    """Query count of a cold-cache call and median latency over repeat cold-cache calls."""
+    timings, queries, status = [], None, None
+    for _ in range(repeat):
+        cache.clear()
+        # The connection keeps at most 9000 queries; an overflowing log would miscount
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(path)
+            timings.append((time.perf_counter() - started) * 1000)
+        if queries is None:
+            queries, status = len(captured), response.status_code
+    return Measurement(route, path, status, queries, round(statistics.median(timings), 1))
+
+
+def measure_endpoints(budgets, scale=1, only=None, repeat=3):
+    """
+    Seed the fixture and measure every API endpoint (or those whose route contains `only`).
+    Run inside a transaction that is rolled back; each call gets its own savepoint.
+    """
+    fixture = seed_fixture(scale=scale)
+    admin_client = APIClient(raise_request_exception=False)
+    customer_client = APIClient(raise_request_exception=False)
+    admin_client.force_authenticate(user=fixture['admin'])
+    customer_client.force_authenticate(user=fixture['customer_user'])
+
+    measurements = []
+    for route, _ in api_endpoints():
+        if only and only not in route:
+            continue
+        budget = budgets['endpoints'].get(route) or {}
+        path = build_path(route, fixture, budget.get('params'))
+        if path is None:
+            measurements.append(Measurement(route, skipped="no fixture for a URL param"))
+            continue
+        client = admin_client if route.startswith('api/admin/') else customer_client
+        # A savepoint per endpoint so a GET with side effects can't change the next one's data
+        with transaction.atomic():
+            measurements.append(measure(client, route, path, repeat))
+            transaction.set_rollback(True)
+    return measurements
+
+
+######################## Budgets ########################
+
+def load_budgets(path=BUDGETS_FILE):
+    if not Path(path).exists():
+        return {'defaults': {'ms': DEFAULT_MS}, 'endpoints': {}}
+    with open(path) as handle:
+        data = yaml.safe_load(handle) or {}
+    data.setdefault('defaults', {}).setdefault('ms', DEFAULT_MS)
+    data.setdefault('endpoints', {})
+    return data
+
+
+def compare(measurement, budget, defaults):
+    """List of regression descriptions; empty when the endpoint is within budget."""
+    problems = []
+    if budget.get('queries') is not None and measurement.queries > budget['queries']:
+        problems.append('queries')
+    ms_budget = budget.get('ms', defaults['ms'])
+    if ms_budget is not None and measurement.ms > ms_budget:
+        problems.append('latency')
+    if budget.get('status') is not None and measurement.status != budget['status']:
+        problems.append('status')
+    return problems
+
+
+def updated_budgets(budgets, measurements, headroom=2.0):
+    """Budgets rewritten from measurements: exact query counts, latency with headroom."""
+    endpoints = {}
+    for measurement in measurements:
+        entry = dict(budgets['endpoints'].get(measurement.route) or {})
+        if measurement.skipped is None:
+            entry['status'] = measurement.status
+            entry['queries'] = measurement.queries
+            entry['ms'] = max(50, int(-(-measurement.ms * headroom // 50) * 50))
+        endpoints[measurement.route] = entry
+    return {'defaults': budgets['defaults'], 'endpoints': endpoints}
@@ -0,0 +1,44 @@
+# monitoring/cache.py
+"""
+Cache backends that count hits and misses, for the request being served (Server-Timing)
+and process-wide (cache_requests_total).
+Point CACHES['default']['BACKEND'] at one of these instead of Django's class.
+"""
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+
+from monitoring.instrumentation import record_cache
+from monitoring.metrics import cache_requests
+
+_MISSING = object()
+
+
+class CacheMetricsMixin:
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            record_cache(0, 1)
+            cache_requests.inc(result='miss')
+            return default
+        record_cache(1, 0)
+        cache_requests.inc(result='hit')
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        record_cache(len(found), len(keys) - len(found))
+        if found:
+            cache_requests.inc(len(found), result='hit')
+        if len(keys) > len(found):
+            cache_requests.inc(len(keys) - len(found), result='miss')
+        return found
+
+
+class InstrumentedRedisCache(CacheMetricsMixin, RedisCache):
+    pass
+
+
+class InstrumentedLocMemCache(CacheMetricsMixin, LocMemCache):
+    pass
@@ -0,0 +1,132 @@
+# monitoring/instrumentation.py
+"""
+Per-request measurements shared by the metrics middleware, the instrumented cache
+backends and the serializer hook. The middleware puts a RequestMetrics in a context
+variable for the duration of a request; everything else records into current() and
+does nothing outside a request (shell, Celery, management commands).
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+_current = ContextVar('request_metrics', default=None)
+
+
+@dataclass
+class RequestMetrics:
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_ms: float = 0.0
+    serializer_ms: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    total_ms: float = 0.0
+    # Only filled while a request is being profiled: [(alias, sql, ms)]
+    sql: list = None
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+        return self
+
+    def server_timing(self):
+        """Value for the Server-Timing response header."""
+        return ", ".join([
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"',
+            f'serializer;dur={self.serializer_ms:.1f}',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'total;dur={self.total_ms:.1f}',
+        ])
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_ms, 1),
+            'serializer_ms': round(self.serializer_ms, 1),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'total_ms': round(self.total_ms, 1),
+        }
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def collecting(metrics):
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def record_cache(hits, misses):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+class QueryTimer:
+    """Execute wrapper adding every query's count and time to the request."""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics = _current.get()
+            if metrics is not None:
+                elapsed = (time.perf_counter() - started) * 1000
+                metrics.queries += 1
+                metrics.db_ms += elapsed
+                if metrics.sql is not None:
+                    metrics.sql.append((self.alias, sql, round(elapsed, 2)))
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """
+    connection_created receiver: keep a QueryTimer on every connection for its lifetime.
+    Per connection rather than per request because the async ORM runs queries in a worker
+    thread with its own connection; the timer finds the request through the context variable.
+    """
+    if not any(isinstance(wrapper, QueryTimer) for wrapper in connection.execute_wrappers):
+        # At the front, so a connect inside someone's execute_wrapper() block doesn't get popped by it
+        connection.execute_wrappers.insert(0, QueryTimer(connection.alias))
+
+
+######################## Serializer timing ########################
+
+_serializing = ContextVar('serializing', default=False)
+
+
+def _timed_data(prop):
+    def data(self):
+        metrics = _current.get()
+        # Only the outermost .data is timed; nested serializers run inside it
+        if metrics is None or _serializing.get():
+            return prop.fget(self)
+        token = _serializing.set(True)
+        started = time.perf_counter()
+        try:
+            return prop.fget(self)
+        finally:
+            metrics.serializer_ms += (time.perf_counter() - started) * 1000
+            _serializing.reset(token)
+    data._request_metrics = True
+    return property(data)
+
+
+def install_serializer_timing():
+    """Time DRF's Serializer.data / ListSerializer.data, where representations are built."""
+    from rest_framework import serializers
+
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        prop = cls.__dict__['data']
+        if not getattr(prop.fget, '_request_metrics', False):
+            cls.data = _timed_data(prop)
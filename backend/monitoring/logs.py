@@ -0,0 +1,54 @@
+# monitoring/logs.py
+"""
+Logging pieces referenced from settings.LOGGING: a one-object-per-line JSON formatter
+for log shippers (LOG_FORMAT=json) and a filter that samples high-volume INFO/DEBUG lines.
+Only stdlib imports, since settings load this before Django is set up.
+"""
+import json
+import logging
+import random
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else on a record came in through extra={...}
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+class JSONFormatter(logging.Formatter):
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through a `rate` share of records below `level`; records at or above it always pass."""
+
+    def __init__(self, rate=1.0, level='WARNING'):
+        super().__init__()
+        self.rate = rate
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+
+    def filter(self, record):
+        return record.levelno >= self.level or self.rate >= 1 or random.random() < self.rate
+
+
+def parse_levels(value):
+    """'store.views=WARNING,monitoring=DEBUG' -> {'store.views': 'WARNING', 'monitoring': 'DEBUG'}"""
+    levels = {}
+    for pair in value.split(','):
+        if pair.strip():
+            name, _, level = pair.partition('=')
+            levels[name.strip()] = level.strip().upper()
+    return levels
@@ -0,0 +1,14 @@
+# monitoring/mail.py
+from django.core.mail.backends.smtp import EmailBackend
+
+from monitoring.metrics import emails_sent
+
+
+class CountingEmailBackend(EmailBackend):
+    """SMTP backend that counts the messages the server accepted (emails_sent_total)."""
+
+    def send_messages(self, email_messages):
+        sent = super().send_messages(email_messages)
+        if sent:
+            emails_sent.inc(sent)
+        return sent
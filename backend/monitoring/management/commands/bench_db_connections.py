@@ -0,0 +1,75 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Time what a request pays to get a usable PostgreSQL connection and run one query: "
+        "a new connection each time (CONN_MAX_AGE=0, the old default), a persistent connection "
+        "(DB_CONN_MAX_AGE) and a checkout from a psycopg pool with health checks (DB_POOL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql':
+            raise CommandError(f"{options['database']} is {connection.vendor}; this compares PostgreSQL connection modes")
+        try:
+            import psycopg
+            from psycopg_pool import ConnectionPool
+        except ImportError as e:
+            raise CommandError(f"Needs psycopg 3 and psycopg-pool: {e}")
+
+        # The same connect arguments Django uses, without its own pool
+        params = connection.get_connection_params()
+        params['autocommit'] = True
+        iterations = options['iterations']
+
+        def new_connection():
+            with psycopg.connect(**params) as conn:
+                conn.execute("SELECT 1").fetchone()
+
+        persistent = psycopg.connect(**params)
+
+        def persistent_connection():
+            persistent.execute("SELECT 1").fetchone()
+
+        pool = ConnectionPool(kwargs=params, min_size=1, max_size=1, check=ConnectionPool.check_connection)
+        pool.wait()
+
+        def pooled_connection():
+            with pool.connection() as conn:
+                conn.execute("SELECT 1").fetchone()
+
+        try:
+            results = [
+                ("new connection", self.time(new_connection, iterations)),
+                ("persistent", self.time(persistent_connection, iterations)),
+                ("pool checkout", self.time(pooled_connection, iterations)),
+            ]
+        finally:
+            persistent.close()
+            pool.close()
+
+        self.stdout.write(f"{'mode':<16} {'p50':>9} {'p95':>9} {'p99':>9}")
+        for mode, timings in results:
+            cuts = statistics.quantiles(timings, n=100)
+            self.stdout.write(f"{mode:<16} {cuts[49]:>7.2f}ms {cuts[94]:>7.2f}ms {cuts[98]:>7.2f}ms")
+        setup = statistics.median(results[0][1]) - statistics.median(results[2][1])
+        self.stdout.write(f"Connection setup saved per request by pooling: {setup:.2f}ms (median)")
+
+    @staticmethod
+    def time(func, iterations):
+        func()  # warm-up
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
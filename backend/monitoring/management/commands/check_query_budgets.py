@@ -0,0 +1,86 @@
+import yaml
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from monitoring.budgets import BUDGETS_FILE, compare, isolated, load_budgets, measure_endpoints, updated_budgets
+
+BUDGETS_HEADER = """\
+# Per-endpoint budgets checked by `python manage.py check_query_budgets`.
+# Keys are URL routes. queries: most SQL queries one cold-cache GET may run against the
+# seeded fixture; ms: allowed median latency; status: expected response status.
+# params: picks the fixture object for a URL param that differs per route (e.g. pk).
+# Regenerate after an intended change with `check_query_budgets --update`.
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Call every GET API endpoint against a seeded fixture and compare query counts and "
+        "latency with monitoring/query_budgets.yaml. Nothing is written to the database or the cache, "
+        "and no task or mail leaves the process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3, help="Calls per endpoint for the latency median")
+        parser.add_argument('--scale', type=int, default=1, help="Multiply the fixture size")
+        parser.add_argument('--only', help="Only check routes containing this text")
+        parser.add_argument('--all', action='store_true', help="Print every endpoint, not just regressions")
+        parser.add_argument('--update', action='store_true', help="Rewrite the budgets from this run")
+
+    def handle(self, *args, **options):
+        budgets = load_budgets()
+        setup_test_environment()
+        try:
+            with isolated(), transaction.atomic():
+                measurements = measure_endpoints(budgets, options['scale'], options['only'], options['repeat'])
+                transaction.set_rollback(True)
+        finally:
+            teardown_test_environment()
+
+        if options['update']:
+            self.write_budgets(budgets, measurements)
+            return
+        self.report(budgets, measurements, options['all'])
+
+    def report(self, budgets, measurements, show_all):
+        rows, regressions, unbudgeted = [], 0, []
+        for measurement in measurements:
+            if measurement.skipped:
+                rows.append((measurement.route, 'skipped', '', '', measurement.skipped))
+                continue
+            budget = budgets['endpoints'].get(measurement.route)
+            if not budget or budget.get('queries') is None:
+                unbudgeted.append(measurement.route)
+            problems = compare(measurement, budget or {}, budgets['defaults'])
+            regressions += bool(problems)
+            if problems or show_all:
+                budget = budget or {}
+                rows.append((
+                    measurement.route,
+                    f"{budget.get('status', '-')} -> {measurement.status}",
+                    f"{budget.get('queries', '-')} -> {measurement.queries}",
+                    f"{budget.get('ms', budgets['defaults']['ms'])} -> {measurement.ms}",
+                    ', '.join(problems) or 'ok',
+                ))
+
+        if rows:
+            self.print_table(('route', 'status', 'queries', 'ms', 'result'), rows)
+        if unbudgeted:
+            self.stdout.write(self.style.WARNING(
+                f"{len(unbudgeted)} endpoint(s) have no query budget; run with --update to record them"
+            ))
+        if regressions:
+            raise CommandError(f"{regressions} endpoint(s) over budget")
+        self.stdout.write(self.style.SUCCESS(f"{len(measurements)} endpoint(s) within budget"))
+
+    def print_table(self, header, rows):
+        widths = [max(len(str(row[i])) for row in (header, *rows)) for i in range(len(header))]
+        for row in (header, tuple('-' * width for width in widths), *rows):
+            self.stdout.write('  '.join(str(cell).ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+    def write_budgets(self, budgets, measurements):
+        with open(BUDGETS_FILE, 'w') as handle:
+            handle.write(BUDGETS_HEADER)
+            yaml.safe_dump(updated_budgets(budgets, measurements), handle, sort_keys=False, width=120)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(measurements)} budget(s) to {BUDGETS_FILE}"))
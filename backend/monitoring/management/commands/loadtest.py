@@ -0,0 +1,95 @@
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a running server with concurrent keep-alive clients and print requests/sec and latency "
+        "percentiles per target. Run it once against the WSGI and once against the ASGI deployment "
+        "with the same arguments to compare them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('targets', nargs='+', help='"/path" for a GET, or "POST /path {json body}"')
+        parser.add_argument('--base-url', default='http://localhost:8000')
+        parser.add_argument('--concurrency', type=int, default=50, help="Clients per target")
+        parser.add_argument('--duration', type=float, default=20, help="Seconds per target")
+        parser.add_argument('--header', action='append', default=[], help='Extra header, e.g. "Authorization: Bearer <jwt>"')
+
+    def handle(self, *args, **options):
+        base = urlsplit(options['base_url'])
+        if base.scheme not in ('http', 'https') or not base.hostname:
+            raise CommandError(f"Invalid --base-url {options['base_url']}")
+        headers = {'Content-Type': 'application/json'}
+        for header in options['header']:
+            name, _, value = header.partition(':')
+            headers[name.strip()] = value.strip()
+
+        self.stdout.write(f"{'target':<50} {'reqs':>7} {'errors':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        for target in options['targets']:
+            method, path, body = self.parse_target(target)
+            latencies, errors = self.run(base, method, path, body, headers, options['concurrency'], options['duration'])
+            self.report(target, latencies, errors, options['duration'])
+
+    @staticmethod
+    def parse_target(target):
+        method, _, rest = target.partition(' ')
+        if not rest:
+            return 'GET', target, None
+        path, _, body = rest.partition(' ')
+        if body:
+            try:
+                json.loads(body)
+            except ValueError:
+                raise CommandError(f"Body of {target!r} is not valid JSON")
+        return method.upper(), path, body.encode() or None
+
+    def run(self, base, method, path, body, headers, concurrency, duration):
+        connection_class = http.client.HTTPSConnection if base.scheme == 'https' else http.client.HTTPConnection
+        deadline = time.monotonic() + duration
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def client():
+            connection = connection_class(base.hostname, base.port, timeout=30)
+            mine, failed = [], 0
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    connection.request(method, base.path.rstrip('/') + path, body=body, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status < 400
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    ok = False
+                if ok:
+                    mine.append((time.perf_counter() - started) * 1000)
+                else:
+                    failed += 1
+            connection.close()
+            with lock:
+                latencies.extend(mine)
+                errors.append(failed)
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, sum(errors)
+
+    def report(self, target, latencies, errors, duration):
+        if len(latencies) < 2:
+            self.stdout.write(self.style.ERROR(f"{target[:50]:<50} {len(latencies):>7} {errors:>7}  too few successful requests"))
+            return
+        cuts = statistics.quantiles(latencies, n=100)
+        line = (f"{target[:50]:<50} {len(latencies):>7} {errors:>7} {len(latencies) / duration:>8.1f} "
+                f"{cuts[49]:>6.1f}ms {cuts[94]:>6.1f}ms {cuts[98]:>6.1f}ms {max(latencies):>6.1f}ms")
+        self.stdout.write(self.style.WARNING(line) if errors else line)
@@ -0,0 +1,240 @@
+# monitoring/metrics.py
+"""
+In-process metrics registry with Prometheus text exposition.
+Counters and histograms are buffered per process and a background thread flushes them to
+Redis hashes every METRICS_FLUSH_INTERVAL seconds (HINCRBYFLOAT), so every gunicorn worker
+and Celery process adds into the same totals and no request ever waits on Redis;
+GET /metrics renders them. Gauges that describe
+the outside world (Celery queue depth) are read at scrape time instead of stored.
+Redis errors never reach the caller, and a flush waits at most a short socket timeout.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+import redis
+from django.conf import settings
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = 'metrics:'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+TASK_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _label_pairs(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return [(name, labels[name]) for name in self.labelnames]
+
+    def samples(self, stored):
+        """(sample name, label string, value) from the stored Redis hash."""
+        for field, value in sorted(stored.items()):
+            suffix, _, labels = field.partition('|')
+            yield self.name + suffix, labels, float(value)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        self.registry.add(self.name, '|' + _labels(self._label_pairs(labels)), amount)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        pairs = self._label_pairs(labels)
+        base = _labels(pairs)
+        # Buckets are stored cumulative, as exposed
+        for bound in self.buckets:
+            if value <= bound:
+                self.registry.add(self.name, '_bucket|' + _labels(pairs + [('le', bound)]), 1)
+        self.registry.add(self.name, '_bucket|' + _labels(pairs + [('le', '+Inf')]), 1)
+        self.registry.add(self.name, '_sum|' + base, value)
+        self.registry.add(self.name, '_count|' + base, 1)
+
+    def samples(self, stored):
+        # Per label set: buckets by ascending le, then _sum and _count
+        def order(sample):
+            name, labels, _ = sample
+            if name.endswith('_bucket'):
+                series, _, le = labels.rpartition('le="')
+                return series.rstrip(','), 0, float(le.rstrip('"'))
+            return labels, 1 if name.endswith('_sum') else 2, 0
+        return sorted(super().samples(stored), key=order)
+
+
+class Registry:
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self._pending = defaultdict(float)
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._client = None
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def collector(self, func):
+        """Register func() -> iterable of (name, kind, documentation, [(label string, value)]) run at scrape time."""
+        self.collectors.append(func)
+        return func
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.Redis.from_url(
+                settings.METRICS_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5, decode_responses=True,
+            )
+        return self._client
+
+    def add(self, name, field, amount):
+        if not settings.METRICS_ENABLED:
+            return
+        with self._lock:
+            self._pending[(name, field)] += amount
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_forever, name='metrics-flush', daemon=True)
+                self._flusher.start()
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            self.flush()
+
+    def after_fork(self):
+        """
+        In a forked child (preloaded gunicorn workers, Celery prefork) the flush thread is gone and
+        the buffer holds the parent's samples, which the parent flushes itself; start clean.
+        """
+        self._lock = threading.Lock()
+        self._pending = defaultdict(float)
+        self._flusher = None
+        self._client = None
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+        if not pending:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for (name, field), amount in pending.items():
+                pipe.hincrbyfloat(KEY_PREFIX + name, field, amount)
+            pipe.execute()
+        except redis.RedisError as e:
+            # Dropped rather than kept, so an unreachable Redis can't grow the buffer without bound
+            log.warning("Dropped %s metric sample(s): %s", len(pending), e)
+
+    def render(self):
+        """Prometheus text exposition of every metric and collector."""
+        self.flush()
+        pipe = self.client.pipeline(transaction=False)
+        for name in self.metrics:
+            pipe.hgetall(KEY_PREFIX + name)
+        stored = dict(zip(self.metrics, pipe.execute()))
+
+        lines = []
+        for name, metric in self.metrics.items():
+            lines += [f"# HELP {name} {metric.documentation}", f"# TYPE {name} {metric.kind}"]
+            for sample, labels, value in metric.samples(stored[name]):
+                lines.append(f"{sample}{{{labels}}} {value:g}" if labels else f"{sample} {value:g}")
+        for collect in self.collectors:
+            try:
+                for name, kind, documentation, samples in collect():
+                    lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+                    lines += [f"{name}{{{labels}}} {value:g}" for labels, value in samples]
+            except Exception as e:
+                log.warning("Metrics collector %s failed: %s", collect.__name__, e)
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush)
+os.register_at_fork(after_in_child=REGISTRY.after_fork)
+
+######################## Metrics ########################
+
+http_requests = REGISTRY.counter(
+    'http_requests_total', "HTTP requests by route and status", ('method', 'route', 'status'))
+http_request_duration = REGISTRY.histogram(
+    'http_request_duration_seconds', "HTTP request latency", ('method', 'route'))
+http_request_queries = REGISTRY.histogram(
+    'http_request_db_queries', "SQL queries per HTTP request", ('route',), buckets=QUERY_BUCKETS)
+http_request_db_duration = REGISTRY.histogram(
+    'http_request_db_duration_seconds', "Time spent in SQL per HTTP request", ('route',))
+cache_requests = REGISTRY.counter(
+    'cache_requests_total', "Cache lookups by result (hit/miss)", ('result',))
+
+celery_tasks = REGISTRY.counter(
+    'celery_tasks_total', "Finished Celery tasks by state", ('task', 'state'))
+celery_task_duration = REGISTRY.histogram(
+    'celery_task_duration_seconds', "Celery task run time", ('task',), buckets=TASK_BUCKETS)
+
+orders_created = REGISTRY.counter('orders_created_total', "Orders created")
+payments_confirmed = REGISTRY.counter('payments_confirmed_total', "Payments confirmed by method", ('method',))
+stock_conflicts = REGISTRY.counter(
+    'stock_conflicts_total', "Requests that hit insufficient stock", ('where',))
+emails_sent = REGISTRY.counter('emails_sent_total', "Emails handed to the mail server")
+
+
+def observe_request(request, response, metrics):
+    """Record one finished request from the RequestMetricsMiddleware measurements."""
+    match = getattr(request, 'resolver_match', None)
+    route = match.route if match else 'unmatched'
+    http_requests.inc(method=request.method, route=route, status=response.status_code)
+    http_request_duration.observe(metrics.total_ms / 1000, method=request.method, route=route)
+    http_request_queries.observe(metrics.queries, route=route)
+    http_request_db_duration.observe(metrics.db_ms / 1000, route=route)
+
+
+@REGISTRY.collector
+def celery_queue_depth():
+    """Messages waiting in each Celery queue (Redis broker: one list per queue and priority)."""
+    broker = redis.Redis.from_url(settings.CELERY_BROKER_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+    separator = settings.CELERY_BROKER_TRANSPORT_OPTIONS.get('sep', '\x06\x16')
+    samples = []
+    for queue in settings.CELERY_TASK_QUEUES:
+        # Priority levels of the Redis transport live in "<queue><sep><priority>" lists
+        keys = [queue.name] + [f"{queue.name}{separator}{priority}" for priority in range(1, 10)]
+        pipe = broker.pipeline(transaction=False)
+        for key in keys:
+            pipe.llen(key)
+        samples.append((_labels([('queue', queue.name)]), sum(pipe.execute())))
+    yield 'celery_queue_length', 'gauge', "Messages waiting in each Celery queue", samples
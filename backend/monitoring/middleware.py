@@ -0,0 +1,104 @@
+# monitoring/middleware.py
+import cProfile
+import json
+import logging
+import random
+import re
+from datetime import datetime
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from monitoring.instrumentation import RequestMetrics, collecting
+from monitoring.metrics import observe_request
+
+log = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures every request: DB query count and time, serializer time, cache hits/misses
+    and total time. Adds them as a Server-Timing header and logs one line per request.
+    With REQUEST_PROFILING on, a REQUEST_PROFILING_SAMPLE_RATE share of requests runs under
+    cProfile with the SQL recorded; those slower than REQUEST_SLOW_MS are written to
+    REQUEST_PROFILE_DIR as <name>.prof and <name>.sql.json.
+    Works under WSGI and ASGI; async requests are measured but not profiled, since cProfile
+    would mix in whatever else the event loop runs meanwhile.
+    Keep it first in MIDDLEWARE so the total covers the other middleware too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = settings.REQUEST_SLOW_MS
+        self.profiling = settings.REQUEST_PROFILING
+        self.sample_rate = settings.REQUEST_PROFILING_SAMPLE_RATE
+        self.profile_dir = Path(settings.REQUEST_PROFILE_DIR)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        profiler = None
+        if self.profiling and random.random() < self.sample_rate:
+            metrics.sql = []
+            profiler = cProfile.Profile()
+
+        with collecting(metrics):
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        return self.finish(request, response, metrics, profiler)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        with collecting(metrics):
+            response = await self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics, profiler=None):
+        metrics.finish()
+        response['Server-Timing'] = metrics.server_timing()
+        if settings.METRICS_ENABLED:
+            observe_request(request, response, metrics)
+
+        if log.isEnabledFor(logging.INFO):
+            log.info(
+                "%s %s %s %.1fms queries=%d db=%.1fms serializer=%.1fms cache=%d/%d",
+                request.method, request.path, response.status_code, metrics.total_ms, metrics.queries,
+                metrics.db_ms, metrics.serializer_ms, metrics.cache_hits, metrics.cache_hits + metrics.cache_misses,
+                extra={'method': request.method, 'path': request.path, 'status': response.status_code, **metrics.as_dict()},
+            )
+        if profiler is not None and metrics.total_ms >= self.slow_ms:
+            self.save_profile(request, response, metrics, profiler)
+        return response
+
+    def save_profile(self, request, response, metrics, profiler):
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+        name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{request.method}-{slug[:80]}"
+        try:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(self.profile_dir / f"{name}.prof")
+            with open(self.profile_dir / f"{name}.sql.json", 'w') as handle:
+                json.dump({
+                    'method': request.method,
+                    'path': request.get_full_path(),
+                    'status': response.status_code,
+                    **metrics.as_dict(),
+                    'sql': [{'alias': alias, 'sql': sql, 'ms': ms} for alias, sql, ms in metrics.sql],
+                }, handle, indent=2)
+        except OSError as e:
+            log.warning("Could not save profile for %s: %s", request.path, e)
+            return
+        log.warning("Slow request %s %s (%.0fms) profiled as %s", request.method, request.path, metrics.total_ms, name)
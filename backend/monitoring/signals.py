@@ -0,0 +1,41 @@
+# monitoring/signals.py
+"""Business and Celery counters fed from model and Celery signals; connected in MonitoringConfig.ready()."""
+import time
+
+from celery.signals import task_postrun, task_prerun, worker_process_shutdown
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from monitoring.metrics import REGISTRY, celery_task_duration, celery_tasks, orders_created
+
+_task_started = {}
+
+
+def count_order_created(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(orders_created.inc)
+
+
+def task_started(task_id=None, **kwargs):
+    _task_started[task_id] = time.monotonic()
+
+
+def task_finished(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    name = getattr(task, 'name', 'unknown')
+    celery_tasks.inc(task=name, state=state or 'UNKNOWN')
+    if started is not None:
+        celery_task_duration.observe(time.monotonic() - started, task=name)
+
+
+def flush_metrics(**kwargs):
+    REGISTRY.flush()
+
+
+def connect():
+    from store.models import CartOrder
+
+    post_save.connect(count_order_created, sender=CartOrder, dispatch_uid='monitoring-orders-created')
+    task_prerun.connect(task_started, weak=False)
+    task_postrun.connect(task_finished, weak=False)
+    worker_process_shutdown.connect(flush_metrics, weak=False)
@@ -0,0 +1,231 @@
+import json
+import logging
+import pstats
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.core import mail
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+
+from monitoring.budgets import isolated, load_budgets, measure_endpoints
+from monitoring.instrumentation import RequestMetrics
+from monitoring.logs import JSONFormatter, SamplingFilter, parse_levels
+from monitoring.metrics import Registry
+from store.models import Category
+
+
+@tag('slow')
+class QueryBudgetTests(TestCase):
+    """
+    Every GET API endpoint answers with its recorded status within its query budget
+    (monitoring/query_budgets.yaml). Latency budgets depend on the machine, so only
+    check_query_budgets enforces those. Runs without Redis or a Celery broker.
+    """
+
+    def setUp(self):
+        patcher = mock.patch('monitoring.metrics.redis.Redis.from_url', side_effect=AssertionError("Redis used"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_endpoints_within_query_budget(self):
+        budgets = load_budgets()
+        with isolated():
+            measurements = measure_endpoints(budgets, repeat=1)
+        self.assertEqual(len(mail.outbox), 1)  # the password reset mail, sent inline
+        for measurement in measurements:
+            if measurement.skipped:
+                continue
+            budget = budgets['endpoints'].get(measurement.route)
+            with self.subTest(measurement.route):
+                self.assertIsNotNone(budget, "no budget recorded; run check_query_budgets --update")
+                self.assertEqual(measurement.status, budget['status'])
+                self.assertLessEqual(measurement.queries, budget['queries'])
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsFlushTests(SimpleTestCase):
+
+    def setUp(self):
+        self.registry = Registry()
+        self.registry._client = mock.MagicMock()
+        self.requests = self.registry.counter('test_requests_total', "Test requests", ('route',))
+
+    def flushed(self):
+        pipe = self.registry._client.pipeline.return_value
+        return {call.args[1:] for call in pipe.hincrbyfloat.call_args_list}
+
+    @override_settings(METRICS_FLUSH_INTERVAL=0)
+    def test_recording_never_talks_to_redis(self):
+        self.registry._flush_forever = lambda: None  # no background flush in this test
+        for _ in range(100):
+            self.requests.inc(route='a')
+        self.registry._client.pipeline.assert_not_called()
+
+        self.registry.flush()
+        self.assertEqual(self.flushed(), {('|route="a"', 100)})
+
+    @override_settings(METRICS_FLUSH_INTERVAL=0.01)
+    def test_background_thread_flushes(self):
+        self.requests.inc(route='a')
+        deadline = time.monotonic() + 2
+        while not self.flushed() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.flushed(), {('|route="a"', 1)})
+
+    def test_forked_child_starts_with_an_empty_buffer(self):
+        self.registry._flush_forever = lambda: None
+        self.requests.inc(route='a')
+        self.registry.after_fork()
+        self.assertIsNone(self.registry._flusher)
+        self.registry._client = mock.MagicMock()
+        self.registry.flush()
+        self.assertEqual(self.flushed(), set())
+
+
+@mock.patch('monitoring.views.REGISTRY.render', return_value='# metrics\n')
+@override_settings(METRICS_ENABLED=False)
+class MetricsEndpointTests(SimpleTestCase):
+
+    def test_loopback_is_served(self, render):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_other_addresses_are_refused(self, render):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.7').status_code, 403)
+        render.assert_not_called()
+
+    @override_settings(METRICS_ALLOWED_IPS='10.0.0.0/8, 127.0.0.1')
+    def test_allowed_network(self, render):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_from_anywhere(self, render):
+        remote = {'REMOTE_ADDR': '203.0.113.7'}
+        self.assertEqual(self.client.get('/metrics', **remote).status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong', **remote).status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret', **remote).status_code, 200)
+
+
+def make_record(level=logging.INFO, msg="GET %s %s", args=('/api/', 200), **extra):
+    record = logging.makeLogRecord({'name': 'monitoring.middleware', 'levelno': level,
+                                    'levelname': logging.getLevelName(level), 'msg': msg, 'args': args})
+    record.__dict__.update(extra)
+    return record
+
+
+class LoggingTests(SimpleTestCase):
+
+    def test_json_formatter(self):
+        entry = json.loads(JSONFormatter().format(make_record(path='/api/', queries=3)))
+        self.assertEqual({key: entry[key] for key in ('level', 'logger', 'message', 'path', 'queries')}, {
+            'level': 'INFO', 'logger': 'monitoring.middleware', 'message': 'GET /api/ 200', 'path': '/api/', 'queries': 3,
+        })
+        self.assertNotIn('args', entry)
+
+    def test_json_formatter_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = make_record(level=logging.ERROR, exc_info=sys.exc_info())
+        self.assertIn('ValueError: boom', json.loads(JSONFormatter().format(record))['exc_info'])
+
+    def test_sampling_keeps_warnings(self):
+        never = SamplingFilter(rate=0)
+        self.assertFalse(never.filter(make_record(level=logging.INFO)))
+        self.assertTrue(never.filter(make_record(level=logging.WARNING)))
+        self.assertTrue(SamplingFilter(rate=1).filter(make_record(level=logging.DEBUG)))
+        with mock.patch('monitoring.logs.random.random', side_effect=[0.05, 0.5]):
+            tenth = SamplingFilter(rate=0.1)
+            self.assertEqual([tenth.filter(make_record()), tenth.filter(make_record())], [True, False])
+
+    def test_parse_levels(self):
+        self.assertEqual(parse_levels(' store.views=warning, monitoring=DEBUG ,'),
+                         {'store.views': 'WARNING', 'monitoring': 'DEBUG'})
+        self.assertEqual(parse_levels(''), {})
+
+
+@mock.patch('monitoring.views.REGISTRY.render', return_value='# metrics\n')
+@override_settings(METRICS_ENABLED=False)
+class RequestLogTests(SimpleTestCase):
+    """The per-request log line carries its measurements as fields, and costs nothing when disabled."""
+
+    def test_request_line_fields(self, render):
+        with self.assertLogs('monitoring.middleware', 'INFO') as logs:
+            self.client.get('/metrics')
+        record = logs.records[0]
+        self.assertEqual((record.method, record.path, record.status), ('GET', '/metrics', 200))
+        self.assertEqual(record.queries, 0)
+
+    def test_disabled_line_builds_nothing(self, render):
+        logger = logging.getLogger('monitoring.middleware')
+        level = logger.level
+        logger.setLevel(logging.WARNING)
+        self.addCleanup(logger.setLevel, level)
+        with mock.patch.object(RequestMetrics, 'as_dict') as as_dict:
+            self.client.get('/metrics')
+        as_dict.assert_not_called()
+
+
+@override_settings(METRICS_ENABLED=False)
+class RequestMetricsMiddlewareTests(TestCase):
+    """Server-Timing on every response; sampled, slow requests saved as .prof + .sql.json."""
+
+    def setUp(self):
+        Category.objects.create(title='Category')
+        profiles = tempfile.TemporaryDirectory(prefix='profiles-')
+        self.addCleanup(profiles.cleanup)
+        self.profile_dir = profiles.name
+
+    def get(self, sample):
+        with mock.patch('monitoring.middleware.random.random', return_value=sample), \
+                override_settings(REQUEST_PROFILE_DIR=self.profile_dir):
+            self.client = self.client_class()  # the middleware reads its settings when first loaded
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/category/')
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def saved(self):
+        return sorted(path.name.split('-GET-')[1] for path in Path(self.profile_dir).iterdir())
+
+    def test_server_timing(self):
+        response, queries = self.get(sample=0.99)
+        timing = response['Server-Timing']
+        db = re.search(r'db;dur=([\d.]+);desc="(\d+) queries"', timing)
+        total = re.search(r'total;dur=([\d.]+)', timing)
+        self.assertTrue(db and total, timing)
+        self.assertEqual(int(db.group(2)), queries)
+        self.assertGreater(queries, 0)
+        self.assertLessEqual(float(db.group(1)), float(total.group(1)))
+
+    @override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SAMPLE_RATE=0.25, REQUEST_SLOW_MS=0)
+    def test_unsampled_request_is_not_profiled(self):
+        with mock.patch('monitoring.middleware.cProfile.Profile') as profile:
+            self.get(sample=0.25)
+        profile.assert_not_called()
+        self.assertEqual(self.saved(), [])
+
+    @override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SAMPLE_RATE=0.25, REQUEST_SLOW_MS=0)
+    def test_sampled_slow_request_is_saved(self):
+        with self.assertLogs('monitoring.middleware', 'WARNING'):
+            _, queries = self.get(sample=0.24)
+        self.assertEqual(self.saved(), ['api-category.prof', 'api-category.sql.json'])
+
+        prof, sql = sorted(Path(self.profile_dir).iterdir())
+        self.assertGreater(pstats.Stats(str(prof)).total_calls, 0)
+        with open(sql) as handle:
+            saved = json.load(handle)
+        self.assertEqual((saved['method'], saved['path'], saved['status']), ('GET', '/api/category/', 200))
+        self.assertEqual(len(saved['sql']), saved['queries'])
+        self.assertEqual(saved['queries'], queries)
+        self.assertIn('store_category', saved['sql'][-1]['sql'])
+
+    @override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SAMPLE_RATE=1.0, REQUEST_SLOW_MS=60000)
+    def test_fast_sampled_request_is_not_saved(self):
+        self.get(sample=0.0)
+        self.assertEqual(self.saved(), [])
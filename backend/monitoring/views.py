@@ -0,0 +1,44 @@
+import hmac
+import ipaddress
+import logging
+
+import redis
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from monitoring.metrics import REGISTRY
+
+log = logging.getLogger(__name__)
+
+
+def _allowed_address(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network.strip(), strict=False)
+               for network in settings.METRICS_ALLOWED_IPS.split(',') if network.strip())
+
+
+def _has_token(request):
+    if not settings.METRICS_TOKEN:
+        return False
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    return hmac.compare_digest(request.headers.get('Authorization', ''), expected)
+
+
+def metrics_view(request):
+    """
+    GET /metrics
+    Prometheus text exposition of the metrics shared by all processes.
+    Served to scrapers sending "Authorization: Bearer <METRICS_TOKEN>" or connecting from an
+    address in METRICS_ALLOWED_IPS (loopback by default); everyone else gets a 403.
+    """
+    if not (_has_token(request) or _allowed_address(request.META.get('REMOTE_ADDR', ''))):
+        return HttpResponseForbidden()
+    try:
+        body = REGISTRY.render()
+    except redis.RedisError as e:
+        log.error("Metrics unavailable: %s", e)
+        return HttpResponse("metrics store unavailable\n", status=503, content_type='text/plain')
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,139 @@
+# store/archive.py
+"""
+Month-by-month archival of old history (see the archive_history command).
+An archived month is ARCHIVE_DIR/<YYYY-MM>/<app_label.model>.jsonl.gz, Django's jsonl serialization
+of the removed rows, so it comes back with
+    python manage.py loaddata archive/2024-03/*.jsonl.gz
+Each batch is written and fsynced before the transaction that deletes it commits, as its own gzip
+member: an interrupted run leaves readable files, and a batch written but rolled back is archived
+again later (loaddata treats the duplicate as an update of the same primary key).
+Only checkouts that were never paid are archived as orders: paid, refunded and cancelled orders are
+the customer's order history, what review eligibility ("has purchased") checks and what sales
+reports read, so they stay however old. An archived order takes along everything deleted with it
+(lines, cancellations, coupon uses); rows that only point at it (notifications, wallet transactions,
+ledger entries) stay with the reference cleared and are saved as they were before to
+<app_label.model>.refs.jsonl.gz, which sorts after the month's other files, so loaddata puts the
+references back (restoring those rows as they were when archived). Refund transactions are kept
+too: backfill_daily_sales and reconcile_vendor_ledger recompute refunds from them, so the rollups
+and the ledger check still cover the archived months.
+"""
+import gzip
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core import serializers
+from django.db import router, transaction
+from django.db.models import Min, Q
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from store.models import CartOrder, Notification
+from userauth.models import WalletTransaction
+
+# Checkouts that never became a purchase; every other order is kept (see above)
+ABANDONED = ('initiated', 'pending', 'failed', 'unpaid', 'expired')
+PURCHASES = ~Q(payment_status__in=ABANDONED)
+
+
+@dataclass(frozen=True)
+class Archive:
+    model: type
+    date_field: str
+    keep: Q  # rows kept however old they are
+
+    def candidates(self, before):
+        return self.model._default_manager.filter(**{f'{self.date_field}__lt': before}).exclude(self.keep)
+
+
+ARCHIVES = {
+    'orders': Archive(CartOrder, 'date', PURCHASES),
+    # Unseen ones still count towards the bell badge
+    'notifications': Archive(Notification, 'date', Q(seen=False)),
+    # Refunds are what rollup rebuilds and the ledger reconciliation count
+    'wallet': Archive(WalletTransaction, 'created_at', Q(transaction_type='refund')),
+}
+
+
+def _month_start(value):
+    return timezone.localtime(value).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def cutoff(months):
+    """Start of the oldest month that is kept: rows dated before it are archived."""
+    return _add_months(_month_start(timezone.now()), -months)
+
+
+def months(archive, before):
+    """(start, end) of each month from the oldest archivable row up to `before`."""
+    first = archive.candidates(before).aggregate(first=Min(archive.date_field))['first']
+    if first is None:
+        return
+    month = _month_start(first)
+    while month < before:
+        following = _add_months(month, 1)
+        yield month, following
+        month = following
+
+
+def _append(path, data):
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='ab') as member:
+            member.write(data)
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def _serialize(directory, suffix, rows):
+    for model, objects in rows.items():
+        # Many-to-many rows are part of the owning object's serialization
+        if model._meta.auto_created or not objects:
+            continue
+        data = serializers.serialize('jsonl', [objects[pk] for pk in sorted(objects)])
+        _append(os.path.join(directory, f'{model._meta.label_lower}{suffix}.jsonl.gz'), data.encode())
+
+
+def _write(directory, collector):
+    """
+    Serialize everything the collector is about to delete, one file per model, and the rows whose
+    reference it is about to clear (SET_NULL) as they are now, one .refs file per model.
+    """
+    deleted, referencing = defaultdict(dict), defaultdict(dict)
+    for model, instances in collector.data.items():
+        deleted[model].update((obj.pk, obj) for obj in instances)
+    for queryset in collector.fast_deletes:
+        deleted[queryset.model].update((obj.pk, obj) for obj in queryset)
+    for instances_list in collector.field_updates.values():
+        for instances in instances_list:
+            for obj in instances:
+                if obj.pk not in deleted[obj.__class__]:
+                    referencing[obj.__class__][obj.pk] = obj
+
+    os.makedirs(directory, exist_ok=True)
+    _serialize(directory, '', deleted)
+    _serialize(directory, '.refs', referencing)
+
+
+def archive_month(archive, start, end, batch_size=500):
+    """Archive and delete the month's candidates in batches; returns how many top-level rows went."""
+    model = archive.model
+    using = router.db_for_write(model)
+    rows = archive.candidates(end).filter(**{f'{archive.date_field}__gte': start}).using(using)
+    directory = os.path.join(settings.ARCHIVE_DIR, start.strftime('%Y-%m'))
+    archived = 0
+    while True:
+        with transaction.atomic(using=using):
+            ids = list(rows.order_by('pk').select_for_update().values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return archived
+            collector = Collector(using=using)
+            collector.collect(model._base_manager.using(using).filter(pk__in=ids))
+            _write(directory, collector)
+            collector.delete()
+        archived += len(ids)
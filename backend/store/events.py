@@ -0,0 +1,81 @@
+# store/events.py
+"""
+Push events for dashboards over Server-Sent Events (GET /api/events/stream/, ASGI only).
+Any process (web, Celery) publishes to Redis pub/sub on the channel of the user or vendor the
+event is for; each open stream subscribes to its user's channel, and its vendor's if the user
+has a shop, and forwards what arrives as "event: <name>" / "data: <json>" frames.
+Events are sent after the transaction commits and are best effort: a client that was not
+connected (or Redis being down) misses them and catches up from the REST endpoints.
+"""
+import json
+import logging
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+from django.db import transaction
+
+log = logging.getLogger(__name__)
+
+_client = None
+
+
+def channel(user_id=None, vendor_id=None):
+    return f'events:vendor:{vendor_id}' if vendor_id is not None else f'events:user:{user_id}'
+
+
+def _redis():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.EVENTS_REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+    return _client
+
+
+def _send(channels, message):
+    try:
+        client = _redis()
+        for name in channels:
+            client.publish(name, message)
+    except redis.RedisError as e:
+        log.warning("Could not publish event: %s", e)
+
+
+def publish(event, data, user_id=None, vendor_id=None):
+    """Send `event` to the user's and/or the vendor's stream once the current transaction commits."""
+    if not settings.EVENT_STREAM:
+        return
+    channels = [channel(user_id=user_id)] if user_id is not None else []
+    if vendor_id is not None:
+        channels.append(channel(vendor_id=vendor_id))
+    if not channels:
+        return
+    message = json.dumps({'event': event, 'data': data}, default=str)
+    transaction.on_commit(lambda: _send(channels, message), robust=True)
+
+
+def _frame(message):
+    payload = json.loads(message)
+    return f"event: {payload['event']}\ndata: {json.dumps(payload['data'])}\n\n"
+
+
+async def stream(channels, client=None):
+    """
+    SSE frames for everything published on `channels`, with a comment line every
+    EVENTS_KEEPALIVE_SECONDS so proxies keep the connection open. Runs until the client
+    disconnects (Django cancels the response), which unsubscribes.
+    """
+    client = client or aioredis.Redis.from_url(settings.EVENTS_REDIS_URL)
+    pubsub = client.pubsub()
+    await pubsub.subscribe(*channels)
+    try:
+        yield f"retry: {settings.EVENTS_KEEPALIVE_SECONDS * 1000}\n\n"
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True,
+                                               timeout=settings.EVENTS_KEEPALIVE_SECONDS)
+            if message is None:
+                yield ": keepalive\n\n"
+            else:
+                yield _frame(message['data'])
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from store.archive import ARCHIVES, archive_month, cutoff, months
+
+
+class Command(BaseCommand):
+    help = (
+        "Move never-paid orders (with their lines and cancellations), seen notifications and "
+        "wallet transactions other than refunds older than --months into gzipped jsonl fixtures under ARCHIVE_DIR, "
+        "one directory per month, and delete them from the database. Restore a month with "
+        "loaddata <ARCHIVE_DIR>/<YYYY-MM>/*.jsonl.gz."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=settings.ARCHIVE_AFTER_MONTHS,
+                            help="Keep this many whole months before the current one (default ARCHIVE_AFTER_MONTHS)")
+        parser.add_argument('--only', choices=sorted(ARCHIVES), action='append',
+                            help="Archive only this kind of row (repeatable)")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help="Only count what would be archived")
+
+    def handle(self, *args, **options):
+        if options['months'] < 1:
+            raise CommandError("--months must be at least 1")
+        before = cutoff(options['months'])
+        self.stdout.write(f"Archiving rows dated before {before:%Y-%m-%d} to {settings.ARCHIVE_DIR}")
+
+        total = 0
+        for name in options['only'] or ARCHIVES:
+            archive = ARCHIVES[name]
+            for start, end in months(archive, before):
+                if options['dry_run']:
+                    count = archive.candidates(end).filter(**{f'{archive.date_field}__gte': start}).count()
+                else:
+                    count = archive_month(archive, start, end, options['batch_size'])
+                if count:
+                    self.stdout.write(f"{name:<14} {start:%Y-%m} {count:>8}")
+                total += count
+
+        verb = "Would archive" if options['dry_run'] else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {total} row(s)"))
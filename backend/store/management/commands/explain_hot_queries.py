@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from store.query_plans import analyze, check_plans, seed_plan_fixture
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot order/notification/product/offer filters and fail unless each one searches "
+        "the index meant for it (see store/query_plans.py). By default the plans are taken on a "
+        "production-sized fixture seeded and analyzed inside a transaction that is rolled back; "
+        "--live explains them against the data already in the database instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--live', action='store_true', help="Use the current data, seed nothing")
+        parser.add_argument('--scale', type=int, default=1, help="Multiply the fixture size")
+        parser.add_argument('--verbose-plans', action='store_true', help="Print every plan, not just failures")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not options['live']:
+                self.stdout.write("Seeding the plan fixture (rolled back afterwards)...")
+                seed_plan_fixture(scale=options['scale'])
+                analyze()
+            try:
+                checks = check_plans()
+            except NotImplementedError as e:
+                raise CommandError(str(e))
+            transaction.set_rollback(True)
+
+        failures = []
+        for check in checks:
+            name, index = check.query.name, check.query.index
+            if check.skipped:
+                self.stdout.write(f"{name}: skipped on this database")
+                continue
+            if check.problem:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"{name}: {check.problem}"))
+            else:
+                self.stdout.write(f"{name}: ok ({index})")
+            if check.problem or options['verbose_plans']:
+                self.stdout.write(check.plan)
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot query(ies) not served by their index")
+        self.stdout.write(self.style.SUCCESS("All hot queries use their index"))
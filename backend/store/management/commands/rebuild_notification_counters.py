@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from store.notifications import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount every NotificationCounter from the notifications table. Counters are kept "
+        "current as notifications change; run this if a badge ever disagrees with the list."
+    )
+
+    def handle(self, *args, **options):
+        fixed = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f"Fixed {fixed} counter(s)"))
@@ -1,7 +1,7 @@
 from .product import Product
 from .category import  Brand, Tag, Category
 from .order import Cart, CartOrder, CartOrderItem, CancelledOrder, Coupon, CouponUsers, DeliveryCouriers
-from .user import Wishlist, Address, Notification
+from .user import Wishlist, Address, Notification, NotificationCounter
 from .review import Review, ProductFaq
 from .item import Gallery, Specification, Color, Size
 from .cancellation import OrderCancellation, OrderReturn
@@ -10,7 +10,7 @@ from .offer import ProductOffer,CategoryOffer, ReferralOffer
 __all__ = [
     "Product", "Category", "Brand", "Tag", "Specification", "Size", "Color", "Gallery", "ProductFaq",
     "Cart", "CartOrder", "CartOrderItem", "CancelledOrder", "Coupon", "CouponUsers", "DeliveryCouriers",
-    "Wishlist", "Address", "Notification", "Review",'OrderCancellation',
+    "Wishlist", "Address", "Notification", "NotificationCounter", "Review",'OrderCancellation',
     'OrderReturn', "ProductOffer","CategoryOffer", "ReferralOffer"
     
 ]
@@ -1,9 +1,13 @@
+import logging
+
 from .choices import CANCELLATION_REASON_CHOICES, RETURN_REASON_CHOICES
 from django.db import models
 from django.utils import timezone
 from userauth.models import User
 from .order import  CartOrder, CartOrderItem#, Cart, CancelOrder, Coupon, CouponUsers, DeliveryCountries
 
+log = logging.getLogger(__name__)
+
 class OrderCancellation(models.Model):
     order = models.ForeignKey(CartOrder, on_delete=models.CASCADE, related_name = 'cancellations')
     cancelled_by = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
@@ -18,19 +22,14 @@ class OrderCancellation(models.Model):
     
     def restore_stock(self):
         """Restore stock for cancelled items"""
-        import logging
-        log = logging.getLogger(__name__)
-        
         items_to_restore = self.items.all() if not self.is_full_order else self.order.orderitem.all()
-        log.info(f"Restoring stock for cancellation {self.id}. is_full_order={self.is_full_order}")
-        log.info(f"Items to restore count: {items_to_restore.count()}")
         
         for item in items_to_restore:
             product = item.product
             old_stock = product.stock_qty
             product.stock_qty += item.qty
             product.save()
-            log.info(f"Restored stock for product {product.title} (ID: {product.id}): {old_stock} + {item.qty} = {product.stock_qty}")
+            log.debug("Restored stock for product %s: %s + %s = %s", product.id, old_stock, item.qty, product.stock_qty)
             
 class OrderReturn(models.Model):
     RETURN_STATUS_CHOICES = [
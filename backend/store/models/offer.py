@@ -17,6 +17,13 @@ class ProductOffer(models.Model):
     is_active = models.BooleanField(default=True)
     products = models.ManyToManyField(Product, related_name='product_offers')
 
+    class Meta:
+        # Running-offer lookups: (end_date is null or >= now) and start_date <= now. Most offers have
+        # ended and nearly all have started, so end_date leads: each side of the OR is a range on it
+        indexes = [
+            models.Index(fields=['end_date', 'start_date'], name='productoffer_running_idx'),
+        ]
+
     def __str__(self):
         return f"{self.discount_percentage}% on {self.products.count()} products"
 
@@ -32,6 +39,10 @@ class CategoryOffer(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='category_offers')
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'start_date', 'end_date'], name='categoryoffer_running_idx'),
+        ]
 
     def __str__(self):
         return f"{self.discount_percentage}% off on {self.category.title}"
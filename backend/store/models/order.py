@@ -108,10 +108,21 @@ class CartOrder(models.Model):
     razorpay_session_id = models.CharField(max_length=200, null=True, blank=True)
     oid = models.CharField(max_length=20, unique=True, editable=False, db_index=True)
     date = models.DateTimeField(default=timezone.now)
+    # Last change to the order; vendor report jobs are versioned by it
+    updated = models.DateTimeField(auto_now=True)
    
     class Meta:
         ordering = ["-date"]
         verbose_name_plural = "Cart Order"
+        # Admin order list filters; all of them sort newest first
+        indexes = [
+            models.Index(fields=["-date"]),
+            models.Index(fields=["payment_status", "-date"], name="cartorder_status_date_idx"),
+            models.Index(fields=["order_status", "-date"]),
+            models.Index(fields=["email"]),
+            # Customer order history
+            models.Index(fields=["buyer", "payment_status"], name="cartorder_buyer_status_idx"),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.oid:
@@ -168,10 +179,17 @@ class CartOrderItem(models.Model):
     # A foreign key relationship to the Vendor model with SET_NULL option
     vendor = models.ForeignKey(Vendor, on_delete=models.SET_NULL, null=True)
     date = models.DateTimeField(default=timezone.now)
+    # Last change to the line; vendor report jobs are versioned by it
+    updated = models.DateTimeField(auto_now=True)
    
     class Meta:
         verbose_name_plural = "Cart Order Item"
         ordering = ["-date"]
+        indexes = [
+            models.Index(fields=["vendor", "-date"], name="orderitem_vendor_date_idx"),
+            # Lines of one vendor within an order (coupons, status updates)
+            models.Index(fields=["order", "vendor"], name="orderitem_order_vendor_idx"),
+        ]
        
     # Method to generate an HTML image tag for the order item
     def order_img(self):
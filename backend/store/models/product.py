@@ -66,6 +66,10 @@ class Product(models.Model):
     class Meta:
         ordering = ['-id']
         verbose_name_plural = "Products"
+        indexes = [
+            models.Index(fields=['status', 'vendor', '-date'], name='product_status_vendor_idx'),
+            models.Index(fields=['category', 'status'], name='product_category_status_idx'),
+        ]
     
     # Returns an HTML image tag for the product's image
     def product_image(self):
@@ -42,6 +42,10 @@ class Notification(models.Model):
     
     class Meta:
         verbose_name_plural = "Notification"
+        indexes = [
+            models.Index(fields=["vendor", "seen", "-date"], name="notification_vendor_seen_idx"),
+            models.Index(fields=["user", "seen", "-date"], name="notification_user_seen_idx"),
+        ]
     
     # Method to return a string representation of the object
     def __str__(self):
@@ -49,6 +53,21 @@ class Notification(models.Model):
             return self.order.oid
         else:
             return "Notification"
+
+
+# Unread/total notification counts of one user or one vendor, kept current by store.notifications
+# so the bell badge and the vendor summary don't count rows
+class NotificationCounter(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True, related_name="notification_counter")
+    vendor = models.OneToOneField(Vendor, on_delete=models.CASCADE, null=True, blank=True, related_name="notification_counter")
+    unread = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Notification Counters"
+
+    def __str__(self):
+        return f"{self.vendor or self.user}: {self.unread}/{self.total} unread"
         
 # Define a model for Address
 class Address(models.Model):
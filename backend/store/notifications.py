@@ -0,0 +1,141 @@
+# store/notifications.py
+"""
+Notification read state and the per-user / per-vendor NotificationCounter.
+Single rows (checkout, admin, serializer saves, archive deletes, loaddata) move the counters
+through model signals, connected in StoreConfig.ready(); mark_seen() flips many rows with one
+UPDATE and moves the owner's counter by the number of rows it changed.
+A counter row is created from a real count when its owner's notifications first change (or when
+first read, for notifications older than the counters), so deploying this needs no backfill;
+rebuild_notification_counters recounts if one ever drifts.
+New notifications are also pushed to the owner's event stream (store.events).
+Notifications belong to either a user or a vendor (that is how checkout creates them), so bulk
+changes are scoped to one owner and only move that owner's counter.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+from store.events import publish
+from store.models import Notification, NotificationCounter
+
+OWNERS = ('user', 'vendor')
+
+
+def _owner(user=None, vendor=None):
+    return ('vendor', vendor.pk) if vendor is not None else ('user', user.pk)
+
+
+def _count(owner, owner_id):
+    return Notification.objects.filter(**{f'{owner}_id': owner_id}).aggregate(
+        unread=Count('id', filter=Q(seen=False)), total=Count('id'))
+
+
+def _create(owner, owner_id, current):
+    """Counter row from a fresh count; IntegrityError if another transaction created it first."""
+    with transaction.atomic():
+        NotificationCounter.objects.create(**{f'{owner}_id': owner_id}, **current)
+
+
+def _bump(owner, owner_id, unread=0, total=0):
+    if owner_id is None or not (unread or total):
+        return
+    counters = NotificationCounter.objects.filter(**{f'{owner}_id': owner_id})
+    changes = {'unread': F('unread') + unread, 'total': F('total') + total}
+    if counters.update(**changes):
+        return
+    # First change for this owner: the count already includes it
+    try:
+        _create(owner, owner_id, _count(owner, owner_id))
+    except IntegrityError:
+        # A concurrent first change created the row, counting without this one
+        counters.update(**changes)
+
+
+def counts(user=None, vendor=None):
+    """Unread/read/all notifications of one owner, in NotificationSummarySerializer's shape."""
+    owner, owner_id = _owner(user, vendor)
+    counter = NotificationCounter.objects.filter(**{f'{owner}_id': owner_id}).first()
+    if counter is not None:
+        current = {'unread': counter.unread, 'total': counter.total}
+    else:
+        # Owner without notifications, or whose notifications predate the counters
+        current = _count(owner, owner_id)
+        if current['total']:
+            try:
+                _create(owner, owner_id, current)
+            except IntegrityError:
+                pass  # created concurrently (or not yet visible on the replica)
+    return {'un_read_noti': current['unread'], 'read_noti': current['total'] - current['unread'],
+            'all_noti': current['total']}
+
+
+def select(notifications, ids=None, since=None, until=None):
+    """Narrow a bulk change to some ids and/or a range of days (both inclusive, local time)."""
+    if ids:
+        notifications = notifications.filter(id__in=ids)
+    if since:
+        notifications = notifications.filter(date__gte=timezone.make_aware(datetime.combine(since, time.min)))
+    if until:
+        notifications = notifications.filter(date__lt=timezone.make_aware(datetime.combine(until + timedelta(days=1), time.min)))
+    return notifications
+
+
+def mark_seen(notifications, seen=True, user=None, vendor=None):
+    """
+    Set seen on the owner's rows among `notifications` with one UPDATE and move the owner's
+    counter by the number of rows that changed, in the same transaction. Returns that number.
+    """
+    owner, owner_id = _owner(user, vendor)
+    with transaction.atomic():
+        changed = notifications.filter(**{f'{owner}_id': owner_id}).exclude(seen=seen).update(seen=seen)
+        _bump(owner, owner_id, unread=-changed if seen else changed)
+    return changed
+
+
+def rebuild_counters():
+    """Recount every counter row from the notifications table; returns how many were wrong."""
+    fixed = 0
+    for pk in NotificationCounter.objects.values_list('pk', flat=True).iterator():
+        with transaction.atomic():
+            counter = NotificationCounter.objects.select_for_update().get(pk=pk)
+            owner = 'vendor' if counter.vendor_id else 'user'
+            current = _count(owner, getattr(counter, f'{owner}_id'))
+            if (counter.unread, counter.total) != (current['unread'], current['total']):
+                counter.unread, counter.total = current['unread'], current['total']
+                counter.save(update_fields=['unread', 'total'])
+                fixed += 1
+    return fixed
+
+
+######################## Signals ########################
+
+def remember_seen(sender, instance, **kwargs):
+    # Absent when the field was deferred; such instances never change the counters on save
+    instance._seen_was = instance.__dict__.get('seen')
+
+
+def notification_saved(sender, instance, created, **kwargs):
+    if created:
+        for owner in OWNERS:
+            _bump(owner, getattr(instance, f'{owner}_id'), unread=0 if instance.seen else 1, total=1)
+        publish('notification', {
+            'id': instance.id, 'order': instance.order_id, 'order_item': instance.order_item_id, 'seen': instance.seen,
+        }, user_id=instance.user_id, vendor_id=instance.vendor_id)
+    elif instance._seen_was is not None and instance._seen_was != instance.seen:
+        for owner in OWNERS:
+            _bump(owner, getattr(instance, f'{owner}_id'), unread=-1 if instance.seen else 1)
+    instance._seen_was = instance.seen
+
+
+def notification_deleted(sender, instance, **kwargs):
+    for owner in OWNERS:
+        _bump(owner, getattr(instance, f'{owner}_id'), unread=0 if instance.seen else -1, total=-1)
+
+
+def connect():
+    post_init.connect(remember_seen, sender=Notification, dispatch_uid='notification-remember-seen')
+    post_save.connect(notification_saved, sender=Notification, dispatch_uid='notification-counter-saved')
+    post_delete.connect(notification_deleted, sender=Notification, dispatch_uid='notification-counter-deleted')
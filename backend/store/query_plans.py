@@ -0,0 +1,215 @@
+# store/query_plans.py
+"""
+The filters behind the busiest list/dashboard views and the index each of them must be served
+by (explain_hot_queries command, store.tests). A planner only shows its real choice on tables
+of a realistic size and spread with fresh statistics, so seed_plan_fixture() bulk-creates a shop
+of that shape and analyze() refreshes the statistics; check_plans() then reads each EXPLAIN
+and accepts it only if the expected index is searched with a condition. A sequential scan, a
+scan of a whole index (e.g. walking the primary key in order) or a different index fails.
+"""
+import re
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from store.models import (CartOrder, CartOrderItem, Category, CategoryOffer, Notification, Product,
+                          ProductOffer)
+from userauth.models import User
+from vendor.models import Vendor
+
+# PostgreSQL: "Index Scan using <index> on <table>", "Index Only Scan using ...",
+# "Bitmap Index Scan on <index>", each followed by an "Index Cond:" line when it is a lookup
+PG_INDEX = re.compile(r'(?:Index(?: Only)? Scan using|Bitmap Index Scan on) (\w+)')
+PG_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+# SQLite: "SEARCH <table> USING INDEX <index> (<cond>)" is a lookup, "SCAN <table> USING INDEX" a full walk
+SQLITE_SEARCH = re.compile(r'\bSEARCH (\w+) USING (?:COVERING )?INDEX (\w+) \(')
+SQLITE_INDEX_SCAN = re.compile(r'\bSCAN (\w+) USING (?:COVERING )?INDEX (\w+)')
+SQLITE_SEQ_SCAN = re.compile(r'\bSCAN (\w+)\b(?! USING)')
+
+
+@dataclass
+class HotQuery:
+    name: str
+    queryset: object
+    index: str
+    vendors: tuple = ('postgresql', 'sqlite')  # databases whose planner can search the index for it
+
+
+@dataclass
+class PlanCheck:
+    query: HotQuery
+    plan: str = ''
+    problem: str = ''
+    skipped: bool = False
+
+
+def _first_id(model, **filters):
+    return model.objects.filter(**filters).order_by().values_list('id', flat=True).first() or 0
+
+
+def hot_queries():
+    """The hot filters, with ids picked from the current data."""
+    vendor_id = _first_id(Vendor)
+    user_id = _first_id(User, buyer__isnull=False)
+    order_id, category_id = _first_id(CartOrder), _first_id(Category)
+    now = timezone.now()
+    running = Q(start_date__lte=now) & (Q(end_date__isnull=True) | Q(end_date__gte=now))
+    # seen=False is compiled to "NOT seen", which SQLite cannot search an index column with
+    postgresql_only = ('postgresql',)
+
+    return [
+        HotQuery('admin paid orders', CartOrder.objects.filter(payment_status='paid').order_by('-date')[:20],
+                 'cartorder_status_date_idx'),
+        HotQuery('customer orders', CartOrder.objects.filter(buyer_id=user_id, payment_status='paid'),
+                 'cartorder_buyer_status_idx'),
+        HotQuery('vendor order lines', CartOrderItem.objects.filter(vendor_id=vendor_id).order_by('-date')[:20],
+                 'orderitem_vendor_date_idx'),
+        HotQuery('order lines of a vendor', CartOrderItem.objects.filter(order_id=order_id, vendor_id=vendor_id),
+                 'orderitem_order_vendor_idx'),
+        HotQuery('vendor unseen notifications',
+                 Notification.objects.filter(vendor_id=vendor_id, seen=False).order_by('-date'),
+                 'notification_vendor_seen_idx', postgresql_only),
+        HotQuery('customer unseen notifications',
+                 Notification.objects.filter(user_id=user_id, seen=False).order_by('-date'),
+                 'notification_user_seen_idx', postgresql_only),
+        HotQuery('vendor published products',
+                 Product.objects.filter(status='published', vendor_id=vendor_id).order_by('-date'),
+                 'product_status_vendor_idx'),
+        HotQuery('category products', Product.objects.filter(category_id=category_id, status='published'),
+                 'product_category_status_idx'),
+        HotQuery('running product offers', ProductOffer.objects.filter(running), 'productoffer_running_idx'),
+        HotQuery('running category offers', CategoryOffer.objects.filter(running, category_id=category_id),
+                 'categoryoffer_running_idx'),
+    ]
+
+
+######################## Fixture ########################
+
+def seed_plan_fixture(scale=1):
+    """
+    Bulk-create a shop shaped like production at `scale` (1: 50 vendors, 2,000 customers,
+    2,500 products, 10,000 orders over two years with 20,000 lines and 30,000 notifications,
+    mostly seen; 500 product and 100 category offers, mostly ended). No signals run.
+    """
+    now = timezone.now()
+    customers = User.objects.bulk_create(
+        [User(email=f'plan-customer{i}@example.com', username=f'plan-customer{i}') for i in range(2000 * scale)])
+    vendor_users = User.objects.bulk_create(
+        [User(email=f'plan-vendor{i}@example.com', username=f'plan-vendor{i}') for i in range(50 * scale)])
+    vendors = Vendor.objects.bulk_create(
+        [Vendor(user=user, name=f'Plan shop {i}', slug=f'plan-shop-{i}') for i, user in enumerate(vendor_users)])
+    categories = Category.objects.bulk_create([Category(title=f'Plan category {i}') for i in range(25)])
+
+    statuses = ['draft', 'disabled'] + ['published'] * 18
+    products = Product.objects.bulk_create([
+        Product(title=f'Plan product {i}', slug=f'plan-product-{i}', sku=f'SKU{i:08d}', price=Decimal('100.00'), stock_qty=10,
+                vendor=vendors[i % len(vendors)], category=categories[i * 7 % len(categories)],
+                status=statuses[i % len(statuses)])
+        for i in range(2500 * scale)
+    ], batch_size=1000)
+
+    payment_states = ['paid'] * 8 + ['pending', 'cancelled']
+    count = 10000 * scale
+    orders = CartOrder.objects.bulk_create([
+        CartOrder(oid=f'PLAN{i:010d}', buyer=customers[i * 37 % len(customers)], full_name='Plan buyer',
+                  email=f'plan-buyer{i}@example.com', mobile='9999999999',
+                  payment_status=payment_states[i % len(payment_states)], total=Decimal('200.00'),
+                  date=now - timedelta(days=730) * (count - i) / count)
+        for i in range(count)
+    ], batch_size=1000)
+    items = CartOrderItem.objects.bulk_create([
+        CartOrderItem(order=order, product=product, vendor=product.vendor, qty=1, price=product.price,
+                      sub_total=product.price, total=product.price, date=order.date)
+        for i, order in enumerate(orders)
+        for product in (products[i * 13 % len(products)], products[(i * 13 + 101) % len(products)])
+    ], batch_size=1000)
+
+    notifications = [
+        Notification(vendor=item.vendor, order=item.order, order_item=item, seen=i % 20 != 0)
+        for i, item in enumerate(items)
+    ] + [
+        Notification(user=order.buyer, order=order, seen=i % 20 != 0) for i, order in enumerate(orders)
+    ]
+    Notification.objects.bulk_create(notifications, batch_size=1000)
+
+    # 2% open-ended, 2% still running, the rest ended
+    ProductOffer.objects.bulk_create([
+        ProductOffer(vendor=vendors[i % len(vendors)], discount_percentage=Decimal('10.00'),
+                     start_date=now - timedelta(days=700 - i % 500),
+                     end_date=None if i % 50 == 0 else now + timedelta(days=5) if i % 25 == 0
+                     else now - timedelta(days=690 - i % 500))
+        for i in range(500 * scale)
+    ], batch_size=1000)
+    CategoryOffer.objects.bulk_create([
+        CategoryOffer(category=categories[i % len(categories)], discount_percentage=Decimal('5.00'),
+                      start_date=now - timedelta(days=400 - i % 100 * 3),
+                      end_date=now + timedelta(days=5) if i % 10 == 0 else now - timedelta(days=390 - i % 100 * 3))
+        for i in range(100 * scale)
+    ])
+
+
+def analyze():
+    """Refresh the planner statistics of the hot tables."""
+    with connection.cursor() as cursor:
+        for model in (CartOrder, CartOrderItem, Notification, Product, ProductOffer, CategoryOffer):
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+
+######################## Plans ########################
+
+def _pg_lookups(plan):
+    """Indexes searched with an Index Cond, and indexes walked whole."""
+    lookups, walks = set(), set()
+    lines = plan.splitlines()
+    for n, line in enumerate(lines):
+        match = PG_INDEX.search(line)
+        if not match:
+            continue
+        # The node's own detail lines come before the next "->" node
+        detail = []
+        for following in lines[n + 1:]:
+            if '->' in following:
+                break
+            detail.append(following)
+        (lookups if any('Index Cond:' in d for d in detail) else walks).add(match.group(1))
+    return lookups, walks, set(PG_SEQ_SCAN.findall(plan))
+
+
+def _sqlite_lookups(plan):
+    return ({index for _, index in SQLITE_SEARCH.findall(plan)},
+            {index for _, index in SQLITE_INDEX_SCAN.findall(plan)},
+            set(SQLITE_SEQ_SCAN.findall(plan)))
+
+
+PLAN_READERS = {'postgresql': _pg_lookups, 'sqlite': _sqlite_lookups}
+
+
+def problem(plan, index, vendor=None):
+    """Why a plan does not search `index`, or '' if it does."""
+    lookups, walks, seq_scans = PLAN_READERS[vendor or connection.vendor](plan)
+    if index in lookups:
+        return ''
+    if seq_scans:
+        return f"sequential scan on {', '.join(sorted(seq_scans))}"
+    if index in walks:
+        return f"reads all of {index} instead of searching it"
+    used = sorted(lookups | walks)
+    return f"uses {', '.join(used)} instead of {index}" if used else f"does not use {index}"
+
+
+def check_plans():
+    """A PlanCheck per hot query; problem is empty when its index serves it."""
+    if connection.vendor not in PLAN_READERS:
+        raise NotImplementedError(f"Don't know how to read {connection.vendor} plans")
+    checks = []
+    for query in hot_queries():
+        if connection.vendor not in query.vendors:
+            checks.append(PlanCheck(query, skipped=True))
+            continue
+        plan = query.queryset.explain()
+        checks.append(PlanCheck(query, plan, problem(plan, query.index)))
+    return checks
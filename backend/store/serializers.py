@@ -385,6 +385,18 @@ class NotificationSummarySerializer(serializers.Serializer):
     read_noti = serializers.IntegerField(default=0)
     all_noti = serializers.IntegerField(default=0)
 
+class NotificationBulkSeenSerializer(serializers.Serializer):
+    # No ids or dates: every notification of the owner
+    seen = serializers.BooleanField(default=True)
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=1000)
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if data.get('since') and data.get('until') and data['since'] > data['until']:
+            raise serializers.ValidationError("since must not be after until")
+        return data
+
 class OrderCancellationSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderCancellation
@@ -1,3 +1,320 @@
-from django.test import TestCase
+import asyncio
+import glob
+import os
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core import signing
+from django.core.management import call_command
+from django.test import AsyncClient, AsyncRequestFactory, Client, RequestFactory, TestCase, override_settings, tag
+from django.urls import path
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from store import events, notifications
+from store.models import Cart, CartOrder, CartOrderItem, Category, Notification, NotificationCounter, Product
+from store.query_plans import analyze, check_plans, seed_plan_fixture
+from store.views import async_views
+from store.views.Review_views import HasPurchasedView
+from store.views.cart_views import CartMergeAPIView
+from store.views.event_views import TICKET_SALT, EventStreamView
+from store.views.order_management_views import GuestOrderTrackingView
+from store.views.product_category import ProductDetailView
+from userauth.models import User, Wallet, WalletTransaction
+from vendor import rollups
+from vendor.models import Vendor
+
+try:
+    import fakeredis
+except ImportError:  # listed in requirements.txt; the stream tests need it
+    fakeredis = None
+
+
+@tag('slow')
+class HotQueryPlanTests(TestCase):
+    """The hot filters are searched through their own index on a production-sized, analyzed fixture."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_plan_fixture()
+        analyze()
+
+    def test_hot_queries_search_their_index(self):
+        for check in check_plans():
+            if check.skipped:
+                continue
+            with self.subTest(check.query.name):
+                self.assertEqual(check.problem, '', f"{check.query.index}:\n{check.plan}")
+
+
+class ArchiveTests(TestCase):
+    """archive_history moves old abandoned checkouts out and keeps every purchase."""
+
+    def setUp(self):
+        archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        self.archive_dir = archive_dir.name
+
+        self.buyer = User.objects.create(email='buyer@example.com')
+        vendor = Vendor.objects.create(user=User.objects.create(email='vendor@example.com'), name='Shop')
+        self.product = Product.objects.create(title='Product', price=Decimal('10.00'), vendor=vendor,
+                                              category=Category.objects.create(title='Category'), stock_qty=10)
+        two_years_ago = timezone.now() - timedelta(days=730)
+        self.paid, self.abandoned = [
+            CartOrder.objects.create(buyer=self.buyer, full_name='Buyer', email=self.buyer.email, mobile='1',
+                                     payment_status=payment_status, total=Decimal('10.00'), date=two_years_ago)
+            for payment_status in ('paid', 'initiated')
+        ]
+        for order in (self.paid, self.abandoned):
+            CartOrderItem.objects.create(order=order, product=self.product, vendor=vendor, qty=1, price=Decimal('10.00'),
+                                         sub_total=Decimal('10.00'), total=Decimal('10.00'), date=two_years_ago)
+        self.notification = Notification.objects.create(user=self.buyer, order=self.abandoned)
+
+    def archive(self):
+        with override_settings(ARCHIVE_DIR=self.archive_dir):
+            call_command('archive_history', months=12, stdout=StringIO())
+
+    def test_purchases_stay(self):
+        self.archive()
+        self.assertEqual(list(CartOrder.objects.values_list('id', flat=True)), [self.paid.id])
+        # What order history and review eligibility read
+        self.assertTrue(CartOrder.objects.filter(buyer=self.buyer, payment_status='paid',
+                                                 orderitem__product=self.product).exists())
+
+    def test_loaddata_restores_archived_orders_and_references(self):
+        self.archive()
+        self.notification.refresh_from_db()
+        self.assertIsNone(self.notification.order_id)
+
+        files = sorted(glob.glob(os.path.join(self.archive_dir, '*', '*.jsonl.gz')))
+        call_command('loaddata', *files, verbosity=0)
+        self.assertTrue(CartOrder.objects.filter(id=self.abandoned.id, orderitem__isnull=False).exists())
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.order_id, self.abandoned.id)
+
+    def test_refunds_stay_for_rollup_rebuilds(self):
+        wallet = Wallet.objects.get_or_create(user=self.buyer)[0]
+        wallet.deposit(Decimal('4.00'), 'refund', related_order=self.paid, related_order_item=self.paid.orderitem.get())
+        wallet.deposit(Decimal('50.00'), 'deposit')
+        WalletTransaction.objects.update(created_at=self.paid.date)
+        self.archive()
+
+        self.assertEqual(list(WalletTransaction.objects.values_list('transaction_type', flat=True)), ['refund'])
+        call_command('backfill_daily_sales', stdout=StringIO())
+        self.assertEqual(rollups.vendor_totals(self.paid.orderitem.get().vendor)['refunds'], Decimal('4.00'))
+
+
+class NotificationCounterTests(TestCase):
+    """NotificationCounter agrees with a recount of the notifications after every kind of change."""
+
+    def setUp(self):
+        self.user = User.objects.create(email='buyer@example.com')
+        self.vendor = Vendor.objects.create(user=User.objects.create(email='vendor@example.com'), name='Shop')
+        for seen in (False, False, False, True):
+            Notification.objects.create(user=self.user, seen=seen)
+            Notification.objects.create(vendor=self.vendor, seen=seen)
+
+    def assertCounts(self, unread, total, user=None, vendor=None):
+        owner, owner_id = notifications._owner(user, vendor)
+        self.assertEqual(notifications._count(owner, owner_id), {'unread': unread, 'total': total})
+        self.assertEqual(notifications.counts(user, vendor),
+                         {'un_read_noti': unread, 'read_noti': total - unread, 'all_noti': total})
+
+    def assertConsistent(self):
+        self.assertEqual(notifications.rebuild_counters(), 0)
+
+    def test_mark_seen(self):
+        changed = notifications.mark_seen(Notification.objects.all(), user=self.user)
+        self.assertEqual(changed, 3)
+        self.assertCounts(0, 4, user=self.user)
+        self.assertCounts(3, 4, vendor=self.vendor)  # another owner's rows are left alone
+        self.assertEqual(notifications.mark_seen(Notification.objects.all(), user=self.user), 0)
+        self.assertCounts(0, 4, user=self.user)
+
+        some = Notification.objects.filter(user=self.user).order_by('id')[:2].values_list('id', flat=True)
+        notifications.mark_seen(notifications.select(Notification.objects.all(), ids=list(some)), seen=False, user=self.user)
+        self.assertCounts(2, 4, user=self.user)
+        self.assertConsistent()
+
+    def test_single_row_changes(self):
+        notification = Notification.objects.filter(vendor=self.vendor, seen=False).first()
+        notification.seen = True
+        notification.save()
+        self.assertCounts(2, 4, vendor=self.vendor)
+        notification.save()  # unchanged
+        self.assertCounts(2, 4, vendor=self.vendor)
+        self.assertConsistent()
+
+    def test_delete(self):
+        Notification.objects.filter(user=self.user, seen=False).first().delete()
+        self.assertCounts(2, 3, user=self.user)
+        Notification.objects.filter(user=self.user, seen=True).delete()
+        self.assertCounts(2, 2, user=self.user)
+        Notification.objects.filter(vendor=self.vendor).delete()
+        self.assertCounts(0, 0, vendor=self.vendor)
+        self.assertConsistent()
+
+    def test_notifications_older_than_the_counter(self):
+        NotificationCounter.objects.all().delete()
+        self.assertCounts(3, 4, vendor=self.vendor)
+        Notification.objects.create(vendor=self.vendor)
+        self.assertCounts(4, 5, vendor=self.vendor)
+        self.assertConsistent()
+
+    def test_bulk_endpoint(self):
+        response = APIClient().post(f'/api/vendor-notifications-mark-seen/{self.vendor.id}/', {}, format='json')
+        self.assertEqual(response.data, {'updated': 3, 'un_read_noti': 0, 'read_noti': 4, 'all_noti': 4})
+        self.assertConsistent()
+
+
+@skipIf(fakeredis is None, "fakeredis is not installed")
+@override_settings(EVENT_STREAM=True, EVENTS_KEEPALIVE_SECONDS=1)
+class EventStreamTests(TestCase):
+    """The SSE stream, served in process against an in-memory Redis."""
+
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        for target, client in (('store.events._client', fakeredis.FakeRedis(server=server)),
+                               ('store.events.aioredis.Redis.from_url',
+                                lambda *args, **kwargs: fakeredis.FakeAsyncRedis(server=server))):
+            patcher = mock.patch(target, client)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.user = User.objects.create(email='vendor@example.com')
+        self.vendor = Vendor.objects.create(user=self.user, name='Shop')
+        ticket = signing.TimestampSigner(salt=TICKET_SALT).sign(str(self.user.id))
+        self.path = f'/api/events/stream/?ticket={ticket}'
+
+    @staticmethod
+    async def next_event(frames, timeout=5):
+        async def skip_keepalives():
+            async for frame in frames:
+                if frame != b': keepalive\n\n':
+                    return frame
+        return await asyncio.wait_for(skip_keepalives(), timeout)
+
+    async def test_needs_asgi(self):
+        response = await EventStreamView.as_view()(RequestFactory().get(self.path))
+        self.assertEqual(response.status_code, 501)
+
+    async def test_bad_ticket(self):
+        response = await EventStreamView.as_view()(AsyncRequestFactory().get('/api/events/stream/?ticket=1:forged'))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_streams_user_and_vendor_events(self):
+        response = await EventStreamView.as_view()(AsyncRequestFactory().get(self.path))
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'text/event-stream'))
+        frames = aiter(response.streaming_content)
+        try:
+            self.assertEqual(await anext(frames), b'retry: 1000\n\n')  # subscribed from here on
+            events._send([events.channel(user_id=self.user.id)], '{"event": "order_status", "data": {"oid": "R1"}}')
+            events._send([events.channel(vendor_id=self.vendor.id)], '{"event": "notification", "data": {"id": 7}}')
+            events._send([events.channel(user_id=0)], '{"event": "notification", "data": {"id": 8}}')  # someone else's
+
+            self.assertEqual(await self.next_event(frames), b'event: order_status\ndata: {"oid": "R1"}\n\n')
+            self.assertEqual(await self.next_event(frames), b'event: notification\ndata: {"id": 7}\n\n')
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.next_event(frames, timeout=0.2)
+        finally:
+            await frames.aclose()
+
+    def test_publish_after_commit(self):
+        channel = events.channel(vendor_id=self.vendor.id)
+        pubsub = events._redis().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(vendor=self.vendor)
+            self.assertIsNone(pubsub.get_message())  # nothing before the commit
+        message = pubsub.get_message()
+        self.assertEqual(message['channel'], channel.encode())
+        self.assertIn(b'"event": "notification"', message['data'])
+
+
+class SyncURLs:
+    urlpatterns = [
+        path('api/products/<slug:slug>/', ProductDetailView.as_view()),
+        path('api/guest-track-order/', GuestOrderTrackingView.as_view()),
+        path('api/product/<int:product_id>/has-purchased/', HasPurchasedView.as_view()),
+        path('api/cart-merge/', CartMergeAPIView.as_view()),
+    ]
+
+
+class AsyncURLs:
+    urlpatterns = [
+        path('api/products/<slug:slug>/', async_views.ProductDetailAsyncView.as_view()),
+        path('api/guest-track-order/', async_views.GuestOrderTrackingAsyncView.as_view()),
+        path('api/product/<int:product_id>/has-purchased/', async_views.HasPurchasedAsyncView.as_view()),
+        path('api/cart-merge/', async_views.CartMergeAsyncView.as_view()),
+    ]
+
+
+@override_settings(METRICS_ENABLED=False)
+class AsyncViewParityTests(TestCase):
+    """Each async view answers exactly like the DRF view it replaces under ASYNC_READ_VIEWS."""
+
+    def setUp(self):
+        self.buyer = User.objects.create(email='buyer@example.com')
+        vendor = Vendor.objects.create(user=User.objects.create(email='vendor@example.com'), name='Shop')
+        category = Category.objects.create(title='Category')
+        self.product = Product.objects.create(title='Lamp', price=Decimal('20.00'), vendor=vendor,
+                                              category=category, stock_qty=5)
+        self.draft = Product.objects.create(title='Draft', price=Decimal('20.00'), vendor=vendor,
+                                            category=category, stock_qty=5, status='draft')
+        self.order = CartOrder.objects.create(buyer=self.buyer, full_name='Buyer', email=self.buyer.email,
+                                              mobile='1', payment_status='paid', total=Decimal('20.00'))
+        CartOrderItem.objects.create(order=self.order, product=self.product, vendor=vendor, qty=1,
+                                     price=Decimal('20.00'), sub_total=Decimal('20.00'), total=Decimal('20.00'))
+        for _ in range(2):
+            Cart.objects.create(product=self.product, user=self.buyer, qty=1, cart_id='c1', is_active=True)
+        self.auth = {'Authorization': f'Bearer {AccessToken.for_user(self.buyer)}'}
+
+    def assertSameResponse(self, method, url, data=None, **extra):
+        if data is not None:
+            extra.update(data=data, content_type='application/json')
+        with override_settings(ROOT_URLCONF=SyncURLs):
+            expected = getattr(Client(), method)(url, **extra)
+        with override_settings(ROOT_URLCONF=AsyncURLs):
+            actual = async_to_sync(getattr(AsyncClient(), method))(url, **extra)
+        self.assertEqual((actual.status_code, actual.json()), (expected.status_code, expected.json()))
+        return actual
+
+    def test_product_detail(self):
+        self.assertEqual(self.assertSameResponse('get', f'/api/products/{self.product.slug}/').json()['id'],
+                         self.product.id)
+        for slug in ('no-such-product', self.draft.slug):
+            with self.subTest(slug=slug):
+                self.assertEqual(self.assertSameResponse('get', f'/api/products/{slug}/').status_code, 404)
+
+    def test_guest_order_tracking(self):
+        url = '/api/guest-track-order/'
+        found = self.assertSameResponse('post', url, {'order_oid': self.order.oid, 'email': 'BUYER@example.com'})
+        self.assertEqual(found.json()['oid'], self.order.oid)
+        self.assertEqual(self.assertSameResponse(
+            'post', url, {'order_oid': self.order.oid, 'email': 'someone@example.com'}).status_code, 404)
+        self.assertEqual(self.assertSameResponse('post', url, {'order_oid': self.order.oid}).status_code, 400)
+
+    def test_has_purchased(self):
+        for product, bought in ((self.product, True), (self.draft, False)):
+            with self.subTest(product=product.title):
+                response = self.assertSameResponse('get', f'/api/product/{product.id}/has-purchased/',
+                                                   headers=self.auth)
+                self.assertEqual(response.json(), {'has_purchased': bought})
+        self.assertEqual(self.assertSameResponse('get', f'/api/product/{self.product.id}/has-purchased/')
+                         .status_code, 401)
+        self.assertEqual(self.assertSameResponse('get', f'/api/product/{self.product.id}/has-purchased/',
+                                                 headers={'Authorization': 'Bearer forged'}).status_code, 401)
+
+    def test_cart_merge(self):
+        other = User.objects.create(email='other@example.com')
+        self.assertEqual(self.assertSameResponse('post', '/api/cart-merge/', {'user_id': self.buyer.id})
+                         .json()['cart_count'], 2)
+        self.assertTrue(self.assertSameResponse('post', '/api/cart-merge/', {'user_id': other.id})
+                        .json()['start_new'])
+        for data in ({}, {'user_id': 'abc'}, {'user_id': 999999}):
+            with self.subTest(data=data):
+                self.assertSameResponse('post', '/api/cart-merge/', data)
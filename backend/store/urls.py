@@ -1,4 +1,5 @@
 # store/urls.py
+from django.conf import settings
 from django.urls import path
 from .views.product_category import CategoryListView, ProductListView, FeaturedProductListView, ProductDetailView
 from .views.cart_views import CartAPIView, CartListView, CartDetailView, CartItemDeleteAPIView, CartMergeAPIView
@@ -12,6 +13,13 @@ from .views.cancel_views import CancelOrderView, ReturnOrderItemView
 from .views.order_management_views import GuestOrderTrackingView
 from .views.referral_views import GenerateReferralView, ApplyReferralView, MyReferralCouponsView
 
+if settings.ASYNC_READ_VIEWS:
+    # Async ORM versions of the same endpoints, for ASGI deployments
+    from .views.async_views import (
+        ProductDetailAsyncView as ProductDetailView, CartMergeAsyncView as CartMergeAPIView,
+        HasPurchasedAsyncView as HasPurchasedView, GuestOrderTrackingAsyncView as GuestOrderTrackingView,
+    )
+
 urlpatterns = [
     path('category/', CategoryListView.as_view(), name="category"),
     path('products/', ProductListView.as_view(), name="products"),
@@ -61,4 +69,12 @@ urlpatterns = [
 
     # Wallet payment
     path('wallet-payment/', WalletPaymentView.as_view(), name='wallet-payment'),
-]
\ No newline at end of file
+]
+
+if settings.EVENT_STREAM:
+    # Server-Sent Events push channel (ASGI deployments)
+    from .views.event_views import EventStreamView, EventTicketView
+    urlpatterns += [
+        path('events/ticket/', EventTicketView.as_view(), name='events-ticket'),
+        path('events/stream/', EventStreamView.as_view(), name='events-stream'),
+    ]
\ No newline at end of file
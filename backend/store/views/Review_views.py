@@ -22,11 +22,13 @@ from rest_framework.permissions import IsAuthenticated
 from store.models import CartOrder
 
 from rest_framework.permissions import  AllowAny
+from backend.db_routing import replica_read
 
 
  # Assuming CartOrder is your main order model
 # If your order items model is different (e.g., CartOrderItems), import it too
 
+@replica_read
 class ReviewListAPIView(generics.ListCreateAPIView):
     serializer_class = ReviewSerializer
 
@@ -91,6 +93,7 @@ class ReviewListAPIView(generics.ListCreateAPIView):
 
 
 #Searchview
+@replica_read
 class SearchProductView(generics.ListAPIView):  # Changed to ListAPIView (no need for Create)
     serializer_class = ProductSerializer
     permission_classes = (AllowAny,)
@@ -0,0 +1,160 @@
+# store/views/async_views.py
+"""
+Async variants of the read endpoints with the most concurrent callers, routed instead of
+the DRF views when ASYNC_READ_VIEWS is on and the app runs under ASGI (uvicorn workers).
+Lookups use the async ORM; DRF serializers and JWT authentication are sync, so they run
+through sync_to_async. Request and response bodies match the DRF views.
+"""
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from backend.db_routing import replica_read
+from store.models import Cart, CartOrder, Product
+from store.serializers import CartOrderSerializer, ProductSerializer
+from userauth.models import User
+
+log = logging.getLogger(__name__)
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    # DRF's renderer, so numbers, dates and decimals come out exactly as from the sync views
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+class AsyncAPIView(View):
+    """Base for the async views: JSON in and out, CSRF-exempt like DRF's APIView (auth is by JWT header)."""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    @staticmethod
+    def payload(request):
+        """Request body as a dict (JSON or form encoded); ValueError on malformed JSON."""
+        if request.content_type == 'application/json':
+            return json.loads(request.body or b'{}')
+        return request.POST
+
+    @staticmethod
+    async def authenticate(request):
+        """JWT user for the request, or an error response to return (DRF's IsAuthenticated behaviour)."""
+        try:
+            result = await sync_to_async(JWTAuthentication().authenticate)(request)
+        except AuthenticationFailed as e:
+            # Same body as DRF's exception handler
+            detail = e.detail if isinstance(e.detail, (list, dict)) else {'detail': e.detail}
+            return None, json_response(detail, status=e.status_code)
+        if result is None:
+            return None, json_response(
+                {'detail': "Authentication credentials were not provided."}, status=status.HTTP_401_UNAUTHORIZED)
+        return result[0], None
+
+
+@replica_read
+class ProductDetailAsyncView(AsyncAPIView):
+    """
+    GET /api/products/<slug>/
+    Published product of an active vendor; 404 for an unknown slug, as in the sync view.
+    """
+
+    async def get(self, request, slug):
+        try:
+            product = await Product.objects.select_related('category').aget(
+                slug=slug, status='published', vendor__active=True)
+        except Product.DoesNotExist:
+            return json_response({'detail': "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        data = await sync_to_async(lambda: ProductSerializer(product, context={'request': request}).data)()
+        return json_response(data)
+
+
+class GuestOrderTrackingAsyncView(AsyncAPIView):
+    """
+    POST /api/guest-track-order/
+    Order by number (oid) and email, for guests. Public.
+    """
+
+    async def post(self, request):
+        try:
+            payload = self.payload(request)
+        except ValueError:
+            return json_response({'detail': "JSON parse error"}, status=status.HTTP_400_BAD_REQUEST)
+        order_oid = payload.get('order_oid')
+        email = payload.get('email')
+
+        if not order_oid or not email:
+            return json_response(
+                {"error": "Order number and email are required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            order = await CartOrder.objects.aget(oid=order_oid, email__iexact=email)
+        except CartOrder.DoesNotExist:
+            log.warning("Guest tracking: Invalid order number or email combination attempted")
+            return json_response(
+                {"error": "Order not found. Please check your order number and email."},
+                status=status.HTTP_404_NOT_FOUND)
+
+        data = await sync_to_async(lambda: CartOrderSerializer(order, context={'request': request}).data)()
+        log.info("Guest tracking: Order %s retrieved successfully", order_oid)
+        return json_response(data)
+
+
+class HasPurchasedAsyncView(AsyncAPIView):
+    """
+    GET /api/product/<product_id>/has-purchased/
+    Whether the authenticated user has a paid order containing the product.
+    """
+
+    async def get(self, request, product_id):
+        user, error = await self.authenticate(request)
+        if error:
+            return error
+        has_purchased = await CartOrder.objects.filter(
+            buyer=user, payment_status="paid", orderitem__product__id=product_id,
+        ).aexists()
+        return json_response({"has_purchased": has_purchased})
+
+
+class CartMergeAsyncView(AsyncAPIView):
+    """
+    POST /api/cart-merge/
+    The user's active cart id and item count after login, or start_new when there is none.
+    """
+
+    async def post(self, request):
+        try:
+            payload = self.payload(request)
+        except ValueError:
+            return json_response({'detail': "JSON parse error"}, status=status.HTTP_400_BAD_REQUEST)
+        user_id = payload.get('user_id')
+        if not user_id:
+            return json_response({"error": "user_id required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            user = await User.objects.aget(id=int(user_id))
+        except (ValueError, User.DoesNotExist):
+            return json_response({"error": "Invalid or not found user"}, status=status.HTTP_404_NOT_FOUND)
+
+        latest = await Cart.objects.filter(user=user, is_active=True).order_by('-date').only('cart_id').afirst()
+        if latest is None:
+            return json_response({
+                "cart_id": None,
+                "message": "No active cart; start new",
+                "start_new": True,
+                "cart_count": 0
+            })
+        count = await Cart.objects.filter(cart_id=latest.cart_id, user=user, is_active=True).acount()
+        return json_response({
+            "cart_id": latest.cart_id,
+            "message": "User cart loaded",
+            "start_new": False,
+            "cart_count": count
+        })
@@ -13,6 +13,7 @@ from store.serializers import CartOrderSerializer, CouponSerializer, OrderCancel
 # Models
 from userauth.models import User
 from store.models import CartOrderItem, Cart, CartOrder, Coupon, OrderCancellation, OrderReturn
+from vendor.ledger import record_cancellation
 # Others Packages
 from decimal import Decimal
 import logging
@@ -63,7 +64,6 @@ class CancelOrderView(APIView):
             }, status=400)
 
         # Create cancellation record
-        log.info(f"Creating cancellation record. is_full={is_full}, item_count={items.count()}")
         cancellation = OrderCancellation.objects.create(
             order=order,
             cancelled_by=order.buyer,
@@ -71,27 +71,22 @@ class CancelOrderView(APIView):
             reason_detail=reason_detail,
             is_full_order=is_full
         )
-        log.info(f"Cancellation created with ID: {cancellation.id}")
 
         # Associate items and mark them as cancelled
         cancellation.items.set(items)
         for item in items:
             item.delivery_status = "Cancelled"
-            item.save(update_fields=['delivery_status'])
-
-        log.info(f"Items marked as Cancelled. Item count: {items.count()}")
+            item.save(update_fields=['delivery_status', 'updated'])
 
         # Restore stock
-        log.info("Calling restore_stock()")
         cancellation.restore_stock()
-        log.info("restore_stock() completed")
 
         # Update order status if full cancellation
+        was_paid = order.payment_status == "paid"
         if is_full:
             order.order_status = "Cancelled"
             order.payment_status = "cancelled"
             order.save()
-            log.info(f"Full order marked as cancelled")
         else:
             # For partial: check if ALL items are now cancelled
             total_items = order.orderitem.count()
@@ -100,9 +95,13 @@ class CancelOrderView(APIView):
                 order.order_status = "Cancelled"
                 order.payment_status = "cancelled"
                 order.save()
-                log.info(f"All items cancelled - marking entire order as cancelled")
+                log.debug("All items of order %s cancelled - marking entire order as cancelled", order_oid)
+
+        # Take the vendors' earnings back out of the ledger
+        if was_paid and order.payment_status == "cancelled":
+            record_cancellation(order)
 
-        log.info(f"Order {order_oid} cancellation processed successfully. Full order: {is_full}, Items cancelled: {items.count()}")
+        log.info("Order %s cancelled (full=%s, items=%d, cancellation=%s)", order_oid, is_full, len(items), cancellation.id)
         return Response({
             "message": "Order cancellation request submitted successfully",
             "cancellation_id": cancellation.id
@@ -145,5 +144,5 @@ class ReturnOrderItemView(APIView):
             reason=reason,
             reason_detail=reason_detail
         )
-        log.info(f"Return request created for order item {item_id}")
+        log.info("Return request created for order item %s", item_id)
         return Response({"message": "Return request submitted successfully"}, status=200)
\ No newline at end of file
@@ -13,6 +13,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import Q, Max
 from django.utils import timezone
 import logging
+from monitoring.metrics import stock_conflicts
 logger = logging.getLogger(__name__)
 
 def get_active_user_cart(user):
@@ -23,7 +24,7 @@ def get_active_user_cart(user):
             return active_carts.first().cart_id
         return None
     except Exception as e:
-        logger.error(f"Error in get_active_user_cart for user {user.id if user else 'None'}: {str(e)}")
+        logger.error("Error in get_active_user_cart for user %s: %s", user.id if user else 'None', e)
         return None
 
 # store/views/cart_views.py (Only the full updated CartAPIView class)
@@ -67,16 +68,17 @@ class CartAPIView(generics.ListCreateAPIView):
                         dup.is_active = False
                         dup.save()
             
-            # DEBUG LOGGING
-            print(f"DEBUG: Cart Update - Product: {product.id}, Payload Qty: {requested_qty}, Existing Item Found: {existing_cart_item is not None}")
-            if existing_cart_item:
-                print(f"DEBUG: Existing Qty: {existing_cart_item.qty}")
+            logger.debug(
+                "Cart update: product=%s requested=%s existing_qty=%s",
+                product.id, requested_qty, existing_cart_item.qty if existing_cart_item else None,
+            )
 
             adjusted = False
             final_qty = requested_qty
 
             if requested_qty > available_stock:
                 adjusted = True
+                stock_conflicts.inc(where='cart')
                 final_qty = available_stock
 
             # If final_qty becomes 0 → remove the item (and duplicates)
@@ -211,7 +213,7 @@ class CartAPIView(generics.ListCreateAPIView):
         except (ValueError, ValidationError) as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            logger.error(f"Unexpected error in CartAPIView.create: {str(e)}", exc_info=True)
+            logger.error("Unexpected error in CartAPIView.create: %s", e, exc_info=True)
             return Response({"error": "Internal server error"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -378,5 +380,5 @@ class CartMergeAPIView(APIView):
                 }, status=status.HTTP_200_OK)
        
         except Exception as e:
-            logger.error(f"Error in CartMergeAPIView: {str(e)}", exc_info=True)
+            logger.error("Error in CartMergeAPIView: %s", e, exc_info=True)
             return Response({"error": "Internal server error"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
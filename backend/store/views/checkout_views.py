@@ -20,6 +20,8 @@ from userauth.tasks import send_async_email
 # Models
 from store.models import CartOrderItem,Notification, CartOrder, Cart
 from userauth.models import User, Wallet
+from vendor.ledger import record_sale
+from monitoring.metrics import payments_confirmed, stock_conflicts
 #other packages
 import time
 
@@ -29,16 +31,16 @@ logger = logging.getLogger(__name__)
 
 def send_notification(user=None, vendor=None, order=None, order_item=None):
     """Create a notification and log any failures."""
-    logger.info("Sending notification")
+    logger.debug("Sending notification")
     try:
         Notification.objects.create(user=user, vendor=vendor, order=order, order_item=order_item)
-        logger.info(f"Notification created for order {order.id if order else 'unknown'}")
+        logger.debug("Notification created for order %s", order.id if order else 'unknown')
     except Exception as e:
-        logger.error(f"Failed to create notification: {str(e)}")
+        logger.error("Failed to create notification: %s", e)
 
 def send_email(subject, text_body, html_body, from_email, to_email):
     """Send an email asynchronously using Celery."""
-    logger.info(f"Sending email to {to_email} with subject: {subject}")
+    logger.info("Sending email to %s with subject: %s", to_email, subject)
     send_async_email.delay(
         subject=subject,
         message=text_body,
@@ -47,11 +49,11 @@ def send_email(subject, text_body, html_body, from_email, to_email):
         recipient_list=[to_email],
         fail_silently=False
     )
-    logger.info(f"Email task queued for {to_email}")
+    logger.debug("Email task queued for %s", to_email)
 
 def get_paypal_access_token(client_id, secret_id):
     """Fetch PayPal access token."""
-    logger.info("Fetching PayPal access token")
+    logger.debug("Fetching PayPal access token")
     token_url = "https://api-m.sandbox.paypal.com/v1/oauth2/token"
     headers = {"Accept": "application/json", "Accept-Language": "en_US"}
     data = {"grant_type": "client_credentials"}
@@ -59,15 +61,15 @@ def get_paypal_access_token(client_id, secret_id):
         response = requests.post(token_url, headers=headers, data=data, auth=(client_id, secret_id))
         response.raise_for_status()
         access_token = response.json().get("access_token")
-        logger.info("PayPal access token fetched successfully")
+        logger.debug("PayPal access token fetched successfully")
         return access_token
     except Exception as e:
-        logger.error(f"PayPal auth failed: {str(e)}")
+        logger.error("PayPal auth failed: %s", e)
         raise
 
 def send_all_notifications(order, order_items):
     """Send notifications and emails asynchronously."""
-    logger.info(f"Sending all notifications for order {order.oid}")
+    logger.info("Sending all notifications for order %s", order.oid)
     if order.buyer and order.email:
         try:
             if "@" in order.email and "." in order.email:
@@ -78,7 +80,7 @@ def send_all_notifications(order, order_items):
                 html_body = render_to_string("email/customer_order_confirmation.html", merge_data)
                 send_email(subject, text_body, html_body, settings.DEFAULT_FROM_EMAIL, order.email)
         except Exception as e:
-            logger.error(f"Buyer notification failed: {str(e)}")
+            logger.error("Buyer notification failed: %s", e)
     vendor_groups = {}
     for item in order_items:
         if item.vendor and item.vendor.email and "@" in item.vendor.email:
@@ -94,24 +96,30 @@ def send_all_notifications(order, order_items):
             html_body = render_to_string("email/vendor_order_sale.html", merge_data)
             send_email(subject, text_body, html_body, settings.DEFAULT_FROM_EMAIL, vendor_email)
         except Exception as e:
-            logger.error(f"Vendor notification failed for {vendor_email}: {str(e)}")
-    logger.info(f"All notifications sent for order {order.oid}")
+            logger.error("Vendor notification failed for %s: %s", vendor_email, e)
+    logger.info("All notifications sent for order %s", order.oid)
 
 def deduct_stock(order_items):
     """Decrease product stock after successful payment."""
-    logger.info("Deducting stock for order items")
+    logger.debug("Deducting stock for order items")
     for item in order_items:
         product = item.product
         if product.stock_qty >= item.qty:
             product.stock_qty -= item.qty
             product.save()
-            logger.info(f"Stock updated: {product.title} -{item.qty}")
+            logger.debug("Stock updated: %s -%s", product.title, item.qty)
         else:
-            logger.warning(f"Insufficient stock for {product.title} during payment success.")
+            stock_conflicts.inc(where='payment')
+            logger.warning("Insufficient stock for %s during payment success.", product.title)
+
+def count_payment(order):
+    """Count a confirmed payment in /metrics once the surrounding transaction commits."""
+    method = order.payment_method or 'unknown'
+    transaction.on_commit(lambda: payments_confirmed.inc(method=method))
 
 def deactivate_cart(cart_id, user_id=None):
     """Mark all Cart entries associated with the cart_id as inactive."""
-    logger.info(f"Deactivating cart for cart_id={cart_id}, user_id={user_id}")
+    logger.debug("Deactivating cart for cart_id=%s, user_id=%s", cart_id, user_id)
     try:
         cart_items = Cart.objects.filter(cart_id=cart_id, is_active=True)
         if user_id:
@@ -119,25 +127,25 @@ def deactivate_cart(cart_id, user_id=None):
         for item in cart_items:
             item.is_active = False
             item.save()
-            logger.info(f"Deactivated cart item: {item.id} for cart_id={cart_id}")
+            logger.debug("Deactivated cart item: %s for cart_id=%s", item.id, cart_id)
     except Exception as e:
-        logger.error(f"Failed to deactivate cart items for cart_id={cart_id}: {str(e)}")
+        logger.error("Failed to deactivate cart items for cart_id=%s: %s", cart_id, e)
 
 class RazorpayCheckoutView(generics.CreateAPIView):
     serializer_class = CartOrderSerializer
     permission_classes = [AllowAny]
     queryset = CartOrder.objects.all()
     def create(self, request, *args, **kwargs):
-        logger.info("Entering RazorpayCheckoutView.create")
+        logger.debug("Entering RazorpayCheckoutView.create")
         order_id = self.kwargs['order_id']
-        logger.debug(f"Processing order_id: {order_id}")
+        logger.debug("Processing order_id: %s", order_id)
         try:
             order = CartOrder.objects.get(oid=order_id)
             if order.payment_status == "paid":
-                logger.warning(f"Order {order_id} already paid")
+                logger.warning("Order %s already paid", order_id)
                 return Response({'message': 'Already paid', 'icon': 'warn'}, status=status.HTTP_200_OK)
         except CartOrder.DoesNotExist:
-            logger.error(f"Order not found: {order_id}")
+            logger.error("Order not found: %s", order_id)
             return Response({'message': 'Order not found'}, status=status.HTTP_404_NOT_FOUND)
         key_id = os.environ.get('RAZORPAY_KEY_ID', config('RAZORPAY_KEY_ID'))
         key_secret = os.environ.get('RAZORPAY_KEY_SECRET', config('RAZORPAY_KEY_SECRET'))
@@ -148,10 +156,10 @@ class RazorpayCheckoutView(generics.CreateAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         try:
-            logger.info("Initializing Razorpay client")
+            logger.debug("Initializing Razorpay client")
             client = razorpay.Client(auth=(key_id, key_secret))
             client.set_app_details({"title": config('APP_TITLE', 'Django'), "version": config('APP_VERSION', '4.2')})
-            logger.info(f"Creating Razorpay order for amount: {int(order.total * 100)}")
+            logger.info("Creating Razorpay order for amount: %s", int(order.total * 100))
             razorpay_order = client.order.create({
                 'amount': int(order.total * 100), # In paise
                 'currency': 'INR',
@@ -160,7 +168,7 @@ class RazorpayCheckoutView(generics.CreateAPIView):
             })
             order.razorpay_order_id = razorpay_order['id']
             order.save()
-            logger.info(f"Razorpay order created successfully: {razorpay_order['id']}")
+            logger.info("Razorpay order created successfully: %s", razorpay_order['id'])
             return Response({
                 'id': razorpay_order['id'],
                 'amount': razorpay_order['amount'],
@@ -173,7 +181,7 @@ class RazorpayCheckoutView(generics.CreateAPIView):
             }, status=status.HTTP_200_OK)
         except razorpay.errors.BadRequestError as e:
             error_message = str(e)
-            logger.error(f"Razorpay BadRequestError: {error_message}")
+            logger.error("Razorpay BadRequestError: %s", error_message)
             if 'authentication failed' in error_message.lower():
                 return Response(
                     {'message': 'Razorpay authentication failed. Please check API credentials'},
@@ -184,7 +192,7 @@ class RazorpayCheckoutView(generics.CreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         except Exception as e:
-            logger.error(f"Unexpected error in Razorpay order creation: {str(e)}")
+            logger.error("Unexpected error in Razorpay order creation: %s", e)
             return Response(
                 {'message': 'Unexpected error creating Razorpay order'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -195,30 +203,29 @@ class PaymentSuccessView(generics.CreateAPIView):
     queryset = CartOrder.objects.all()
     permission_classes = [AllowAny]
     def post(self, request, *args, **kwargs):
-        logger.info("Entering PaymentSuccessView.post")
+        logger.debug("Entering PaymentSuccessView.post")
         start_time = time.time() # noqa
         payload = request.data
         order_id = payload.get("order_id")
         session_id = payload.get("session_id") # Razorpay payment_id
         capture_id = payload.get("paypal_capture_id") # PayPal
-        logger.debug(f"Processing payment for order_id: {order_id}, session_id: {session_id}, capture_id: {capture_id}")
+        logger.debug("Processing payment for order_id: %s, session_id: %s, capture_id: %s", order_id, session_id, capture_id)
         if not order_id:
             logger.warning("Missing order_id in payload")
             return Response({"message": "Missing order_id"}, status=status.HTTP_400_BAD_REQUEST)
         try:
             order = CartOrder.objects.get(oid=order_id)
-            logger.info(f"Retrieved order: {order.oid}")
+            logger.debug("Retrieved order: %s", order.oid)
         except CartOrder.DoesNotExist:
-            logger.error(f"Order not found: {order_id}")
+            logger.error("Order not found: %s", order_id)
             return Response({"message": "Order not found"}, status=status.HTTP_404_NOT_FOUND)
         if order.payment_status == "paid":
-            logger.warning(f"Order {order_id} already paid")
+            logger.warning("Order %s already paid", order_id)
             return Response({"message": "already_paid"}, status=status.HTTP_200_OK)
         order_items = CartOrderItem.objects.filter(order=order)
-        logger.debug(f"Found {order_items.count()} order items")
         # --- PayPal flow ---
         if capture_id:
-            logger.info(f"Processing PayPal payment with capture_id: {capture_id}")
+            logger.info("Processing PayPal payment with capture_id: %s", capture_id)
             try:
                 access_token = get_paypal_access_token(
                     os.environ.get('PAYPAL_CLIENT_ID', config('PAYPAL_CLIENT_ID')),
@@ -230,18 +237,18 @@ class PaymentSuccessView(generics.CreateAPIView):
                     "Authorization": f"Bearer {access_token}"
                 }
                 response = requests.get(paypal_api_url, headers=headers)
-                logger.info(f"PayPal API response status: {response.status_code}")
+                logger.debug("PayPal API response status: %s", response.status_code)
                 if response.status_code == 200:
                     paypal_data = response.json()
                     status_val = paypal_data.get("status")
-                    logger.info(f"PayPal payment status: {status_val}")
-                    logger.info(f"PayPal status details: {paypal_data.get('status_details')}")
+                    logger.info("PayPal payment status: %s", status_val)
+                    logger.debug("PayPal status details: %s", paypal_data.get('status_details'))
                     is_sandbox = "sandbox" in paypal_api_url
                     if status_val == "COMPLETED" or (status_val == "PENDING" and is_sandbox):
                         with transaction.atomic():
                             locked_order = CartOrder.objects.select_for_update().get(oid=order_id)
                             if locked_order.payment_status == "paid":
-                                logger.warning(f"Order {order_id} already paid (locked check)")
+                                logger.warning("Order %s already paid (locked check)", order_id)
                                 return Response({"message": "already_paid"}, status=status.HTTP_200_OK)
                             locked_order.payment_status = "paid"
                             locked_order.order_status = "Confirmed"
@@ -254,50 +261,52 @@ class PaymentSuccessView(generics.CreateAPIView):
                             if locked_order.buyer and locked_order.coupons.exists():
                                 for coupon in locked_order.coupons.all():
                                     coupon.used_by.add(locked_order.buyer)
-                                    logger.info(f"Marked coupon {coupon.code} as used by user {locked_order.buyer.id}")
+                                    logger.info("Marked coupon %s as used by user %s", coupon.code, locked_order.buyer.id)
                            
                             locked_order.save()
                             deactivate_cart(locked_order.oid, locked_order.buyer_id if locked_order.buyer else None)
                             deduct_stock(order_items)
+                            record_sale(locked_order)
+                            count_payment(locked_order)
                         try:
                             send_all_notifications(locked_order, order_items)
                         except Exception as e:
-                            logger.error(f"Notification failed: {str(e)}")
-                        logger.info(f"PayPal payment successful for order {order_id}")
+                            logger.error("Notification failed: %s", e)
+                        logger.info("PayPal payment successful for order %s", order_id)
                         return Response({"message": "payment_successful"}, status=status.HTTP_200_OK)
                     elif status_val in ["PENDING", "IN_PROGRESS"] and not is_sandbox:
                         with transaction.atomic():
                             locked_order = CartOrder.objects.select_for_update().get(oid=order_id)
                             if locked_order.payment_status == "processing":
-                                logger.info(f"Order {order_id} already processing (locked check)")
+                                logger.info("Order %s already processing (locked check)", order_id)
                                 return Response({"message": f"Payment is {status_val.lower()}"}, status=status.HTTP_202_ACCEPTED)
                             locked_order.payment_status = "processing"
                             locked_order.order_status = "Pending"
                             locked_order.paypal_capture_id = capture_id
                             locked_order.save()
-                        logger.info(f"PayPal payment {status_val.lower()} for order {order_id}")
+                        logger.info("PayPal payment %s for order %s", status_val.lower(), order_id)
                         return Response({"message": f"Payment is {status_val.lower()}"}, status=status.HTTP_202_ACCEPTED)
                     else:
-                        logger.warning(f"PayPal payment failed: {status_val}")
+                        logger.warning("PayPal payment failed: %s", status_val)
                         return Response({"message": f"Payment failed: {status_val}"}, status=status.HTTP_400_BAD_REQUEST)
                 logger.error("PayPal API error")
                 return Response({"message": "PayPal API error"}, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
-                logger.error(f"PayPal processing error: {str(e)}")
+                logger.error("PayPal processing error: %s", e)
                 return Response({"message": "PayPal processing error"}, status=status.HTTP_400_BAD_REQUEST)
         # --- Razorpay flow ---
         if session_id:
-            logger.info(f"Processing Razorpay payment with session_id: {session_id}")
+            logger.info("Processing Razorpay payment with session_id: %s", session_id)
             try:
                 client = razorpay.Client(auth=(config("RAZORPAY_KEY_ID"), config("RAZORPAY_KEY_SECRET")))
                 payment = client.payment.fetch(session_id)
                 payment_status = payment["status"]
-                logger.info(f"Razorpay payment status: {payment_status}")
+                logger.info("Razorpay payment status: %s", payment_status)
                 if payment_status == "captured":
                     with transaction.atomic():
                         locked_order = CartOrder.objects.select_for_update().get(oid=order_id)
                         if locked_order.payment_status == "paid":
-                            logger.warning(f"Order {order_id} already paid (locked check)")
+                            logger.warning("Order %s already paid (locked check)", order_id)
                             return Response({"message": "already_paid"}, status=status.HTTP_200_OK)
                         locked_order.payment_status = "paid"
                         locked_order.order_status = "Confirmed"
@@ -310,39 +319,41 @@ class PaymentSuccessView(generics.CreateAPIView):
                         if locked_order.buyer and locked_order.coupons.exists():
                             for coupon in locked_order.coupons.all():
                                 coupon.used_by.add(locked_order.buyer)
-                                logger.info(f"Marked coupon {coupon.code} as used by user {locked_order.buyer.id}")
+                                logger.info("Marked coupon %s as used by user %s", coupon.code, locked_order.buyer.id)
                        
                         locked_order.save()
                         deactivate_cart(locked_order.oid, locked_order.buyer_id if locked_order.buyer else None)
                         deduct_stock(order_items)
+                        record_sale(locked_order)
+                        count_payment(locked_order)
                     try:
                         send_all_notifications(locked_order, order_items)
                     except Exception as e:
-                        logger.error(f"Notification failed: {str(e)}")
-                    logger.info(f"Razorpay payment successful for order {order_id}")
+                        logger.error("Notification failed: %s", e)
+                    logger.info("Razorpay payment successful for order %s", order_id)
                     return Response({"message": "payment_successful"}, status=status.HTTP_200_OK)
                 elif payment_status == "authorized":
-                    logger.info(f"Razorpay payment authorized for order {order_id}")
+                    logger.info("Razorpay payment authorized for order %s", order_id)
                     return Response({"message": "processing"}, status=status.HTTP_202_ACCEPTED)
                 elif payment_status in ["failed", "cancelled"]:
-                    logger.warning(f"Razorpay payment {payment_status} for order {order_id}")
+                    logger.warning("Razorpay payment %s for order %s", payment_status, order_id)
                     return Response({"message": "cancelled"}, status=status.HTTP_400_BAD_REQUEST)
                 elif payment_status in ["created", "pending"]:
                     with transaction.atomic():
                         locked_order = CartOrder.objects.select_for_update().get(oid=order_id)
                         if locked_order.payment_status == "processing":
-                            logger.info(f"Order {order_id} already processing (locked check)")
+                            logger.info("Order %s already processing (locked check)", order_id)
                             return Response({"message": "processing"}, status=status.HTTP_202_ACCEPTED)
                         locked_order.payment_status = "processing"
                         locked_order.razorpay_payment_id = session_id
                         locked_order.save()
-                    logger.info(f"Razorpay payment {payment_status} for order {order_id}")
+                    logger.info("Razorpay payment %s for order %s", payment_status, order_id)
                     return Response({"message": "processing"}, status=status.HTTP_202_ACCEPTED)
                 else:
-                    logger.warning(f"Unknown Razorpay payment status: {payment_status}")
+                    logger.warning("Unknown Razorpay payment status: %s", payment_status)
                     return Response({"message": f"Payment status: {payment_status}"}, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
-                logger.error(f"Razorpay processing error: {str(e)}")
+                logger.error("Razorpay processing error: %s", e)
                 return Response({"message": "Razorpay processing error"}, status=status.HTTP_400_BAD_REQUEST)
         logger.warning("Missing session_id or paypal_capture_id in payload")
         return Response({"message": "Missing session_id or paypal_capture_id"}, status=status.HTTP_400_BAD_REQUEST)
@@ -351,7 +362,7 @@ class PaymentSuccessView(generics.CreateAPIView):
 class PayPalWebhookView(generics.CreateAPIView):
     permission_classes = [AllowAny]
     def post(self, request, *args, **kwargs):
-        logger.info("Entering PayPalWebhookView.post")
+        logger.debug("Entering PayPalWebhookView.post")
         payload = request.body
         sig_header = request.META.get('HTTP_PAYPAL_TRANSMISSION_SIG')
         transmission_id = request.META.get('HTTP_PAYPAL_TRANSMISSION_ID')
@@ -387,11 +398,11 @@ class PayPalWebhookView(generics.CreateAPIView):
                 return Response(status = status.HTTP_403_FORBIDDEN)
             event = verify_data["webhook_event"]
         except Exception as e:
-            logger.error(f"PayPal webhook verification error: {str(e)}")
+            logger.error("PayPal webhook verification error: %s", e)
             return Response(status=status.HTTP_400_BAD_REQUEST)
         # Process event
         event_type = event.get('event_type')
-        logger.info(f"Processing PayPal event: {event_type}")
+        logger.info("Processing PayPal event: %s", event_type)
         if event_type == 'PAYMENT.CAPTURE.COMPLETED':
             capture_id = event['resource'].get('id')
             status = event['resource'].get('status')
@@ -410,19 +421,21 @@ class PayPalWebhookView(generics.CreateAPIView):
                             if order.buyer and order.coupons.exists():
                                 for coupon in order.coupons.all():
                                     coupon.used_by.add(order.buyer)
-                                    logger.info(f"Marked coupon {coupon.code} as used by user {order.buyer.id}")
+                                    logger.info("Marked coupon %s as used by user %s", coupon.code, order.buyer.id)
                            
                             order.save()
                             order_items = CartOrderItem.objects.filter(order=order)
                             deactivate_cart(order.oid, order.buyer_id if order.buyer else None)
                             deduct_stock(order_items)
+                            record_sale(order)
+                            count_payment(order)
                             send_all_notifications(order, order_items)
                         else:
-                            logger.info(f"Order {order.oid} already paid")
+                            logger.info("Order %s already paid", order.oid)
                 except CartOrder.DoesNotExist:
-                    logger.error(f"Order not found for PayPal capture_id: {capture_id}")
+                    logger.error("Order not found for PayPal capture_id: %s", capture_id)
                 except Exception as e:
-                    logger.error(f"Error processing completed capture: {str(e)}")
+                    logger.error("Error processing completed capture: %s", e)
         elif event_type == 'PAYMENT.CAPTURE.DENIED':
             capture_id = event['resource'].get('id')
             try:
@@ -434,9 +447,9 @@ class PayPalWebhookView(generics.CreateAPIView):
                         order.save()
                         # Optionally send failure notifications
             except CartOrder.DoesNotExist:
-                logger.error(f"Order not found for PayPal capture_id: {capture_id}")
+                logger.error("Order not found for PayPal capture_id: %s", capture_id)
             except Exception as e:
-                logger.error(f"Error processing denied capture: {str(e)}")
+                logger.error("Error processing denied capture: %s", e)
         return Response(status=status.HTTP_200_OK)
 
 
@@ -445,7 +458,7 @@ class WalletPaymentView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request, *args, **kwargs):
-        logger.info("Entering WalletPaymentView.post")
+        logger.debug("Entering WalletPaymentView.post")
         order_oid = request.data.get("order_oid")
         user_id = request.data.get("user_id")
 
@@ -458,7 +471,7 @@ class WalletPaymentView(APIView):
         try:
             order = CartOrder.objects.get(oid=order_oid)
         except CartOrder.DoesNotExist:
-            logger.error(f"Order not found: {order_oid}")
+            logger.error("Order not found: %s", order_oid)
             return Response(
                 {"message": "Order not found", "icon": "error"},
                 status=status.HTTP_404_NOT_FOUND
@@ -467,7 +480,7 @@ class WalletPaymentView(APIView):
         try:
             user = User.objects.get(id=user_id)
         except User.DoesNotExist:
-            logger.error(f"User not found: {user_id}")
+            logger.error("User not found: %s", user_id)
             return Response(
                 {"message": "User not found", "icon": "error"},
                 status=status.HTTP_404_NOT_FOUND
@@ -476,21 +489,21 @@ class WalletPaymentView(APIView):
         try:
             wallet = Wallet.objects.get(user=user)
         except Wallet.DoesNotExist:
-            logger.error(f"Wallet not found for user: {user_id}")
+            logger.error("Wallet not found for user: %s", user_id)
             return Response(
                 {"message": "Wallet not found", "icon": "error"},
                 status=status.HTTP_404_NOT_FOUND
             )
 
         if order.payment_status == "paid":
-            logger.warning(f"Order {order_oid} already paid")
+            logger.warning("Order %s already paid", order_oid)
             return Response(
                 {"message": "Order already paid", "icon": "warning"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
         if order.buyer and order.buyer != user:
-            logger.warning(f"Unauthorized wallet payment attempt for order {order_oid}")
+            logger.warning("Unauthorized wallet payment attempt for order %s", order_oid)
             return Response(
                 {"message": "Unauthorized", "icon": "error"},
                 status=status.HTTP_403_FORBIDDEN
@@ -498,7 +511,7 @@ class WalletPaymentView(APIView):
 
         order_total = order.total
         if wallet.balance < order_total:
-            logger.info(f"Insufficient wallet balance. Required: {order_total}, Available: {wallet.balance}")
+            logger.info("Insufficient wallet balance. Required: %s, Available: %s", order_total, wallet.balance)
             return Response({
                 "message": f"Insufficient wallet balance. Required: ₹{order_total}, Available: ₹{wallet.balance}",
                 "icon": "error"
@@ -531,7 +544,7 @@ class WalletPaymentView(APIView):
                 description=f"Payment for order #{locked_order.oid}",
                 related_order=locked_order
             )
-            logger.info(f"Deducted ₹{order_total} from wallet for user {user_id}")
+            logger.info("Deducted ₹%s from wallet for user %s", order_total, user_id)
 
             # Update order status
             locked_order.payment_status = "paid"
@@ -542,21 +555,23 @@ class WalletPaymentView(APIView):
             if locked_order.buyer and locked_order.coupons.exists():
                 for coupon in locked_order.coupons.all():
                     coupon.used_by.add(locked_order.buyer)
-                    logger.info(f"Marked coupon {coupon.code} as used by user {locked_order.buyer.id}")
+                    logger.info("Marked coupon %s as used by user %s", coupon.code, locked_order.buyer.id)
 
             locked_order.save()
 
             # Deactivate cart and deduct stock
             deactivate_cart(locked_order.oid, locked_order.buyer_id if locked_order.buyer else None)
             deduct_stock(order_items)
+            record_sale(locked_order)
+            count_payment(locked_order)
 
         # Send notifications outside transaction
         try:
             send_all_notifications(locked_order, order_items)
         except Exception as e:
-            logger.error(f"Notification failed: {str(e)}")
+            logger.error("Notification failed: %s", e)
 
-        logger.info(f"Wallet payment successful for order {order_oid}")
+        logger.info("Wallet payment successful for order %s", order_oid)
         return Response({
             "message": "Payment successful! Amount deducted from wallet.",
             "icon": "success",
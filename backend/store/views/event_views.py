@@ -0,0 +1,70 @@
+# store/views/event_views.py
+"""
+Server-Sent Events endpoints (see store.events). Browsers' EventSource cannot send the JWT
+header, so a signed ticket from the ticket endpoint goes in the stream URL instead; other
+clients may send the Authorization header to the stream directly.
+"""
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from store.events import channel, stream
+from store.views.async_views import AsyncAPIView, json_response
+from vendor.models import Vendor
+
+TICKET_SALT = 'store.events.ticket'
+TICKET_MAX_AGE = 60  # seconds between getting a ticket and opening the stream
+
+
+async def _channels(user_id):
+    channels = [channel(user_id=user_id)]
+    vendor_id = await Vendor.objects.filter(user_id=user_id).values_list('id', flat=True).afirst()
+    if vendor_id is not None:
+        channels.append(channel(vendor_id=vendor_id))
+    return channels
+
+
+class EventTicketView(APIView):
+    """
+    POST /api/events/ticket/
+    A short-lived ticket for opening the event stream with EventSource.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        ticket = signing.TimestampSigner(salt=TICKET_SALT).sign(str(request.user.id))
+        return Response({'ticket': ticket, 'url': f"/api/events/stream/?ticket={ticket}"})
+
+
+class EventStreamView(AsyncAPIView):
+    """
+    GET /api/events/stream/?ticket=<ticket>
+    text/event-stream of the user's events (notification, order_status) and, for vendors,
+    their shop's. Needs an ASGI deployment: a WSGI server would hold a worker per open stream
+    (and buffers async bodies whole, so the response would never start); there it answers 501.
+    """
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return json_response({'detail': "The event stream needs the ASGI server (GUNICORN_PROFILE=asgi)."},
+                                 status=status.HTTP_501_NOT_IMPLEMENTED)
+        ticket = request.GET.get('ticket')
+        if ticket:
+            try:
+                user_id = int(signing.TimestampSigner(salt=TICKET_SALT).unsign(ticket, max_age=TICKET_MAX_AGE))
+            except signing.BadSignature:
+                return json_response({'detail': "Invalid or expired ticket."}, status=status.HTTP_401_UNAUTHORIZED)
+        else:
+            user, error = await self.authenticate(request)
+            if error:
+                return error
+            user_id = user.id
+
+        response = StreamingHttpResponse(stream(await _channels(user_id)), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx: pass frames through as they come
+        return response
@@ -35,12 +35,12 @@ class GuestOrderTrackingView(APIView):
             )
             
             serializer = CartOrderSerializer(order, context={'request': request})
-            log.info(f"Guest tracking: Order {order_oid} retrieved successfully")
+            log.info("Guest tracking: Order %s retrieved successfully", order_oid)
             
             return Response(serializer.data, status=status.HTTP_200_OK)
             
         except CartOrder.DoesNotExist:
-            log.warning(f"Guest tracking: Invalid order number or email combination attempted")
+            log.warning("Guest tracking: Invalid order number or email combination attempted")
             return Response(
                 {"error": "Order not found. Please check your order number and email."},
                 status=status.HTTP_404_NOT_FOUND
@@ -11,6 +11,7 @@ from decimal import Decimal
 from django.utils import timezone
 from django.db.models import Max
 from rest_framework.views import APIView
+from monitoring.metrics import stock_conflicts
 
 class CreateOrderView(generics.CreateAPIView):
     serializer_class = CartOrderSerializer
@@ -77,6 +78,7 @@ class CreateOrderView(generics.CreateAPIView):
                 qty = c.qty
                 if qty > available_stock:
                     adjusted = True
+                    stock_conflicts.inc(where='checkout')
                     if available_stock <= 0:
                         c.is_active = False
                         c.save()
@@ -1,14 +1,18 @@
 from rest_framework import generics
+from rest_framework.exceptions import NotFound
 from store.serializers import ProductSerializer, CategorySerializer
 from store.models import Product, Category
 from rest_framework.permissions import AllowAny
+from backend.db_routing import replica_read
 
+@replica_read
 class CategoryListView(generics.ListAPIView):
     serializer_class = CategorySerializer
     queryset = Category.objects.filter(active=True)
     permission_classes = (AllowAny,)
     pagination_class = None
 
+@replica_read
 class ProductListView(generics.ListAPIView):
     serializer_class = ProductSerializer
     permission_classes = (AllowAny,)
@@ -21,12 +25,14 @@ class ProductListView(generics.ListAPIView):
             queryset = queryset.filter(category__slug=category_slug)
         return queryset
 
+@replica_read
 class FeaturedProductListView(generics.ListAPIView):
     serializer_class = ProductSerializer
     # Filter by published status, featured flag, and active vendor
     queryset = Product.objects.filter(status="published", featured=True, vendor__active=True)[:3]
     permission_classes = (AllowAny,)
 
+@replica_read
 class ProductDetailView(generics.RetrieveAPIView):
     serializer_class = ProductSerializer
     permission_classes = (AllowAny,)
@@ -34,4 +40,7 @@ class ProductDetailView(generics.RetrieveAPIView):
     def get_object(self):
         slug = self.kwargs.get('slug')
         # Ensure product is published and vendor is active
-        return Product.objects.get(slug=slug, status='published', vendor__active=True)
\ No newline at end of file
+        try:
+            return Product.objects.get(slug=slug, status='published', vendor__active=True)
+        except Product.DoesNotExist:
+            raise NotFound()
\ No newline at end of file
@@ -22,23 +22,23 @@ class GenerateReferralView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        logger.info(f"GenerateReferralView called by user: {request.user.id} ({request.user.email})")
+        logger.info("GenerateReferralView called by user: %s (%s)", request.user.id, request.user.email)
 
         try:
             # Generate unique token
             token = shortuuid.uuid()[:16]  # Safer: fixed length, avoid collision
-            logger.debug(f"Generated token: {token}")
+            logger.debug("Generated token: %s", token)
 
             # Create referral offer
             offer = ReferralOffer.objects.create(
                 referring_user=request.user,
                 token=token  
             )
-            logger.info(f"ReferralOffer created successfully: ID={offer.id}, Token={offer.token}")
+            logger.info("ReferralOffer created successfully: ID=%s, Token=%s", offer.id, offer.token)
 
             # Build referral link
             referral_link = f"{settings.SITE_URL}/register/?ref={offer.token}"
-            logger.debug(f"Generated referral link: {referral_link}")
+            logger.debug("Generated referral link: %s", referral_link)
 
             return Response(
                 {"referral_link": referral_link},
@@ -46,7 +46,7 @@ class GenerateReferralView(APIView):
             )
 
         except Exception as e:
-            logger.error(f"Error generating referral link for user {request.user.id}: {str(e)}", exc_info=True)
+            logger.error("Error generating referral link for user %s: %s", request.user.id, e, exc_info=True)
             return Response(
                 {"error": "Failed to generate referral link. Please try again."},
                 status=status.HTTP_400_BAD_REQUEST
@@ -60,7 +60,7 @@ class ApplyReferralView(APIView):
         token = request.data.get('token')
         new_user_id = request.data.get('new_user_id')
 
-        logger.info(f"ApplyReferralView called with token={token}, new_user_id={new_user_id}")
+        logger.info("ApplyReferralView called with token=%s, new_user_id=%s", token, new_user_id)
 
         if not token or not new_user_id:
             logger.warning("ApplyReferralView: Missing token or new_user_id")
@@ -72,11 +72,11 @@ class ApplyReferralView(APIView):
         try:
             # Find unused referral
             offer = ReferralOffer.objects.get(token=token, is_used=False)
-            logger.info(f"Valid referral found: ID={offer.id}, referrer={offer.referring_user.email}")
+            logger.info("Valid referral found: ID=%s, referrer=%s", offer.id, offer.referring_user.email)
 
             # Check expiry
             if offer.expiry_date and offer.expiry_date < timezone.now():
-                logger.info(f"Referral expired: {offer.expiry_date}")
+                logger.info("Referral expired: %s", offer.expiry_date)
                 return Response(
                     {"error": "This referral link has expired"},
                     status=status.HTTP_400_BAD_REQUEST
@@ -85,9 +85,9 @@ class ApplyReferralView(APIView):
             # Validate new user
             try:
                 new_user = User.objects.get(id=new_user_id)
-                logger.info(f"New user validated: {new_user.email}")
+                logger.info("New user validated: %s", new_user.email)
             except User.DoesNotExist:
-                logger.warning(f"Invalid new_user_id: {new_user_id}")
+                logger.warning("Invalid new_user_id: %s", new_user_id)
                 return Response(
                     {"error": "Invalid user ID"},
                     status=status.HTTP_400_BAD_REQUEST
@@ -101,13 +101,13 @@ class ApplyReferralView(APIView):
                 discount=10,  # You can make this configurable
                 active=True
             )
-            logger.info(f"Coupon created: {coupon_code} for referrer {offer.referring_user.email}")
+            logger.info("Coupon created: %s for referrer %s", coupon_code, offer.referring_user.email)
 
             # Update referral
             offer.reward_coupon = coupon
             offer.is_used = True
             offer.save()
-            logger.info(f"Referral marked as used: {offer.token}")
+            logger.info("Referral marked as used: %s", offer.token)
 
             # Send reward email to referrer
             subject = "Referral Reward - New User Signed Up!"
@@ -129,7 +129,7 @@ class ApplyReferralView(APIView):
                 recipient_list=[offer.referring_user.email],
                 fail_silently=False,
             )
-            logger.info(f"Reward email queued for {offer.referring_user.email}")
+            logger.info("Reward email queued for %s", offer.referring_user.email)
 
             return Response({
                 "message": "Referral applied successfully!",
@@ -137,13 +137,13 @@ class ApplyReferralView(APIView):
             }, status=status.HTTP_200_OK)
 
         except ReferralOffer.DoesNotExist:
-            logger.warning(f"Invalid or already used referral token: {token}")
+            logger.warning("Invalid or already used referral token: %s", token)
             return Response(
                 {"error": "Invalid or already used referral link"},
                 status=status.HTTP_400_BAD_REQUEST
             )
         except Exception as e:
-            logger.error(f"Unexpected error in ApplyReferralView: {str(e)}", exc_info=True)
+            logger.error("Unexpected error in ApplyReferralView: %s", e, exc_info=True)
             return Response(
                 {"error": "Something went wrong. Please try again later."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -154,7 +154,7 @@ class MyReferralCouponsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        logger.info(f"MyReferralCouponsView called by user: {request.user.id} ({request.user.email})")
+        logger.info("MyReferralCouponsView called by user: %s (%s)", request.user.id, request.user.email)
 
         try:
             offers = ReferralOffer.objects.filter(
@@ -180,11 +180,11 @@ class MyReferralCouponsView(APIView):
                         'vendor': coupon.vendor.id if coupon.vendor else None,
                     })
 
-            logger.info(f"Returning {len(coupons_data)} coupons for user {request.user.id}")
+            logger.info("Returning %s coupons for user %s", len(coupons_data), request.user.id)
             return Response(coupons_data, status=status.HTTP_200_OK)
 
         except Exception as e:
-            logger.error(f"Error fetching referral coupons for user {request.user.id}: {str(e)}", exc_info=True)
+            logger.error("Error fetching referral coupons for user %s: %s", request.user.id, e, exc_info=True)
             return Response(
                 {"error": "Failed to fetch coupons. Please try again."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 from shortuuid.django_fields import ShortUUIDField
 from django.db.models.signals import post_save
 from django.utils.html import mark_safe
@@ -120,42 +122,42 @@ class Wallet(models.Model):
 
     def deposit(self, amount, transaction_type='deposit', description='', related_order=None, related_order_item=None):
         """Deposit amount to wallet and create transaction record."""
+        amount = Decimal(str(amount))
         if amount <= 0:
             raise ValueError("Deposit amount must be positive")
-        self.balance += Decimal(str(amount))
-        self.save()
-        
-        # Create transaction record
-        WalletTransaction.objects.create(
-            wallet=self,
-            transaction_type=transaction_type,
-            amount=Decimal(str(amount)),
-            balance_after=self.balance,
-            description=description,
-            related_order=related_order,
-            related_order_item=related_order_item
-        )
-        return self.balance
+        return self._apply(amount, transaction_type, description, related_order, related_order_item)
 
     def withdraw(self, amount, transaction_type='withdrawal', description='', related_order=None, related_order_item=None):
         """Withdraw amount from wallet and create transaction record."""
+        amount = Decimal(str(amount))
         if amount <= 0:
             raise ValueError("Withdrawal amount must be positive")
-        if self.balance < Decimal(str(amount)):
-            raise ValueError("Insufficient balance")
-        self.balance -= Decimal(str(amount))
-        self.save()
-        
-        # Create transaction record
-        WalletTransaction.objects.create(
-            wallet=self,
-            transaction_type=transaction_type,
-            amount=Decimal(str(amount)),
-            balance_after=self.balance,
-            description=description,
-            related_order=related_order,
-            related_order_item=related_order_item
-        )
+        return self._apply(-amount, transaction_type, description, related_order, related_order_item)
+
+    def _apply(self, delta, transaction_type, description, related_order, related_order_item):
+        """
+        Change the balance with a single conditional UPDATE (balance = balance + delta)
+        instead of writing back a value read earlier, so concurrent deposits/withdrawals
+        can't overwrite each other. The UPDATE row lock is held until commit, which keeps
+        balance_after on the transaction record consistent.
+        """
+        with transaction.atomic():
+            wallets = Wallet.objects.filter(pk=self.pk)
+            if delta < 0:
+                wallets = wallets.filter(balance__gte=-delta)
+            if not wallets.update(balance=F('balance') + delta, updated_at=timezone.now()):
+                raise ValueError("Insufficient balance")
+            self.refresh_from_db(fields=['balance', 'updated_at'])
+
+            WalletTransaction.objects.create(
+                wallet=self,
+                transaction_type=transaction_type,
+                amount=abs(delta),
+                balance_after=self.balance,
+                description=description,
+                related_order=related_order,
+                related_order_item=related_order_item
+            )
         return self.balance
 
 
@@ -191,6 +193,13 @@ class WalletTransaction(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Customer history: WHERE wallet_id = ? ORDER BY created_at DESC, id DESC
+            models.Index(fields=['wallet', '-created_at', '-id']),
+            # Vendor refund lookups by order / order line
+            models.Index(fields=['transaction_type', 'related_order']),
+            models.Index(fields=['transaction_type', 'related_order_item']),
+        ]
     
     def __str__(self):
         return f"{self.wallet.user.email} - {self.transaction_type} - ₹{self.amount}"
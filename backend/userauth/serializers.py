@@ -48,20 +48,20 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         email = attrs.get('email', attrs.get(self.username_field))
         password = attrs.get('password')
         
-        logger.info(f"Login attempt for email: {email}")
+        logger.info("Login attempt for email: %s", email)
         
         # Try to find the user by email
         try:
             user = User.objects.get(email=email)
         except User.DoesNotExist:
-            logger.warning(f"User not found: {email}")
+            logger.warning("User not found: %s", email)
             raise serializers.ValidationError({
                 'detail': 'No active account found with the given credentials'
             })
         
         # === Allow superusers to login even if email not verified ===
         if not user.email_verified and not user.is_superuser:
-            logger.warning(f"Email not verified for: {email}")
+            logger.warning("Email not verified for: %s", email)
             raise serializers.ValidationError({
                 'detail': 'Email not verified. Please check your email for OTP.'
             })
@@ -75,7 +75,7 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         )
         
         if not authenticated_user:
-            logger.warning(f"Authentication failed for: {email}")
+            logger.warning("Authentication failed for: %s", email)
             raise serializers.ValidationError({
                 'detail': 'No active account found with the given credentials'
             })
@@ -84,7 +84,7 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         try:
             vendor = authenticated_user.vendor
             if vendor and not vendor.active:
-                logger.warning(f"Blocked vendor attempted login: {authenticated_user.email} (Vendor ID: {vendor.id})")
+                logger.warning("Blocked vendor attempted login: %s (Vendor ID: %s)", authenticated_user.email, vendor.id)
                 raise serializers.ValidationError({
                     'detail': 'Your account is blocked, please contact admin.'
                 })
@@ -99,7 +99,7 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
             'access': str(refresh.access_token),
         }
         
-        logger.info(f"Login successful for: {email}")
+        logger.info("Login successful for: %s", email)
         
         return data
 
@@ -5,6 +5,11 @@ from django.conf import settings #noqa
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string #noqa
 
+# apply_async options for OTP and password-reset mails: their own queue, ahead of everything else.
+# Other send_async_email calls follow CELERY_TASK_ROUTES ('notifications').
+TRANSACTIONAL = {'queue': 'transactional', 'priority': 0}
+
+
 @shared_task
 def send_async_email(subject, message, from_email, recipient_list, fail_silently=False):
     send_mail(
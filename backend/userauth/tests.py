@@ -1,3 +1,100 @@
-from django.test import TestCase
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+
+from backend.celery import app
+from userauth.models import User, Wallet, WalletTransaction
+from userauth.tasks import TRANSACTIONAL, send_async_email
+
+
+@skipUnlessDBFeature('has_select_for_update')  # needs row locks that let writers run side by side (PostgreSQL)
+class WalletConcurrencyTests(TransactionTestCase):
+    """
+    Hundreds of requests changing one wallet at once, each in its own thread and connection.
+    At most POOL run together (each holds a database connection), released in waves by a barrier.
+    """
+    THREADS = 200
+    POOL = 50  # below PostgreSQL's default max_connections (100)
+
+    def setUp(self):
+        self.wallet = User.objects.create(email='buyer@example.com').wallet
+        self.wallet.deposit(Decimal('1000.00'), description='opening')
+
+    def run_parallel(self, operations):
+        barrier = threading.Barrier(self.POOL)
+        errors = []
+
+        def run(operation):
+            try:
+                wallet = Wallet.objects.get(pk=self.wallet.pk)  # each request loads its own copy
+                barrier.wait(timeout=60)  # a wave that can't fill up fails instead of hanging
+                return operation(wallet)
+            except ValueError as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        self.assertEqual(len(operations) % self.POOL, 0)  # every barrier wave fills up
+        with ThreadPoolExecutor(max_workers=self.POOL) as pool:
+            results = [result for result in pool.map(run, operations) if result is not None]
+        return results, errors
+
+    def test_parallel_debits_never_overdraw(self):
+        results, errors = self.run_parallel([lambda w: w.withdraw(Decimal('10.00'))] * self.THREADS)
+
+        self.assertEqual((len(results), len(errors)), (100, self.THREADS - 100))
+        self.assertTrue(all(str(e) == "Insufficient balance" for e in errors))
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('0.00'))
+        debits = WalletTransaction.objects.filter(wallet=self.wallet, transaction_type='withdrawal')
+        self.assertEqual(debits.count(), 100)
+        # Each debit saw the balance the one before it left
+        self.assertEqual(sorted(debits.values_list('balance_after', flat=True)),
+                         [Decimal(n) for n in range(0, 1000, 10)])
+
+    def test_parallel_credits_and_debits_lose_no_update(self):
+        half = self.THREADS // 2
+        operations = [lambda w: w.deposit(Decimal('10.00')), lambda w: w.withdraw(Decimal('5.00'))] * half
+        results, errors = self.run_parallel(operations)
+
+        self.assertEqual((len(results), errors), (self.THREADS, []))
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('1000.00') + half * Decimal('10.00') - half * Decimal('5.00'))
+        self.assertEqual(WalletTransaction.objects.filter(wallet=self.wallet).count(), self.THREADS + 1)
+
+@mock.patch('userauth.views.send_async_email.apply_async')
+class TransactionalMailTests(TestCase):
+    """OTP and password-reset mails go to the 'transactional' queue; other mail stays on 'notifications'."""
+
+    def queue(self, options, task=send_async_email):
+        return app.amqp.router.route(options, task.name)['queue'].name
+
+    def assertTransactional(self, apply_async):
+        apply_async.assert_called_once()
+        options = apply_async.call_args.kwargs
+        self.assertEqual(self.queue({k: v for k, v in options.items() if k != 'kwargs'}), 'transactional')
+        self.assertEqual(options['priority'], 0)
+
+    def test_password_reset(self, apply_async):
+        User.objects.create(email='buyer@example.com')
+        self.client.get('/api/user/password-reset/buyer@example.com/')
+        self.assertTransactional(apply_async)
+        self.assertEqual(apply_async.call_args.kwargs['kwargs']['recipient_list'], ['buyer@example.com'])
+
+    def test_registration_otp(self, apply_async):
+        self.client.post('/api/user/register/', {'email': 'new@example.com', 'full_name': 'New', 'phone': '9999999999',
+                                                 'password': 'Str0ng-pass!', 'password2': 'Str0ng-pass!'})
+        self.assertTransactional(apply_async)
+
+    def test_otp_resent_to_unverified_account(self, apply_async):
+        User.objects.create(email='buyer@example.com', email_verified=False)
+        self.client.post('/api/user/register/', {'email': 'buyer@example.com'})
+        self.assertTransactional(apply_async)
+
+    def test_other_mail_stays_on_notifications(self, apply_async):
+        self.assertEqual(self.queue({}), 'notifications')
+        self.assertEqual(self.queue(dict(TRANSACTIONAL)), 'transactional')
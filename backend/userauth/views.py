@@ -22,7 +22,7 @@ from google.auth.transport import requests as google_requests
 from django.conf import settings
 from django.utils import timezone
 import logging
-from .tasks import send_async_email
+from .tasks import TRANSACTIONAL, send_async_email
 
 # For secure password reset token
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
@@ -51,23 +51,23 @@ class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
 
     def post(self, request, *args, **kwargs):
-        logger.info("Token request received")
-        logger.info("Request contains data payload")
-        logger.info(f"Has email: {'email' in request.data}")
-        logger.info(f"Has password: {'password' in request.data}")
-        logger.info(f"Content-Type: {request.content_type}")
-        logger.info(f"Request method: {request.method}")
+        if logger.isEnabledFor(logging.DEBUG):
+            # Guarded: the membership checks make DRF parse the body
+            logger.debug(
+                "Token request: content_type=%s has_email=%s has_password=%s",
+                request.content_type, 'email' in request.data, 'password' in request.data,
+            )
 
         try:
             response = super().post(request, *args, **kwargs)
-            logger.info("Token generation successful")
+            logger.debug("Token generation successful")
             return response
         except ValidationError:
             # Re-raise ValidationError (including our blocked vendor message) 
             # so DRF returns the correct {"detail": "..."} with the original message
             raise
         except Exception as e:
-            logger.error(f"Token generation failed: {str(e)}", exc_info=True)
+            logger.error("Token generation failed: %s", e, exc_info=True)
             return Response(
                 {
                     "error": str(e),
@@ -114,12 +114,15 @@ class RegisterView(generics.CreateAPIView):
                     f"This code is valid for 10 minutes.\n\n"
                     f"Thank you!"
                 )
-                send_async_email.delay(
-                    subject=subject,
-                    message=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[user.email],
-                    fail_silently=False,
+                send_async_email.apply_async(
+                    kwargs=dict(
+                        subject=subject,
+                        message=message,
+                        from_email=settings.DEFAULT_FROM_EMAIL,
+                        recipient_list=[user.email],
+                        fail_silently=False,
+                    ),
+                    **TRANSACTIONAL,
                 )
                 return Response(
                     {
@@ -136,7 +139,7 @@ class RegisterView(generics.CreateAPIView):
         user.otp = generate_otp()
         user.save()
 
-        logger.info(f"User created successfully: {user.id} - {mask_email(user.email)}")
+        logger.info("User created successfully: %s - %s", user.id, mask_email(user.email))
 
         uidb64 = urlsafe_base64_encode(force_bytes(str(user.pk)))
 
@@ -150,12 +153,15 @@ class RegisterView(generics.CreateAPIView):
             f"This code is valid for 10 minutes.\n\n"
             f"Thank you!"
         )
-        send_async_email.delay(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
+        send_async_email.apply_async(
+            kwargs=dict(
+                subject=subject,
+                message=message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[user.email],
+                fail_silently=False,
+            ),
+            **TRANSACTIONAL,
         )
 
         return Response(
@@ -202,13 +208,13 @@ class PasswordEmailVerify(generics.RetrieveAPIView):
 
     def get(self, request, *args, **kwargs):
         email = self.kwargs.get("email")
-        logger.info(f"Password reset request for email: {mask_email(email)}")
+        logger.info("Password reset request for email: %s", mask_email(email))
 
         try:
             user = User.objects.get(email=email)
-            logger.info(f"User found for password reset: {user.id} - {mask_email(user.email)}")
+            logger.info("User found for password reset: %s - %s", user.id, mask_email(user.email))
         except User.DoesNotExist:
-            logger.info(f"No user found for email: {mask_email(email)} (silent response)")
+            logger.info("No user found for email: %s (silent response)", mask_email(email))
             return Response({"message": "If this email exists, a reset link was sent."})
 
         # Generate secure password reset link (uidb64 + token, no OTP)
@@ -225,14 +231,17 @@ class PasswordEmailVerify(generics.RetrieveAPIView):
             f"This link is valid for 1 hour.\n\n"
             f"If you didn't request this, please ignore this email."
         )
-        send_async_email.delay(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
+        send_async_email.apply_async(
+            kwargs=dict(
+                subject=subject,
+                message=message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[user.email],
+                fail_silently=False,
+            ),
+            **TRANSACTIONAL,
         )
-        logger.info(f"Password reset email queued for user: {mask_email(user.email)}")
+        logger.info("Password reset email queued for user: %s", mask_email(user.email))
         return Response({"message": "If this email is registered, a reset link was sent."})
 
 
@@ -242,20 +251,12 @@ class PasswordChangeView(generics.CreateAPIView):
     serializer_class = UserSerializer
 
     def create(self, request, *args, **kwargs):
-        logger.info("Password change request received")
-        logger.info(f"Request method: {request.method}")
-        logger.info(f"Request content-type: {request.content_type}")
-        logger.info("Request contains data payload" if request.data else "No request data provided")
-        logger.info("Request data logged in generic form (sensitive fields masked)")
-
         payload = request.data
         token = payload.get("token")
         uidb64 = payload.get("uidb64")
         password = payload.get("password")
 
-        logger.info(f"Token present: {bool(token)}")
-        logger.info(f"uidb64 present: {bool(uidb64)}")
-        logger.info("password present. ")
+        logger.debug("Password change request: token=%s uidb64=%s password=%s", bool(token), bool(uidb64), bool(password))
 
         missing_fields = []
         if not token:
@@ -266,7 +267,7 @@ class PasswordChangeView(generics.CreateAPIView):
             missing_fields.append("password")
 
         if missing_fields:
-            logger.warning(f"Missing required fields: {missing_fields}")
+            logger.warning("Missing required fields: %s", missing_fields)
             logger.warning("Received payload with sensitive fields masked")
             return Response(
                 {"error": "Missing required fields", "missing": missing_fields},
@@ -275,34 +276,34 @@ class PasswordChangeView(generics.CreateAPIView):
 
         try:
             user_id = force_str(urlsafe_base64_decode(uidb64))
-            logger.info(f"Decoded user_id from uidb64: {user_id}")
+            logger.debug("Decoded user_id from uidb64: %s", user_id)
             user = User.objects.get(pk=user_id)
-            logger.info(f"User found for password change: {user.id} - {mask_email(user.email)}")
+            logger.info("User found for password change: %s - %s", user.id, mask_email(user.email))
         except (ValueError, TypeError) as e:
-            logger.error(f"Invalid uidb64 decoding: {str(e)}", exc_info=True)
+            logger.error("Invalid uidb64 decoding: %s", e, exc_info=True)
             return Response({"error": "Invalid link"}, status=status.HTTP_400_BAD_REQUEST)
         except User.DoesNotExist:
-            logger.warning(f"User not found for decoded user_id: {user_id}")
+            logger.warning("User not found for decoded user_id: %s", user_id)
             return Response({"error": "Invalid link"}, status=status.HTTP_400_BAD_REQUEST)
 
         if not token_generator.check_token(user, token):
-            logger.warning(f"Invalid or expired token for user: {user.id}")
+            logger.warning("Invalid or expired token for user: %s", user.id)
             return Response(
                 {"error": "Invalid or expired token"}, status=status.HTTP_400_BAD_REQUEST
             )
 
         # Prevent reusing the same password
         if user.check_password(password):
-            logger.warning(f"User {user.id} attempted to reuse the same password during reset")
+            logger.warning("User %s attempted to reuse the same password during reset", user.id)
             return Response(
                 {"error": "New password cannot be the same as your current password."},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        logger.info(f"Token valid for user: {user.id}. Proceeding to set new password.")
+        logger.info("Token valid for user: %s. Proceeding to set new password.", user.id)
         user.set_password(password)
         user.save()
-        logger.info(f"Password successfully changed for user: {user.id} - {mask_email(user.email)}")
+        logger.info("Password successfully changed for user: %s - %s", user.id, mask_email(user.email))
         return Response({"message": "Password Changed Successfully"}, status=status.HTTP_200_OK)
 
 class VerifyEmailOTP(generics.CreateAPIView):
@@ -356,7 +357,7 @@ def google_login(request):
 
         if created:
             user.set_unusable_password()
-            logger.info(f"New user created via Google signup: ID={user.id}, Email={user.email}")
+            logger.info("New user created via Google signup: ID=%s, Email=%s", user.id, user.email)
 
         user.email_verified = id_info.get("email_verified", False)
         user.save()
@@ -365,7 +366,7 @@ def google_login(request):
         try:
             vendor = user.vendor
             if vendor and not vendor.active:
-                logger.warning(f"Blocked vendor attempted Google login: {user.email} (Vendor ID: {vendor.id})")
+                logger.warning("Blocked vendor attempted Google login: %s (Vendor ID: %s)", user.email, vendor.id)
                 return Response(
                     {"error": "Your account is blocked, please contact admin."},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -384,15 +385,15 @@ def google_login(request):
         }
 
         status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
-        logger.info(f"Google login successful: User ID={user.id}, New user={created}")
+        logger.info("Google login successful: User ID=%s, New user=%s", user.id, created)
 
         return Response(response_data, status=status_code)
 
     except ValueError as e:
-        logger.warning(f"Invalid Google credential: {str(e)}")
+        logger.warning("Invalid Google credential: %s", e)
         return Response({"error": "Invalid credential"}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
-        logger.error(f"Unexpected error in google_login: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in google_login: %s", e, exc_info=True)
         return Response({"error": "Authentication failed"}, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -525,11 +526,14 @@ class ChangeEmailRequestView(APIView):
             f"Your OTP to change email is: {otp}\n\n"
             f"This OTP is valid for 10 minutes."
         )
-        send_async_email.delay(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[new_email],
+        send_async_email.apply_async(
+            kwargs=dict(
+                subject=subject,
+                message=message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[new_email],
+            ),
+            **TRANSACTIONAL,
         )
 
         return Response({"message": "OTP sent to new email address."})
@@ -90,7 +90,7 @@ function Notifications() {
     );
 
     try {
-      await axios.get(`customer/notifications/${userId}/${notiId}/`);
+      await axios.post(`customer/notifications/${userId}/${notiId}/`);
       Toast.fire({
         icon: "success",
         title: currentSeen ? "Marked as unread" : "Marked as read",
@@ -47,7 +47,7 @@ const Sidebar = () => {
                 const [ordersRes, wishlistRes, notificationsRes, walletRes] = await Promise.all([
                     apiInstance.get(`customer/orders/${userData.user_id}/`),
                     apiInstance.get(`customer/wishlist/${userData.user_id}/`),
-                    apiInstance.get(`customer/notifications/${userData.user_id}/?seen=false`),
+                    apiInstance.get(`customer/notifications/${userData.user_id}/summary/`),
                     apiInstance.get(`customer/wallet/${userData.user_id}/`),
                 ]);
                 setWalletBalance(walletRes.data.balance || "0.00");
@@ -56,7 +56,7 @@ const Sidebar = () => {
 
                 setOrderCount(getCount(ordersRes.data));
                 setWishlistCount(getCount(wishlistRes.data));
-                setNotificationCount(getCount(notificationsRes.data));
+                setNotificationCount(notificationsRes.data.un_read_noti || 0);
             } catch (error) {
                 log.error("Error fetching sidebar counts:", error);
             } finally {
@@ -31,6 +31,9 @@ const Wallet = () => {
   // Transaction states
   const [transactions, setTransactions] = useState([]);
   const [txLoading, setTxLoading] = useState(false);
+  // Cursor of the next page (20 rows each), null once the newest-first history is fully loaded
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [activeFilter, setActiveFilter] = useState("all");
   const [selectedTransaction, setSelectedTransaction] = useState(null);
 
@@ -59,6 +62,8 @@ const Wallet = () => {
     }
   };
 
+  const cursorFrom = (nextUrl) => (nextUrl ? new URL(nextUrl).searchParams.get("cursor") : null);
+
   const fetchTransactions = async (type = null) => {
     if (!userId) return;
     try {
@@ -68,14 +73,34 @@ const Wallet = () => {
         : `customer/wallet/transactions/${userId}/`;
       const res = await apiInstance.get(url);
       setTransactions(res.data.transactions || []);
+      setNextCursor(cursorFrom(res.data.next));
     } catch (err) {
       console.error("Error fetching transactions:", err);
       setTransactions([]);
+      setNextCursor(null);
     } finally {
       setTxLoading(false);
     }
   };
 
+  // Appends the next page; the cursor only marks the position, so the type filter is sent again
+  const loadMoreTransactions = async () => {
+    if (!userId || !nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const params = { cursor: nextCursor };
+      if (activeFilter !== "all") params.type = activeFilter;
+      const res = await apiInstance.get(`customer/wallet/transactions/${userId}/`, { params });
+      setTransactions((prev) => [...prev, ...(res.data.transactions || [])]);
+      setNextCursor(cursorFrom(res.data.next));
+    } catch (err) {
+      console.error("Error loading more transactions:", err);
+      Toast.fire({ icon: "error", title: "Failed to load more transactions" });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleFilterChange = (filter) => {
     setActiveFilter(filter);
     fetchTransactions(filter);
@@ -492,6 +517,17 @@ const Wallet = () => {
                                 )}
                               </tbody>
                             </table>
+                            {nextCursor && (
+                              <div className="p-4 text-center border-t border-gray-100">
+                                <button
+                                  onClick={loadMoreTransactions}
+                                  disabled={loadingMore}
+                                  className="px-4 py-2 border border-gray-200 rounded-lg text-sm font-medium text-gray-700 hover:bg-gray-50 transition disabled:opacity-50"
+                                >
+                                  {loadingMore ? "Loading..." : "Load more"}
+                                </button>
+                              </div>
+                            )}
                           </div>
                         )}
                       </div>